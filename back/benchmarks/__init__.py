@@ -0,0 +1,7 @@
+"""
+Benchmarks of the werewolf back end.
+
+Run a benchmark from the ``back`` directory::
+
+    python -m benchmarks.select_player
+"""
@@ -0,0 +1,200 @@
+"""
+End-to-end load on a controller through the in-process router.
+
+    python -m benchmarks.load [--games 200] [--players 10] [--think 0.2]
+
+Clients subscribe to the topics the front subscribes to, then create,
+join, start and play games until a role wins, voting for a random
+selectable player when they are active in a phase. Reported latencies:
+
+- RPC: from the call of a client to its result, by procedure,
+- delivery: from a publish to the delivery of the event to a client,
+- vote: from a select_player call to the delivery of the resulting
+  select_player (or select_players) event to the voter.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+from autobahn.wamp.exception import ApplicationError
+from autobahn.wamp.types import SubscribeOptions
+
+from werewolf.controller import Controller
+from werewolf.local_router import LocalComponent, LocalRouter
+from werewolf.metrics import Histogram
+
+PREFIX = SubscribeOptions(match="prefix", details=True)
+
+
+class Stats:
+    def __init__(self):
+        self.rpc: Dict[str, Histogram] = {}
+        self.votes = Histogram()
+        self.errors = 0
+
+    def rpc_histogram(self, procedure: str) -> Histogram:
+        histogram = self.rpc.get(procedure)
+        if histogram is None:
+            histogram = self.rpc[procedure] = Histogram()
+        return histogram
+
+
+class Client:
+    def __init__(self, router: LocalRouter, game_name: str, name: str,
+                 stats: Stats, rng: random.Random, think: float,
+                 done: asyncio.Event):
+        self.session = router.session()
+        self.game_name = game_name
+        self.name = name
+        self.stats = stats
+        self.rng = rng
+        self.think = think
+        self.done = done
+        self.alive = True
+        self._voted_for: Optional[str] = None
+        self._voted_at = 0.0
+
+    async def call(self, procedure: str, *args):
+        start = time.perf_counter()
+        try:
+            return await self.session.call(f"com.werewolf.{procedure}", *args)
+        except ApplicationError:
+            self.stats.errors += 1
+            return None
+        finally:
+            self.stats.rpc_histogram(procedure).observe(time.perf_counter() -
+                                                        start)
+
+    async def subscribe(self):
+        prefix = f"com.werewolf.{self.game_name}"
+        await self.session.subscribe(lambda update: None, f"{prefix}.players")
+        await self.session.subscribe(self.on_start_game,
+                                     f"{prefix}.user.{self.name}.start_game")
+        await self.session.subscribe(self.on_enter_in_phase,
+                                     f"{prefix}.enter_in_phase",
+                                     options=PREFIX)
+        await self.session.subscribe(self.on_select_player,
+                                     f"{prefix}.select_player")
+        await self.session.subscribe(self.on_select_players,
+                                     f"{prefix}.select_players")
+        await self.session.subscribe(self.on_close_phase,
+                                     f"{prefix}.close_phase",
+                                     options=PREFIX)
+
+    async def on_start_game(self, player):
+        prefix = f"com.werewolf.{self.game_name}.role.{player['role']}"
+        await self.session.subscribe(self.on_enter_in_phase,
+                                     f"{prefix}.enter_in_phase",
+                                     options=PREFIX)
+        await self.session.subscribe(self.on_select_player,
+                                     f"{prefix}.select_player")
+        await self.session.subscribe(self.on_select_players,
+                                     f"{prefix}.select_players")
+        await self.call("player_listen_topic", self.game_name, self.name)
+
+    async def on_enter_in_phase(self, message, details):  # pylint: disable=unused-argument
+        if "active" not in message or not self.alive:
+            return
+        if self.name not in {player["name"] for player in message["active"]}:
+            return
+        selectables = [
+            player["name"] for player in message["selectable"]
+            if player["name"] != self.name
+        ]
+        if not selectables:
+            return
+        await asyncio.sleep(self.rng.random() * self.think)
+        self._voted_for = self.rng.choice(selectables)
+        self._voted_at = time.perf_counter()
+        await self.call("select_player", self.game_name, self._voted_for,
+                        self.name)
+
+    def on_select_player(self, player):
+        if player["name"] == self._voted_for:
+            self.stats.votes.observe(time.perf_counter() - self._voted_at)
+            self._voted_for = None
+
+    def on_select_players(self, players):
+        for player in players:
+            self.on_select_player(player)
+
+    def on_close_phase(self, message, details):  # pylint: disable=unused-argument
+        if message["killed"] == self.name:
+            self.alive = False
+        elif message["resurrected"] == self.name:
+            self.alive = True
+        if message["winner"] is not None:
+            self.done.set()
+
+
+async def play_game(router: LocalRouter, game_name: str, nb_players: int,
+                    stats: Stats, rng: random.Random, think: float,
+                    settings: dict):
+    done = asyncio.Event()
+    clients = [
+        Client(router, game_name, f"player-{i}", stats, rng, think, done)
+        for i in range(nb_players)
+    ]
+    for client in clients:
+        await client.subscribe()
+    await clients[0].call("create_game", game_name, clients[0].name, settings)
+    for client in clients[1:]:
+        await client.call("join_game", game_name, client.name)
+    await clients[0].call("start_game", game_name)
+    await done.wait()
+
+
+async def run(nb_games: int, nb_players: int, think: float, seed: int):
+    router = LocalRouter(measure=True)
+    component = LocalComponent(router)
+    controller = Controller(component)
+    await component.start()
+
+    stats = Stats()
+    rng = random.Random(seed)
+    settings = {
+        "default_phase_duration": think * 5,
+        "pause_duration": 0.01,
+    }
+    start = time.perf_counter()
+    await asyncio.gather(*(play_game(router, f"game-{i}", nb_players, stats,
+                                     rng, think, settings)
+                           for i in range(nb_games)))
+    duration = time.perf_counter() - start
+    await component.stop()
+    controller._queued_notifier.close()  # pylint: disable=protected-access
+
+    print(f"{nb_games} games of {nb_players} players in {duration:.1f} s, "
+          f"{router.published / duration:.0f} publishes/s, "
+          f"{router.delivered / duration:.0f} deliveries/s, "
+          f"{stats.errors} RPC errors")
+    print(f"{'latency ms':<20}{'count':>10}{'p50':>10}{'p99':>10}")
+    rows = sorted(stats.rpc.items())
+    rows.append(("delivery", router.delivery_delays))
+    rows.append(("vote", stats.votes))
+    for name, histogram in rows:
+        if not histogram.count:
+            continue
+        print(f"{name:<20}{histogram.count:>10}"
+              f"{histogram.quantile(0.5) * 1e3:>10.2f}"
+              f"{histogram.quantile(0.99) * 1e3:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.load")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--think",
+                        type=float,
+                        default=0.2,
+                        help="maximum delay in seconds before a vote")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.games, args.players, args.think, args.seed))
+
+
+if __name__ == "__main__":
+    main()
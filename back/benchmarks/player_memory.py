@@ -0,0 +1,49 @@
+"""
+Memory used by players according to the number of players.
+
+`LegacyPlayer` reproduces the layout of players before they used slots:
+an instance dict and an eagerly created set of electors.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from werewolf.models import Player, PlayerState, Role
+
+PLAYER_COUNTS = (1000, 10000, 100000)
+
+
+class LegacyPlayer:
+    def __init__(self, name):
+        self.name = name
+        self.role = None
+        self.state = PlayerState.alive
+        self.selected_by = set()
+
+
+def measure(player_class, nb_players):
+    gc.collect()
+    tracemalloc.start()
+    players = []
+    for i in range(nb_players):
+        player = player_class(f"player-{i}")
+        player.role = Role.villager
+        players.append(player)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The names are allocated for both layouts, do not count them.
+    names = sum(sys.getsizeof(player.name) for player in players)
+    return (memory - names) / nb_players
+
+
+def main():
+    print(f"{'players':>8} {'legacy B/player':>16} {'slots B/player':>15}")
+    for nb_players in PLAYER_COUNTS:
+        legacy = measure(LegacyPlayer, nb_players)
+        slots = measure(Player, nb_players)
+        print(f"{nb_players:>8} {legacy:>16.0f} {slots:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Event loop overhead and memory used to drive many games.
+
+Compare one sleeping task per game (the former Controller._run_game)
+with the single timer of GameScheduler. Games are stubs whose phases
+never end the game, so only the cost of scheduling is measured.
+"""
+
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from werewolf.models import GameSettings
+from werewolf.scheduler import GameScheduler
+
+GAME_COUNTS = (10000, 100000)
+RUN_DURATION = 3
+SETTINGS = GameSettings(default_phase_duration=0.5, pause_duration=0.1)
+
+
+class StubGame:
+    def __init__(self, name):
+        self.name = name
+        self.settings = SETTINGS
+        self.phases = 0
+        self.phase_open = False
+
+    def add_listener(self, listener):
+        pass
+
+    def remove_listener(self, listener):
+        pass
+
+    def all_player_listen(self):
+        return True
+
+    def enter_in_next_phase(self):
+        self.phases += 1
+        return True
+
+    def current_phase_duration(self):
+        return self.settings.default_phase_duration
+
+    def quorum_reached(self):
+        return False
+
+    def close_the_current_phase(self):
+        return False
+
+
+async def run_game(game):
+    while True:
+        game.enter_in_next_phase()
+        await asyncio.sleep(game.current_phase_duration())
+        if game.close_the_current_phase():
+            break
+        await asyncio.sleep(game.settings.pause_duration)
+
+
+def start_tasks(games):
+    return [asyncio.create_task(run_game(game)) for game in games]
+
+
+def start_scheduler(games):
+    scheduler = GameScheduler()
+    for game in games:
+        scheduler.add(game)
+    return scheduler
+
+
+async def measure(start, nb_games):
+    games = [StubGame(f"game-{i}") for i in range(nb_games)]
+    gc.collect()
+    tracemalloc.start()
+    handle = start(games)
+    await asyncio.sleep(0)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(RUN_DURATION)
+    cpu = time.process_time() - cpu_start
+
+    if isinstance(handle, list):
+        for task in handle:
+            task.cancel()
+        await asyncio.gather(*handle, return_exceptions=True)
+    phases = sum(game.phases for game in games)
+    return memory, cpu, phases
+
+
+def main():
+    print(f"{'driver':>10} {'games':>8} {'memory MiB':>11} "
+          f"{'cpu %':>6} {'µs cpu/phase':>13}")
+    for nb_games in GAME_COUNTS:
+        for driver, start in (("tasks", start_tasks),
+                              ("scheduler", start_scheduler)):
+            memory, cpu, phases = asyncio.run(measure(start, nb_games))
+            print(f"{driver:>10} {nb_games:>8} {memory / 2**20:>11.1f} "
+                  f"{cpu / RUN_DURATION * 100:>6.1f} "
+                  f"{cpu / phases * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Cost of one vote in a villager phase according to the number of players.
+
+The cost of a vote should stay flat when the number of players grows.
+"""
+
+import timeit
+
+from werewolf.models import Player, PlayerRegistry, Role, VillagerPhase
+from werewolf.notifiers import NullNotifier
+
+PLAYER_COUNTS = (10, 100, 1000, 10000)
+NUMBER = 10000
+
+
+def make_phase(nb_players):
+    players = PlayerRegistry()
+    for i in range(nb_players):
+        player = Player(f"player-{i}")
+        player.role = Role.villager
+        players.add(player)
+    phase = VillagerPhase("bench", players, NullNotifier())
+    phase.enter()
+    return phase
+
+
+def main():
+    print(f"{'players':>8} {'µs/vote':>10}")
+    for nb_players in PLAYER_COUNTS:
+        phase = make_phase(nb_players)
+        # The last player votes for the last player, the worst case of a
+        # linear scan.
+        name = f"player-{nb_players - 1}"
+        duration = timeit.timeit(
+            lambda: phase.select_player_from_name(name, name), number=NUMBER)
+        print(f"{nb_players:>8} {duration / NUMBER * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Encoding cost and size of typical messages with each WAMP serializer,
+according to the number of players.
+
+    python -m benchmarks.serialization
+
+Payloads are the `enter_in_phase` message of a villager phase, whose
+active and selectable players are all the players, and the result of
+`add_player` (the players snapshot). Serializers whose library is not
+installed are skipped.
+"""
+
+import json
+import timeit
+
+from werewolf.models import Game, Notifier, Player
+
+PLAYER_COUNTS = (10, 100, 1000)
+
+
+class RecordingNotifier(Notifier):
+    def __init__(self):
+        self.messages = {}
+
+    def send_to_players(self, game_name, players, subject, message):
+        self.messages[subject] = message
+
+    def send_to_game(self, game_name, subject, message):
+        self.messages[subject] = message
+
+    def send_to_role(self, game_name, role, subject, message):
+        self.messages[subject] = message
+
+
+def make_payloads(nb_players):
+    notifier = RecordingNotifier()
+    game = Game("bench", notifier)
+    for i in range(nb_players):
+        game.add_player(Player(f"player-{i}"))
+    snapshot = game.get_players_snapshot()
+    game.start()
+    # Nobody votes at night, so every player is alive during the day.
+    game.enter_in_next_phase()
+    while game.current_phase.is_night:
+        game.close_the_current_phase()
+        game.enter_in_next_phase()
+    return {
+        "enter_in_phase": notifier.messages["enter_in_phase.villager"],
+        "add_player": snapshot,
+    }
+
+
+def load_encoders():
+    encoders = {
+        "json":
+        lambda payload: json.dumps(payload, separators=(",", ":")).encode()
+    }
+    try:
+        import ujson  # pylint: disable=import-outside-toplevel
+        encoders["ujson"] = lambda payload: ujson.dumps(payload).encode()
+    except ImportError:
+        pass
+    try:
+        import msgpack  # pylint: disable=import-outside-toplevel
+        encoders["msgpack"] = msgpack.packb
+    except ImportError:
+        pass
+    try:
+        import cbor2  # pylint: disable=import-outside-toplevel
+        encoders["cbor"] = cbor2.dumps
+    except ImportError:
+        pass
+    try:
+        import ubjson  # pylint: disable=import-outside-toplevel
+        encoders["ubjson"] = ubjson.dumpb
+    except ImportError:
+        pass
+    return encoders
+
+
+def measure(encode, payload):
+    timer = timeit.Timer(lambda: encode(payload))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def main():
+    encoders = load_encoders()
+    print(f"{'payload':<16}{'players':>8}{'serializer':>12}"
+          f"{'µs/encode':>12}{'bytes':>10}")
+    for nb_players in PLAYER_COUNTS:
+        for name, payload in make_payloads(nb_players).items():
+            for serializer, encode in encoders.items():
+                size = len(encode(payload))
+                duration = measure(encode, payload)
+                print(f"{name:<16}{nb_players:>8}{serializer:>12}"
+                      f"{duration * 1e6:>12.2f}{size:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Play complete games with the simulator and report the cost of the
+models layer.
+
+    python -m benchmarks.simulation [--metrics] [PLAYER_COUNT ...]
+
+Games are seeded so two runs play the same games. With --metrics, games
+are measured as the controller does (`GameMetrics` listener and
+`MeteredNotifier`), to compare the overhead of instrumentation.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from werewolf.metrics import GameMetrics, Metrics
+from werewolf.notifiers import MeteredNotifier, NullNotifier
+from werewolf.simulation import simulate_game
+
+# Number of games played for each player count.
+GAMES = {4: 2000, 50: 100, 500: 4, 5000: 1}
+
+
+def run(nb_players, nb_games, metrics=None):
+    phases = votes = 0
+    enter_duration = close_duration = 0.0
+    kwargs = {}
+    if metrics is not None:
+        game_metrics = GameMetrics(metrics)
+        kwargs = {
+            "notifier":
+            MeteredNotifier(NullNotifier(), metrics),
+            "on_game":
+            lambda game: game.add_listener(game_metrics, GameMetrics.events),
+        }
+    start = time.perf_counter()
+    for seed in range(nb_games):
+        result = simulate_game(nb_players, seed=seed, **kwargs)
+        phases += result.phases
+        votes += result.votes
+        enter_duration += result.enter_duration
+        close_duration += result.close_duration
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    simulate_game(nb_players, seed=0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "games/s": nb_games / duration,
+        "votes/s": votes / duration,
+        "enter µs": enter_duration / phases * 1e6,
+        "close µs": close_duration / phases * 1e6,
+        "peak KiB/game": peak / 1024,
+    }
+
+
+def main(player_counts, metrics=False):
+    columns = ("games/s", "votes/s", "enter µs", "close µs", "peak KiB/game")
+    print(f"{'players':>8}" + "".join(f"{c:>15}" for c in columns))
+    for nb_players in player_counts:
+        results = run(nb_players, GAMES.get(nb_players, 1),
+                      Metrics() if metrics else None)
+        print(f"{nb_players:>8}" + "".join(f"{results[c]:>15.1f}"
+                                           for c in columns))
+
+
+if __name__ == "__main__":
+    ARGS = sys.argv[1:]
+    main([int(arg) for arg in ARGS if arg != "--metrics"] or list(GAMES),
+         metrics="--metrics" in ARGS)
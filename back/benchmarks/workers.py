@@ -0,0 +1,179 @@
+"""
+RPC throughput of the controller according to the number of workers.
+
+    python -m benchmarks.workers [--url ws://localhost:8081/ws]
+                                 [--workers 1 2 4] [--clients 4]
+                                 [--sessions 8] [--duration 5]
+
+With --url, for each worker count the workers are started as processes
+connected to the router, as `python -m werewolf --workers N` does, and
+`--clients` client processes of `--sessions` concurrent loops each call
+the game procedures until `--duration` seconds elapsed. A loop creates a
+game, joins 3 players, reads the players and the status of the game, so
+calls are spread over the workers by game name and most of them are
+forwarded once by the worker receiving them. Throughput should grow
+about linearly with the workers while the router and the clients have
+spare cores.
+
+Without --url, the workers are controllers of a `LocalRouter` in this
+process: it measures the cost of forwarding calls between workers, not
+the scaling over cores.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from autobahn.asyncio.component import Component, run
+from autobahn.wamp.exception import ApplicationError
+
+from werewolf.__main__ import run_worker
+from werewolf.controller import Controller
+from werewolf.local_router import LocalComponent, LocalRouter
+
+CALLS_PER_LOOP = 6
+
+
+async def drive(call, loop_id: str, deadline: float) -> int:
+    """
+    Play the lobby of games named after loop_id until deadline, return
+    the number of calls.
+    """
+    calls = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        game_name = f"{loop_id}-{i}"
+        await call("com.werewolf.create_game", game_name, "Tom")
+        for player_name in ("Lea", "Bob", "Isa"):
+            await call("com.werewolf.join_game", game_name, player_name)
+        await call("com.werewolf.get_players", game_name)
+        await call("com.werewolf.get_game_status", game_name)
+        calls += CALLS_PER_LOOP
+        i += 1
+    return calls
+
+
+async def wait_for_workers(call, nb_workers: int, timeout: float = 30):
+    """
+    Wait until the procedures of every worker are registered.
+    """
+    procedures = ["com.werewolf.list_games"]
+    if nb_workers > 1:
+        procedures.extend(f"com.werewolf.worker.{worker_id}.list_worker_games"
+                          for worker_id in range(nb_workers))
+    deadline = time.perf_counter() + timeout
+    for procedure in procedures:
+        while True:
+            try:
+                await call(procedure)
+                break
+            except ApplicationError:
+                if time.perf_counter() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+def run_clients(url, realm, client_id, nb_workers, nb_sessions, duration,
+                results):
+    component = Component(transports=[{"type": "websocket", "url": url}],
+                          realm=realm)
+
+    @component.on_join
+    async def joined(session, details):  # pylint: disable=unused-argument
+        await wait_for_workers(session.call, nb_workers)
+        deadline = time.perf_counter() + duration
+        calls = await asyncio.gather(*(
+            drive(session.call, f"c{client_id}-s{i}", deadline)
+            for i in range(nb_sessions)))
+        results.put(sum(calls))
+        await session.leave()
+
+    run([component], log_level="warn")
+
+
+def measure_router(url, realm, nb_workers, nb_clients, nb_sessions,
+                   duration) -> float:
+    workers = [
+        multiprocessing.Process(target=run_worker,
+                                args=(url, realm, worker_id, nb_workers),
+                                daemon=True)
+        for worker_id in range(nb_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    results = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(target=run_clients,
+                                args=(url, realm, client_id, nb_workers,
+                                      nb_sessions, duration, results))
+        for client_id in range(nb_clients)
+    ]
+    try:
+        for client in clients:
+            client.start()
+        calls = sum(results.get() for _ in clients)
+        for client in clients:
+            client.join()
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+    return calls / duration
+
+
+async def measure_local(nb_workers, nb_sessions, duration) -> float:
+    router = LocalRouter()
+    components = [LocalComponent(router) for _ in range(nb_workers)]
+    controllers = [
+        Controller(component, worker_id=worker_id, nb_workers=nb_workers)
+        for worker_id, component in enumerate(components)
+    ]
+    for component in components:
+        await component.start()
+    session = router.session()
+    deadline = time.perf_counter() + duration
+    calls = await asyncio.gather(*(drive(session.call, f"s{i}", deadline)
+                                   for i in range(nb_sessions)))
+    for component, controller in zip(components, controllers):
+        await component.stop()
+        controller._queued_notifier.close()  # pylint: disable=protected-access
+    return sum(calls) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.workers")
+    parser.add_argument("--url", help="router to connect the workers to, "
+                        "the in-process router by default")
+    parser.add_argument("--realm", default="realm1")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients",
+                        type=int,
+                        default=4,
+                        help="number of client processes")
+    parser.add_argument("--sessions",
+                        type=int,
+                        default=8,
+                        help="concurrent loops of calls by client")
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'calls/s':>10} {'speedup':>8}")
+    baseline = None
+    for nb_workers in args.workers:
+        if args.url is None:
+            throughput = asyncio.run(
+                measure_local(nb_workers, args.clients * args.sessions,
+                              args.duration))
+        else:
+            throughput = measure_router(args.url, args.realm, nb_workers,
+                                        args.clients, args.sessions,
+                                        args.duration)
+        if baseline is None:
+            baseline = throughput
+        print(f"{nb_workers:>8} {throughput:>10.0f} "
+              f"{throughput / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, mock
+
+from werewolf.actor import GameActor
+from werewolf.models import Game, Player
+
+from .test_models import FakeNotifier, role_dispatcher
+
+
+class TestGameActor(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.notifier = FakeNotifier()
+        self.game = Game(name='part', notifier=self.notifier,
+                         role_dispatcher=role_dispatcher)
+        self.game.add_player(Player('Tom'))
+        self.actor = GameActor(self.game)
+        self.notifier.reset()
+
+    async def test_joins_of_one_iteration_should_be_sent_in_one_update(self):
+        snapshots = await asyncio.gather(self.actor.join('Lea'),
+                                         self.actor.join('Bob'))
+        self.assertEqual(snapshots[0]['seq'], 2)
+        self.assertEqual(len(self.notifier.messages_sent), 1)
+        self.assertEqual(self.actor.drains, 1)
+
+    async def test_rejected_join_should_raise(self):
+        results = await asyncio.gather(self.actor.join('Tom'),
+                                       self.actor.join('Lea'),
+                                       return_exceptions=True)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual([p['name'] for p in results[1]['players']],
+                         ['Tom', 'Lea'])
+
+    async def test_commands_should_be_applied_in_order(self):
+        for name in ('Lea', 'Bob', 'Isa'):
+            self.game.add_player(Player(name))
+        start = self.actor.call(self.game.start)
+        join = self.actor.join('Max')
+        await start
+        with self.assertRaisesRegex(ValueError, 'already started'):
+            await join
+
+    async def test_votes_of_one_iteration_should_be_sent_in_one_message(self):
+        for name in ('Lea', 'Bob', 'Isa'):
+            self.game.add_player(Player(name))
+        self.game.start()
+        self.game.enter_in_next_phase()
+        self.notifier.reset()
+        results = await asyncio.gather(self.actor.select('Tom', 'Bob'),
+                                       self.actor.select('Max', 'Bob'),
+                                       return_exceptions=True)
+        self.assertTrue(results[0])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(self.notifier.messages_sent, [
+            ('part.werewolf.select_players',
+             [{'name': 'Tom', 'state': 'alive', 'selected': 1}])])
+
+    async def test_failed_batch_should_fail_its_commands(self):
+        with mock.patch.object(self.game, 'select_players_from_names',
+                               side_effect=RuntimeError('broken')):
+            votes = await asyncio.gather(self.actor.select('Tom', 'Lea'),
+                                         self.actor.select('Lea', 'Tom'),
+                                         return_exceptions=True)
+        self.assertEqual([type(vote) for vote in votes], [RuntimeError] * 2)
+
+    async def test_selection_should_be_rejected_without_open_phase(self):
+        with self.assertRaisesRegex(ValueError, 'No phase'):
+            await self.actor.select('Tom', 'Tom')
+
+    async def test_closed_actor_should_fail_commands(self):
+        join = self.actor.join('Lea')
+        self.actor.close()
+        with self.assertRaises(ValueError):
+            await join
+        with self.assertRaises(ValueError):
+            await self.actor.join('Bob')
+
+
+class TestGameActorDamping(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.notifier = FakeNotifier()
+        self.game = Game(name='part', notifier=self.notifier,
+                         role_dispatcher=role_dispatcher)
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.add_player(Player(name))
+        self.game.start()
+        self.game.enter_in_next_phase()
+        self.actor = GameActor(self.game, select_delay=0.01)
+        self.notifier.reset()
+
+    async def test_toggles_during_the_delay_should_not_be_notified(self):
+        first = self.actor.select('Tom', 'Bob')
+        await asyncio.sleep(0)
+        second = self.actor.select('Tom', 'Bob')
+        self.assertEqual(await asyncio.gather(first, second), [True, False])
+        self.assertEqual(self.notifier.messages_sent, [])
+        self.assertEqual(self.actor.drains, 1)
+
+    async def test_votes_should_be_applied_before_close(self):
+        vote = self.actor.select('Tom', 'Bob')
+        self.game.close_the_current_phase()
+        self.assertTrue(await vote)
+        self.assertEqual(self.game.get_player('Tom').state.value, 'dead')
+
+    async def test_other_command_should_not_be_delayed(self):
+        vote = self.actor.select('Tom', 'Bob')
+        listen = self.actor.listen('Tom')
+        await asyncio.wait_for(asyncio.gather(vote, listen), 0.005)
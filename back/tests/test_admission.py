@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from werewolf.admission import SelectionLimiter
+
+from .test_eviction import FakeClock
+
+
+class TestSelectionLimiter(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = SelectionLimiter(elector_rate=1, elector_burst=2,
+                                        game_rate=10, game_burst=3,
+                                        clock=self.clock)
+
+    def test_burst_should_be_admitted(self):
+        self.assertIsNone(self.limiter.admit('part', 'Tom'))
+        self.assertIsNone(self.limiter.admit('part', 'Tom'))
+        self.assertEqual(self.limiter.admit('part', 'Tom'), 'elector')
+
+    def test_tokens_should_be_refilled(self):
+        self.limiter.admit('part', 'Tom')
+        self.limiter.admit('part', 'Tom')
+        self.clock.now = 1.0
+        self.assertIsNone(self.limiter.admit('part', 'Tom'))
+
+    def test_game_limit_should_apply_to_all_electors(self):
+        for name in ('Tom', 'Lea', 'Bob'):
+            self.assertIsNone(self.limiter.admit('part', name))
+        self.assertEqual(self.limiter.admit('part', 'Isa'), 'game')
+        self.assertIsNone(self.limiter.admit('other', 'Isa'))
+
+    def test_rejected_selection_should_not_take_tokens(self):
+        self.limiter.admit('part', 'Tom')
+        self.limiter.admit('part', 'Tom')
+        self.limiter.admit('part', 'Tom')
+        self.assertIsNone(self.limiter.admit('part', 'Lea'))
+
+    def test_limits_should_be_disabled_by_default(self):
+        limiter = SelectionLimiter()
+        self.assertFalse(limiter.enabled)
+        for _ in range(1000):
+            self.assertIsNone(limiter.admit('part', 'Tom'))
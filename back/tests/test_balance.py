@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from werewolf.balance import (VotingPolicy, balanced_role_dispatcher,
+                              role_counts, simulate_balance,
+                              werewolf_dispatcher)
+
+
+class TestSimulateBalance(TestCase):
+
+    def test_every_game_should_have_a_winner(self):
+        report = simulate_balance(8, nb_games=1000, seed=0)
+        self.assertAlmostEqual(sum(report.win_rates.values()), 1)
+        self.assertEqual(report.lengths.sum(), 1000)
+
+    def test_simulation_should_be_reproducible(self):
+        first = simulate_balance(8, nb_games=1000, seed=1)
+        second = simulate_balance(8, nb_games=1000, seed=1)
+        self.assertEqual(first.win_rates, second.win_rates)
+
+    def test_lone_werewolf_should_lose_against_clever_villagers(self):
+        report = simulate_balance(
+            12, werewolf_dispatcher({12: 1}), nb_games=1000, seed=0,
+            policy=VotingPolicy(day_werewolf_weight=20))
+        self.assertGreater(report.win_rates['villager'], 0.9)
+
+
+class TestBalancedRoleDispatcher(TestCase):
+
+    def test_dispatcher_should_give_one_seer(self):
+        dispatcher = balanced_role_dispatcher([8], nb_games=1000, seed=0)
+        self.assertEqual(role_counts(8, dispatcher)['seer'], 1)
+
+    def test_unknown_player_count_should_use_default_dispatcher(self):
+        dispatcher = balanced_role_dispatcher([8], nb_games=1000, seed=0)
+        self.assertEqual(role_counts(20, dispatcher),
+                         {'werewolf': 5, 'seer': 1, 'villager': 14})
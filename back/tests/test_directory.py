@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+from werewolf.directory import GameDirectory
+from werewolf.models import Game, GameSettings, Player
+
+from .test_models import FakeNotifier
+
+
+class TestGameDirectory(TestCase):
+
+    def setUp(self):
+        self.directory = GameDirectory(max_finished=2)
+        self.games = {}
+        for i in range(5):
+            self.add_game(f'game-{i}', max_players=4)
+
+    def add_game(self, name, max_players=None, nb_players=1):
+        game = Game(name, FakeNotifier(),
+                    settings=GameSettings(max_players=max_players))
+        for i in range(nb_players):
+            game.add_player(Player(f'player-{i}'))
+        self.directory.add(game)
+        game.add_listener(self.directory, GameDirectory.events)
+        self.games[name] = game
+        return game
+
+    def names(self, page):
+        return [game['name'] for game in page['games']]
+
+    def test_pages_should_follow_the_cursor(self):
+        first = self.directory.list('lobby', limit=2)
+        second = self.directory.list('lobby', cursor=first['cursor'], limit=2)
+        last = self.directory.list('lobby', cursor=second['cursor'], limit=2)
+        self.assertEqual(self.names(first), ['game-0', 'game-1'])
+        self.assertEqual(self.names(second), ['game-2', 'game-3'])
+        self.assertEqual(self.names(last), ['game-4'])
+        self.assertIsNone(last['cursor'])
+        self.assertEqual(first['total'], 5)
+
+    def test_cursor_should_survive_removed_games(self):
+        first = self.directory.list('lobby', limit=2)
+        self.directory.remove('game-1')
+        self.directory.remove('game-2')
+        second = self.directory.list('lobby', cursor=first['cursor'], limit=2)
+        self.assertEqual(self.names(second), ['game-3', 'game-4'])
+
+    def test_games_should_be_filtered_by_open_seats(self):
+        for i in range(1, 4):
+            self.games['game-1'].add_player(Player(f'other-{i}'))
+        self.games['game-2'].add_player(Player('other'))
+        page = self.directory.list('lobby', min_seats=3)
+        self.assertEqual(self.names(page), ['game-0', 'game-3', 'game-4'])
+        self.assertEqual(page['games'][0]['open_seats'], 3)
+
+    def test_unlimited_game_should_have_open_seats(self):
+        self.add_game('open', nb_players=10)
+        page = self.directory.list('lobby', min_seats=4, limit=10)
+        self.assertEqual(self.names(page)[-1], 'open')
+        self.assertIsNone(page['games'][-1]['open_seats'])
+
+    def test_started_game_should_be_running(self):
+        game = self.add_game('started', nb_players=4)
+        game.start()
+        self.assertEqual(self.names(self.directory.list('running')),
+                         ['started'])
+        self.assertNotIn('started', self.names(self.directory.list('lobby')))
+
+    def test_finished_games_should_be_bounded(self):
+        for name in ('game-0', 'game-1', 'game-2'):
+            self.directory.finish(self.games[name])
+        page = self.directory.list('finished')
+        self.assertEqual(self.names(page), ['game-1', 'game-2'])
+        self.assertEqual(self.directory.counts(),
+                         {'lobby': 2, 'running': 0, 'finished': 2})
+
+    def test_first_page_should_be_cached_until_a_change(self):
+        first = self.directory.list('lobby')
+        self.assertIs(self.directory.list('lobby'), first)
+        self.games['game-0'].add_player(Player('other'))
+        page = self.directory.list('lobby')
+        self.assertIsNot(page, first)
+        self.assertEqual(page['games'][0]['players'], 2)
+
+    def test_unknown_state_should_be_rejected(self):
+        with self.assertRaises(ValueError):
+            self.directory.list('closed')
+
+    def test_full_lobbies_should_not_be_scanned(self):
+        for i in range(1, 4):
+            self.games['game-0'].add_player(Player(f'other-{i}'))
+        self.assertEqual(len(self.directory._open), 4)
+        self.directory.remove('game-1')
+        self.games['game-2'].start()
+        self.assertEqual(len(self.directory._open), 2)
+        page = self.directory.list('lobby', min_seats=1)
+        self.assertEqual(self.names(page), ['game-3', 'game-4'])
+        self.assertEqual(page['total'], 3)
@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from werewolf.eviction import GameReaper, game_stage
+from werewolf.models import Game, Player
+
+from .test_models import BaseTestGame, FakeNotifier
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGameStage(BaseTestGame):
+
+    def test_game_not_started_should_be_in_lobby(self):
+        self.assertEqual(game_stage(self.game), 'lobby')
+
+    def test_started_game_should_wait_for_players(self):
+        self.game.start()
+        self.game.player_listen_topic('Tom')
+        self.assertEqual(game_stage(self.game), 'waiting')
+
+    def test_game_should_run_when_all_players_listen(self):
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+        self.assertEqual(game_stage(self.game), 'running')
+
+
+class TestGameReaper(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.evicted = []
+        self.reaper = GameReaper(
+            lambda game, reason: self.evicted.append((game.name, reason)),
+            lobby_ttl=100,
+            waiting_ttl=10,
+            running_ttl=50,
+            max_games=3,
+            clock=self.clock)
+
+    def add_game(self, name):
+        game = Game(name, FakeNotifier())
+        game.add_player(Player('Tom'))
+        self.reaper.add(game)
+        return game
+
+    def test_idle_game_should_be_evicted_after_its_ttl(self):
+        self.add_game('g1')
+        self.clock.now = 99
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [])
+        self.clock.now = 100
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [('g1', 'lobby')])
+        self.assertEqual(self.reaper.evictions, {'lobby': 1})
+        self.assertEqual(len(self.reaper), 0)
+
+    def test_ttl_should_depend_on_the_stage(self):
+        self.add_game('g1')
+        game = self.add_game('g2')
+        game.add_player(Player('Lea'))
+        game.add_player(Player('Bob'))
+        game.start()
+        self.clock.now = 10
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [('g2', 'waiting')])
+
+    def test_touch_should_delay_the_eviction(self):
+        self.add_game('g1')
+        self.clock.now = 60
+        self.reaper.touch('g1')
+        self.clock.now = 120
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [])
+        self.clock.now = 160
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [('g1', 'lobby')])
+
+    def test_least_recently_used_game_should_be_evicted_over_capacity(self):
+        self.add_game('g1')
+        self.add_game('g2')
+        self.add_game('g3')
+        self.reaper.touch('g1')
+        self.add_game('g4')
+        self.assertEqual(self.evicted, [('g2', 'capacity')])
+        self.assertEqual(self.reaper.evictions, {'capacity': 1})
+
+    def test_removed_game_should_not_be_evicted(self):
+        self.add_game('g1')
+        self.reaper.remove('g1')
+        self.clock.now = 1000
+        self.reaper.reap()
+        self.assertEqual(self.evicted, [])
@@ -0,0 +1,118 @@
+import tempfile
+from unittest import TestCase
+
+from werewolf.journal import Journal, read_segment, replay_games
+from werewolf.models import Game, Player
+
+from .test_models import FakeNotifier, role_dispatcher
+
+
+class BaseTestJournal(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.journal = Journal(self.directory.name)
+        self.addCleanup(self.journal.close)
+
+    def play(self, name, done=False):
+        game = Game(name=name, notifier=FakeNotifier(), role_dispatcher=role_dispatcher)
+        self.journal.game_created(game)
+        for player_name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            game.add_player(Player(player_name))
+        game.start()
+        for player_name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            game.player_listen_topic(player_name)
+        game.enter_in_next_phase()
+        game.select_player_from_name('Tom', 'Bob')
+        if done:
+            game.close_the_current_phase()
+            game.enter_in_next_phase()
+            game.select_player_from_name('Bob', 'Lea')
+            game.close_the_current_phase()
+            self.journal.game_done(game)
+        return game
+
+
+class TestJournal(BaseTestJournal):
+
+    def test_events_should_be_replayed_in_order(self):
+        self.play('part')
+        events = [event for _, _, event, _ in self.journal.replay()]
+        self.assertEqual(events[:3], ['game_created', 'player_added', 'player_added'])
+        self.assertEqual(events[-3:], ['phase_entered', 'player_selected', 'quorum_reached'])
+
+    def test_truncated_record_should_be_ignored(self):
+        self.play('part')
+        path = self.journal.segments()[-1]
+        records = list(read_segment(path))
+        with open(path, 'ab') as segment:
+            segment.write(b'\x10\x00\x00\x00abc')
+        self.assertEqual(list(read_segment(path)), records)
+
+    def test_running_game_should_be_rebuilt(self):
+        game = self.play('part')
+        notifier = FakeNotifier()
+        games = replay_games(self.journal.replay(), lambda: notifier)
+        self.assertEqual(games['part'].to_state(), game.to_state())
+
+    def test_done_game_should_not_be_rebuilt(self):
+        self.play('part', done=True)
+        self.assertEqual(replay_games(self.journal.replay(), FakeNotifier), {})
+
+
+class TestJournalRotation(BaseTestJournal):
+
+    def setUp(self):
+        super().setUp()
+        self.journal.segment_size = 256
+
+    def test_segments_should_be_rotated(self):
+        self.play('part')
+        self.assertGreater(len(self.journal.segments()), 1)
+
+    def test_records_of_done_games_should_be_removed(self):
+        self.play('part', done=True)
+        self.play('other')
+        games = {record[1] for record in self.journal.replay()}
+        self.assertEqual(games, {'other'})
+
+    def test_game_done_should_not_compact(self):
+        game = self.play('part')
+        self.journal.game_done(game)
+        self.assertEqual(self.journal.compactions, 0)
+        self.play('other')
+        self.assertEqual(self.journal.compactions, 1)
+
+    def test_segments_of_done_games_should_be_deleted(self):
+        game = self.play('part')
+        self.journal.segment_size = 1
+        self.journal.game_done(game)
+        self.assertEqual(len(self.journal.segments()), 1)
+        self.assertEqual(list(self.journal.replay()), [])
+
+    def test_existing_segments_should_be_reopened(self):
+        game = self.play('part')
+        self.journal.close()
+        journal = Journal(self.directory.name, segment_size=256)
+        self.addCleanup(journal.close)
+        games = replay_games(journal.replay(), FakeNotifier)
+        self.assertEqual(games['part'].to_state(), game.to_state())
+
+    def test_done_games_should_be_compacted_after_reopening(self):
+        game = self.play('part')
+        self.journal.game_done(game)
+        self.journal.close()
+        journal = Journal(self.directory.name, segment_size=256)
+        self.addCleanup(journal.close)
+        self.journal = journal
+        self.play('other')
+        games = {record[1] for record in journal.replay()}
+        self.assertEqual(games, {'other'})
+
+    def test_empty_segment_should_be_deleted(self):
+        self.journal.close()
+        self.assertEqual(self.journal.segments(), [])
+        for _ in range(2):
+            Journal(self.directory.name).close()
+        self.assertEqual(self.journal.segments(), [])
@@ -0,0 +1,231 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from autobahn.wamp.exception import ApplicationError
+from autobahn.wamp.types import PublishOptions, RegisterOptions, SubscribeOptions
+
+from werewolf.controller import Controller, WampNotifier
+from werewolf.local_router import LocalComponent, LocalRouter
+from werewolf.models import Game, Player
+
+
+class TestLocalRouter(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.router = LocalRouter()
+        self.callee = self.router.session()
+        self.caller = self.router.session()
+        self.events = []
+
+    def on_event(self, *args, **kwargs):
+        self.events.append((args, kwargs))
+
+    async def test_call_should_return_the_result_of_the_endpoint(self):
+        async def add(a, b):
+            return a + b
+        await self.callee.register(add, 'com.add')
+        self.assertEqual(await self.caller.call('com.add', 1, 2), 3)
+
+    async def test_unknown_procedure_should_raise(self):
+        with self.assertRaises(ApplicationError) as context:
+            await self.caller.call('com.add', 1, 2)
+        self.assertEqual(context.exception.error, ApplicationError.NO_SUCH_PROCEDURE)
+
+    async def test_shared_registrations_should_be_invoked_in_turn(self):
+        shared = RegisterOptions(invoke='roundrobin')
+        await self.callee.register(lambda: 1, 'com.worker', options=shared)
+        await self.callee.register(lambda: 2, 'com.worker', options=shared)
+        results = [await self.caller.call('com.worker') for _ in range(3)]
+        self.assertEqual(results, [1, 2, 1])
+
+    async def test_second_single_registration_should_fail(self):
+        await self.callee.register(lambda: 1, 'com.worker')
+        with self.assertRaises(ApplicationError):
+            await self.callee.register(lambda: 2, 'com.worker')
+
+    async def test_events_should_be_delivered_after_publish(self):
+        await self.callee.subscribe(self.on_event, 'com.game.players')
+        self.caller.publish('com.game.players', {'seq': 1})
+        self.assertEqual(self.events, [])
+        await asyncio.sleep(0)
+        self.assertEqual(self.events, [(({'seq': 1}, ), {})])
+
+    async def test_prefix_subscription_should_receive_the_topic(self):
+        await self.callee.subscribe(self.on_event, 'com.game.close_phase',
+                                    options=SubscribeOptions(match='prefix', details=True))
+        self.caller.publish('com.game.close_phase.seer', {'killed': 'Tom'})
+        self.caller.publish('com.game.players', {'seq': 1})
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0][1]['details'].topic, 'com.game.close_phase.seer')
+
+    async def test_publisher_should_be_excluded(self):
+        await self.caller.subscribe(self.on_event, 'com.game.players')
+        self.caller.publish('com.game.players', {'seq': 1})
+        await asyncio.sleep(0)
+        self.assertEqual(self.events, [])
+
+    async def test_acknowledged_publish_should_return_a_future(self):
+        publication = await self.caller.publish('com.game.players', {'seq': 1},
+                                                options=PublishOptions(acknowledge=True))
+        self.assertIsNotNone(publication.id)
+
+
+class TestControllerOnLocalRouter(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.router = LocalRouter()
+        self.component = LocalComponent(self.router)
+        self.controller = Controller(self.component)
+        await self.component.start()
+        self.client = self.router.session()
+
+    async def asyncTearDown(self):
+        await self.component.stop()
+        self.controller._queued_notifier.close()
+
+    async def test_players_update_should_be_delivered(self):
+        updates = []
+        await self.client.subscribe(updates.append, 'com.werewolf.part.players')
+        self.controller._queued_notifier.pause()
+        await self.client.call('com.werewolf.create_game', 'part', 'Tom')
+        await self.client.call('com.werewolf.join_game', 'part', 'Lea')
+        self.controller._queued_notifier.resume()
+        await self.controller._queued_notifier.join()
+        await asyncio.sleep(0)
+        self.assertEqual([update['seq'] for update in updates], [2])
+        self.assertEqual(updates[0]['since'], 1)
+
+    async def test_create_and_join_should_return_the_players_snapshot(self):
+        created = await self.client.call('com.werewolf.create_game', 'part', 'Tom')
+        joined = await self.client.call('com.werewolf.join_game', 'part', 'Lea')
+        self.assertEqual((created['seq'], joined['seq']), (1, 2))
+        self.assertEqual([player['name'] for player in joined['players']],
+                         ['Tom', 'Lea'])
+
+    async def test_created_game_should_be_listed(self):
+        await self.client.call('com.werewolf.create_game', 'part', 'Tom',
+                               {'max_players': 2})
+        page = await self.client.call('com.werewolf.list_games', 'lobby', 1)
+        self.assertEqual(page['games'], [{'name': 'part', 'state': 'lobby',
+                                          'players': 1, 'open_seats': 1}])
+
+
+class BaseTestRunningGame(IsolatedAsyncioTestCase):
+    controller_options = {}
+
+    async def asyncSetUp(self):
+        self.router = LocalRouter()
+        self.component = LocalComponent(self.router)
+        self.controller = Controller(self.component, **self.controller_options)
+        await self.component.start()
+        self.client = self.router.session()
+        settings = {'pause_duration': 0.01, 'default_phase_duration': 10}
+        await self.client.call('com.werewolf.create_game', 'part', 'Tom', settings)
+        # Two werewolves, so a single elector does not reach the quorum.
+        names = ('Tom', 'Lea', 'Bob', 'Isa', 'Max', 'Eve', 'Ada', 'Leo')
+        for name in names[1:]:
+            await self.client.call('com.werewolf.join_game', 'part', name)
+        await self.client.call('com.werewolf.start_game', 'part')
+        for name in names:
+            await self.client.call('com.werewolf.player_listen_topic', 'part', name)
+        self.game = self.controller._games['part']
+        while not self.game.phase_open:
+            await asyncio.sleep(0.005)
+
+    async def asyncTearDown(self):
+        await self.component.stop()
+        self.controller._queued_notifier.close()
+
+
+class TestControllerGameState(BaseTestRunningGame):
+
+    async def test_leader_should_be_seen_by_the_phase_audience(self):
+        phase = self.game.current_phase
+        elector = phase.actives[0].name
+        selected = phase.selectables[0].name
+        await self.client.call('com.werewolf.select_player', 'part', selected, elector)
+        state = await self.client.call('com.werewolf.get_game_state', 'part', elector)
+        self.assertEqual(state['state']['leader'], selected)
+        other = next(player.name for player in self.game.get_players()
+                     if player.role is not phase.role)
+        state = await self.client.call('com.werewolf.get_game_state', 'part', other)
+        self.assertIsNone(state['state']['leader'])
+
+
+class TestControllerCoalescing(BaseTestRunningGame):
+    controller_options = {'coalesce_window': 0.05}
+
+    async def test_toggles_should_be_coalesced(self):
+        phase = self.game.current_phase
+        role = phase.role.value
+        elector = phase.actives[0].name
+        selected = phase.selectables[0].name
+        messages = []
+        prefix = f'com.werewolf.part.role.{role}'
+        await self.client.subscribe(messages.append, f'{prefix}.select_player')
+        await self.client.subscribe(messages.append, f'{prefix}.select_players')
+        for _ in range(9):
+            await self.client.call('com.werewolf.select_player', 'part', selected, elector)
+        await asyncio.sleep(0.1)
+        await self.controller._queued_notifier.join()
+        await asyncio.sleep(0)
+        self.assertEqual(messages, [[{'name': selected, 'state': 'alive', 'selected': 1}]])
+
+
+class TestControllerSelectionLimits(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.router = LocalRouter()
+        self.component = LocalComponent(self.router)
+        self.controller = Controller(self.component, elector_rate=1,
+                                     elector_burst=1)
+        await self.component.start()
+        self.client = self.router.session()
+        await self.client.call('com.werewolf.create_game', 'part', 'Tom')
+        await self.client.call('com.werewolf.join_game', 'part', 'Lea')
+
+    async def asyncTearDown(self):
+        await self.component.stop()
+        self.controller._queued_notifier.close()
+
+    async def test_selections_beyond_the_burst_should_be_rejected(self):
+        with self.assertRaises(ApplicationError) as context:
+            await self.client.call('com.werewolf.select_player', 'part', 'Lea', 'Tom')
+        self.assertNotEqual(context.exception.error,
+                            'com.werewolf.error.too_many_selections')
+        with self.assertRaises(ApplicationError) as context:
+            await self.client.call('com.werewolf.select_player', 'part', 'Lea', 'Tom')
+        self.assertEqual(context.exception.error,
+                         'com.werewolf.error.too_many_selections')
+        samples = self.controller.metrics.snapshot()['selections_rejected_total']['samples']
+        self.assertEqual(samples, [{'labels': {'reason': 'elector'}, 'value': 1}])
+
+
+class TestWampNotifierTopics(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.router = LocalRouter()
+        self.client = self.router.session()
+        self.notifier = WampNotifier(self.router.session())
+        self.game = Game('part', self.notifier)
+        self.game.add_player(Player('Tom'))
+        self.notifier.add_game(self.game)
+
+    async def test_topics_should_be_built_once(self):
+        topics = self.notifier.topics('part')
+        self.assertIs(topics.role('werewolf', 'enter_in_phase.werewolf'),
+                      topics.role('werewolf', 'enter_in_phase.werewolf'))
+        self.assertIs(topics.user('Tom', 'start_game'),
+                      topics.user('Tom', 'start_game'))
+
+    async def test_events_should_be_published_to_game_topics(self):
+        received = []
+        await self.client.subscribe(received.append, 'com.werewolf.part.evicted')
+        await self.client.subscribe(received.append,
+                                    'com.werewolf.part.role.seer.select_player')
+        self.notifier.send_to_game('part', 'evicted', {'reason': 'lobby'})
+        self.notifier.remove_game('part')
+        self.notifier.send_to_role('part', 'seer', 'select_player', {'name': 'Tom'})
+        await asyncio.sleep(0)
+        self.assertEqual(received, [{'reason': 'lobby'}, {'name': 'Tom'}])
@@ -0,0 +1,95 @@
+from unittest import TestCase
+
+from werewolf.metrics import GameMetrics, Histogram, Metrics
+
+from .test_models import BaseTestGame
+
+
+class TestHistogram(TestCase):
+
+    def test_quantiles_should_be_close_to_exact_values(self):
+        histogram = Histogram()
+        for value in range(1, 10001):
+            histogram.observe(value / 1000)
+        for q, expected in ((0.5, 5.0), (0.9, 9.0), (0.99, 9.9)):
+            self.assertAlmostEqual(histogram.quantile(q), expected,
+                                   delta=expected / 16)
+        self.assertEqual(histogram.quantile(1), 10.0)
+
+    def test_zero_should_be_counted(self):
+        histogram = Histogram()
+        histogram.observe(0)
+        histogram.observe(0)
+        histogram.observe(3)
+        self.assertEqual(histogram.quantile(0.5), 0)
+        self.assertEqual(histogram.cumulative_buckets()[0], (0.0, 2))
+
+    def test_empty_histogram_should_not_have_quantiles(self):
+        self.assertEqual(Histogram().snapshot(),
+                         {'count': 0, 'sum': 0.0, 'min': None, 'max': None,
+                          'p50': None, 'p90': None, 'p99': None, 'p99.9': None})
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_same_name_and_labels_should_return_the_same_metric(self):
+        counter = self.metrics.counter('publishes_total', subject='a')
+        self.assertIs(self.metrics.counter('publishes_total', subject='a'), counter)
+        self.assertIsNot(self.metrics.counter('publishes_total', subject='b'), counter)
+
+    def test_name_should_have_one_type(self):
+        self.metrics.counter('games')
+        with self.assertRaises(ValueError):
+            self.metrics.gauge('games')
+
+    def test_gauge_should_call_its_function(self):
+        games = ['g1', 'g2']
+        self.metrics.gauge('games', lambda: len(games))
+        self.assertEqual(self.metrics.snapshot()['games'],
+                         {'type': 'gauge',
+                          'samples': [{'labels': {}, 'value': 2}]})
+
+    def test_prometheus_text(self):
+        self.metrics.counter('publishes_total', subject='close_phase').inc(3)
+        self.metrics.histogram('rpc_duration_seconds', procedure='join_game').observe(0.75)
+        self.assertEqual(
+            self.metrics.to_prometheus().splitlines(),
+            ['# TYPE werewolf_publishes_total counter',
+             'werewolf_publishes_total{subject="close_phase"} 3.0',
+             '# TYPE werewolf_rpc_duration_seconds histogram',
+             'werewolf_rpc_duration_seconds_bucket{procedure="join_game",le="0.78125"} 1',
+             'werewolf_rpc_duration_seconds_bucket{procedure="join_game",le="+Inf"} 1',
+             'werewolf_rpc_duration_seconds_sum{procedure="join_game"} 0.75',
+             'werewolf_rpc_duration_seconds_count{procedure="join_game"} 1'])
+
+
+class TestGameMetrics(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.metrics = Metrics()
+        self.game.add_listener(GameMetrics(self.metrics), GameMetrics.events)
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.game.select_player_from_name('Tom', 'Bob')
+        self.game.close_the_current_phase()
+
+    def test_selections_per_phase_should_be_observed(self):
+        histogram = self.metrics.histogram('selections_per_phase', phase='werewolf')
+        self.assertEqual((histogram.count, histogram.sum), (1, 3))
+        self.assertEqual(
+            self.metrics.counter('game_events_total', event='player_selected').value, 3)
+
+    def test_phase_duration_should_be_observed(self):
+        histogram = self.metrics.histogram('phase_duration_seconds', phase='werewolf')
+        self.assertEqual(histogram.count, 1)
+
+    def test_players_per_game_should_be_observed(self):
+        self.assertEqual(self.metrics.histogram('players_per_game').sum, 4)
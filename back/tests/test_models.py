@@ -1,7 +1,9 @@
+import asyncio
 import pprint
 from unittest import TestCase
 
-from werewolf.models import Game, Notifier, Player, Role
+from werewolf.models import (Game, GameSettings, Notifier, Player,
+                             PlayerRegistry, PlayerState, Role, VoteTally)
 
 
 class FakeNotifier(Notifier):
@@ -46,13 +48,42 @@ class FakeNotifier(Notifier):
         del self.messages_sent[:]
 
 
-class BaseTestGame(TestCase):
+def role_dispatcher(players):
+    for p, r in zip(players, (Role.villager, Role.seer, Role.werewolf, Role.villager)):
+        p.role = r
+
+
+class TestPlayer(TestCase):
 
     def setUp(self):
-        def role_dispatcher(players):
-            for p, r in zip(players, (Role.villager, Role.seer, Role.werewolf, Role.villager)):
-                p.role = r
+        self.player = Player('Tom')
+        self.player.role = Role.seer
+
+    def test_public_dict_should_not_contain_role(self):
+        self.assertEqual(self.player.public_dict(),
+                         {'name': 'Tom', 'state': 'alive', 'selected': 0})
+
+    def test_public_dict_should_be_cached(self):
+        self.assertIs(self.player.public_dict(), self.player.public_dict())
+
+    def test_selection_should_invalidate_cache(self):
+        self.player.public_dict()
+        self.player.select('Lea')
+        self.assertEqual(self.player.public_dict()['selected'], 1)
 
+    def test_state_should_invalidate_cache(self):
+        self.player.private_dict()
+        self.player.state = PlayerState.dead
+        self.assertEqual(self.player.private_dict()['state'], 'dead')
+
+    def test_to_dict_should_accept_field_names(self):
+        self.assertEqual(self.player.to_dict(without=('selected', 'state')),
+                         {'name': 'Tom', 'role': 'seer'})
+
+
+class BaseTestGame(TestCase):
+
+    def setUp(self):
         self.notifier = FakeNotifier()
         self.game = Game(
             name='part',
@@ -89,6 +120,12 @@ class TestGameStart(BaseTestGame):
     def test_player_isa_sould_be_werewolf(self):
         self.assertIs(self.players['Isa'].role, Role.villager)
 
+    def test_second_start_should_not_dispatch_roles_again(self):
+        self.game.role_dispatcher = None
+        with self.assertRaisesRegex(ValueError, 'already started'):
+            self.game.start()
+        self.assertIs(self.players['Bob'].role, Role.werewolf)
+
     def test_player_tom_sould_be_notify_with_role_villager(self):
         expected = {'name': 'Tom',
                     'role': 'villager',
@@ -167,7 +204,29 @@ class TestCloseInWerewolfPhaseGame(BaseTestGame):
             'part.close_phase.werewolf',
             {'killed': 'Tom',
              'resurrected': None,
-             'winner': None})
+             'winner': None,
+             'alive': {'werewolf': 1, 'seer': 1, 'villager': 1}})
+
+
+class TestGameStatus(BaseTestGame):
+
+    def test_status_before_start(self):
+        self.assertEqual(self.game.get_status(),
+                         {'phase': None,
+                          'players': 4,
+                          'alive': {'werewolf': 0, 'seer': 0, 'villager': 0},
+                          'winner': None})
+
+    def test_status_after_werewolf_phase(self):
+        self.game.start()
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Tom', 'Bob')
+        self.game.close_the_current_phase()
+        self.assertEqual(self.game.get_status(),
+                         {'phase': 'werewolf',
+                          'players': 4,
+                          'alive': {'werewolf': 1, 'seer': 1, 'villager': 1},
+                          'winner': None})
 
 
 class TestEnterInSeerPhaseGame(BaseTestGame):
@@ -220,7 +279,8 @@ class TestCloseSeerPhaseGameResurrectingTom(BaseTestGame):
             'part.close_phase.seer',
             {'killed': None,
              'resurrected': 'Tom',
-             'winner': None})
+             'winner': None,
+             'alive': {'werewolf': 1, 'seer': 1, 'villager': 2}})
 
 
 class TestCloseSeerPhaseGameKillingBob(BaseTestGame):
@@ -241,7 +301,8 @@ class TestCloseSeerPhaseGameKillingBob(BaseTestGame):
             'part.close_phase.seer',
             {'killed': 'Bob',
              'resurrected': None,
-             'winner': 'villager'})
+             'winner': 'villager',
+             'alive': {'werewolf': 0, 'seer': 1, 'villager': 1}})
 
 
 class TestCloseSeerPhaseGameKillingIsa(BaseTestGame):
@@ -262,4 +323,297 @@ class TestCloseSeerPhaseGameKillingIsa(BaseTestGame):
             'part.close_phase.seer',
             {'killed': 'Isa',
              'resurrected': None,
-             'winner': 'werewolf'})
+             'winner': 'werewolf',
+             'alive': {'werewolf': 1, 'seer': 1, 'villager': 0}})
+
+
+class TestAddPlayer(BaseTestGame):
+
+    def test_player_name_should_be_unique(self):
+        with self.assertRaises(ValueError):
+            self.game.add_player(Player(name='Tom'))
+
+    def test_rejected_player_should_not_be_added(self):
+        try:
+            self.game.add_player(Player(name='Tom'))
+        except ValueError:
+            pass
+        self.assertEqual(
+            [p.name for p in self.game.get_players()],
+            ['Tom', 'Lea', 'Bob', 'Isa'])
+
+
+class TestAddPlayers(BaseTestGame):
+
+    def test_players_should_be_sent_in_one_update(self):
+        self.notifier.reset()
+        errors = self.game.add_players([Player(name='Max'), Player(name='Eve')])
+        self.assertEqual(errors, [None, None])
+        self.assertEqual(self.notifier.messages_sent, [
+            ('part.players',
+             {'seq': 5,
+              'added': [{'name': 'Max', 'selected': 0, 'state': 'alive'},
+                        {'name': 'Eve', 'selected': 0, 'state': 'alive'}],
+              'removed': []})])
+
+    def test_rejected_player_should_not_prevent_others(self):
+        errors = self.game.add_players([Player(name='Tom'), Player(name='Max')])
+        self.assertIsInstance(errors[0], ValueError)
+        self.assertIsNone(errors[1])
+        self.assertEqual(
+            [p.name for p in self.game.get_players()],
+            ['Tom', 'Lea', 'Bob', 'Isa', 'Max'])
+
+    def test_full_game_should_reject_players(self):
+        self.game.settings.max_players = 5
+        errors = self.game.add_players([Player(name='Max'), Player(name='Eve')])
+        self.assertIsNone(errors[0])
+        self.assertRegex(str(errors[1]), 'is full')
+        self.assertEqual(self.game.open_seats, 0)
+
+    def test_no_update_should_be_sent_without_added_player(self):
+        self.notifier.reset()
+        self.game.add_players([Player(name='Tom')])
+        self.assertEqual(self.notifier.messages_sent, [])
+
+
+class TestPlayersUpdate(BaseTestGame):
+
+    def test_join_should_send_added_player(self):
+        self.notifier.assert_message_sent(
+            'part.players',
+            {'seq': 4,
+             'added': [{'name': 'Isa', 'selected': 0, 'state': 'alive'}],
+             'removed': []})
+
+    def test_leave_should_send_removed_player(self):
+        self.game.remove_player('Lea')
+        self.notifier.assert_message_sent(
+            'part.players',
+            {'seq': 5, 'added': [], 'removed': ['Lea']})
+
+    def test_snapshot_should_list_players_and_last_seq(self):
+        self.game.remove_player('Lea')
+        snapshot = self.game.get_players_snapshot()
+        self.assertEqual(snapshot['seq'], 5)
+        self.assertEqual([p['name'] for p in snapshot['players']],
+                         ['Tom', 'Bob', 'Isa'])
+
+    def test_player_cannot_leave_started_game(self):
+        self.game.start()
+        with self.assertRaises(ValueError):
+            self.game.remove_player('Lea')
+
+
+class TestSelectPlayerInWerewolfPhaseGame(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.game.enter_in_next_phase()
+
+    def test_inactive_player_cannot_select(self):
+        with self.assertRaisesRegex(ValueError, 'cannot select'):
+            self.game.select_player_from_name('Lea', 'Tom')
+
+    def test_unknown_player_cannot_be_selected(self):
+        with self.assertRaisesRegex(ValueError, 'does not exist'):
+            self.game.select_player_from_name('Max', 'Bob')
+
+    def test_werewolf_cannot_be_selected_by_werewolf(self):
+        with self.assertRaisesRegex(ValueError, 'is not selectable'):
+            self.game.select_player_from_name('Bob', 'Bob')
+
+    def test_most_selected_player_should_be_the_leader(self):
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.assertIs(self.game.get_leader(), self.players['Lea'])
+
+    def test_selecting_twice_should_unselect(self):
+        self.game.select_player_from_name('Tom', 'Bob')
+        self.game.select_player_from_name('Tom', 'Bob')
+        self.assertEqual(self.players['Tom'].selected, 0)
+
+
+class TestSelectPlayersInVillagerPhaseGame(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        while True:
+            self.game.enter_in_next_phase()
+            if not self.game.current_phase.is_night:
+                break
+            self.game.close_the_current_phase()
+        self.notifier.reset()
+
+    def test_votes_should_be_sent_in_one_message(self):
+        results = self.game.select_players_from_names(
+            [('Bob', 'Tom'), ('Bob', 'Lea'), ('Lea', 'Bob')])
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(self.notifier.messages_sent, [
+            ('part.select_players',
+             [{'name': 'Bob', 'state': 'alive', 'selected': 2},
+              {'name': 'Lea', 'state': 'alive', 'selected': 1}])])
+
+    def test_toggled_player_should_not_be_notified(self):
+        self.game.select_players_from_names(
+            [('Bob', 'Tom'), ('Lea', 'Isa'), ('Bob', 'Tom')])
+        self.assertEqual(self.notifier.messages_sent, [
+            ('part.select_players',
+             [{'name': 'Lea', 'state': 'alive', 'selected': 1}])])
+
+    def test_damped_players_should_be_counted_at_close(self):
+        closed = []
+        self.game.add_listener(lambda game, event, details: closed.append(details),
+                               ['phase_closed'])
+        self.game.select_players_from_names([('Bob', 'Tom'), ('Bob', 'Tom')])
+        self.game.close_the_current_phase()
+        self.assertEqual(closed[0]['selections'], 2)
+        self.assertEqual(closed[0]['damped'], 1)
+
+    def test_invalid_vote_should_be_returned(self):
+        results = self.game.select_players_from_names(
+            [('Max', 'Tom'), ('Bob', 'Tom')])
+        self.assertIsInstance(results[0], ValueError)
+        self.assertTrue(results[1])
+        self.assertEqual(self.players['Bob'].selected, 1)
+
+    def test_quorum_should_be_reached_once(self):
+        events = []
+        self.game.add_listener(lambda game, event, details: events.append(event))
+        self.game.select_players_from_names(
+            [('Bob', 'Tom'), ('Bob', 'Lea'), ('Bob', 'Isa'), ('Lea', 'Bob')])
+        self.assertEqual(events.count('player_selected'), 4)
+        self.assertEqual(events.count('quorum_reached'), 1)
+
+
+class TestSelectionBetweenPhases(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.game.enter_in_next_phase()
+        self.game.close_the_current_phase()
+
+    def test_selection_should_be_rejected_after_close(self):
+        with self.assertRaisesRegex(ValueError, 'No phase'):
+            self.game.select_player_from_name('Lea', 'Bob')
+        results = self.game.select_players_from_names([('Lea', 'Bob')])
+        self.assertIsInstance(results[0], ValueError)
+
+    def test_enter_should_reset_the_votes_of_the_phase(self):
+        werewolf_phase = self.game.current_phase
+        # A vote left in the tally, as restored from an older snapshot
+        werewolf_phase._select('Lea', 'Bob')
+        for _ in range(2):  # seer and villager phases
+            self.game.enter_in_next_phase()
+            self.game.close_the_current_phase()
+        self.game.enter_in_next_phase()
+        self.assertIs(self.game.current_phase, werewolf_phase)
+        self.assertIsNone(self.game.get_leader())
+        self.assertEqual(werewolf_phase.tally.votes('Lea'), 0)
+        self.assertEqual(self.players['Lea'].selected, 0)
+
+
+class TestVoteTally(TestCase):
+
+    def setUp(self):
+        self.players = PlayerRegistry()
+        for name in ('Tom', 'Lea', 'Bob'):
+            self.players.add(Player(name))
+        self.tally = VoteTally(self.players)
+
+    def test_no_leader_without_vote(self):
+        self.assertIsNone(self.tally.leader)
+
+    def test_most_selected_player_should_lead(self):
+        self.tally.add(self.players.get('Bob'), 1)
+        self.tally.add(self.players.get('Bob'), 1)
+        self.tally.add(self.players.get('Lea'), 1)
+        self.assertEqual(self.tally.leader.name, 'Bob')
+
+    def test_tie_should_be_broken_by_join_order(self):
+        self.tally.add(self.players.get('Bob'), 1)
+        self.tally.add(self.players.get('Lea'), 1)
+        self.assertEqual(self.tally.leader.name, 'Lea')
+
+    def test_unselected_player_should_lose_the_lead(self):
+        self.tally.add(self.players.get('Lea'), 1)
+        self.tally.add(self.players.get('Bob'), 1)
+        self.tally.add(self.players.get('Lea'), -1)
+        self.assertEqual(self.tally.leader.name, 'Bob')
+
+    def test_leader_should_survive_many_toggles(self):
+        for _ in range(100):
+            self.tally.add(self.players.get('Tom'), 1)
+            self.tally.add(self.players.get('Tom'), -1)
+        self.tally.add(self.players.get('Bob'), 1)
+        self.assertEqual(self.tally.leader.name, 'Bob')
+
+    def test_reset_should_remove_votes(self):
+        self.tally.add(self.players.get('Bob'), 1)
+        self.tally.reset()
+        self.assertIsNone(self.tally.leader)
+        self.assertEqual(self.tally.votes('Bob'), 0)
+
+
+class TestQuorumInVillagerPhaseGame(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Tom', 'Bob')
+        self.game.close_the_current_phase()
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Tom', 'Lea')
+        self.game.close_the_current_phase()
+        self.game.enter_in_next_phase()
+
+    def assert_quorum_reached(self, expected):
+        async def wait_for_quorum():
+            try:
+                await asyncio.wait_for(self.game.wait_for_quorum(), 0.01)
+            except asyncio.TimeoutError:
+                return False
+            return True
+        self.assertIs(asyncio.run(wait_for_quorum()), expected)
+
+    def test_quorum_should_not_be_reached_until_all_actives_vote(self):
+        for elector in ('Tom', 'Lea', 'Bob'):
+            self.game.select_player_from_name('Bob', elector)
+        self.assert_quorum_reached(False)
+
+    def test_quorum_should_be_reached_when_all_actives_vote(self):
+        for elector in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.select_player_from_name('Bob', elector)
+        self.assert_quorum_reached(True)
+
+    def test_unselecting_should_withdraw_the_vote(self):
+        self.game.select_player_from_name('Bob', 'Tom')
+        self.game.select_player_from_name('Bob', 'Tom')
+        for elector in ('Lea', 'Bob', 'Isa'):
+            self.game.select_player_from_name('Bob', elector)
+        self.assert_quorum_reached(False)
+
+    def test_quorum_ratio_should_be_configurable(self):
+        self.game.settings.quorum = 0.5
+        for elector in ('Tom', 'Lea'):
+            self.game.select_player_from_name('Bob', elector)
+        self.assert_quorum_reached(True)
+
+
+class TestGameSettings(TestCase):
+
+    def test_phase_duration_should_default(self):
+        settings = GameSettings(phase_durations={'seer': 10})
+        self.assertEqual(settings.phase_duration(Role.seer), 10)
+        self.assertEqual(settings.phase_duration(Role.werewolf), 30)
+
+    def test_quorum_should_be_a_ratio(self):
+        with self.assertRaises(ValueError):
+            GameSettings(quorum=2)
+
+    def test_unknown_phase_should_be_rejected(self):
+        with self.assertRaises(ValueError):
+            GameSettings(phase_durations={'witch': 10})
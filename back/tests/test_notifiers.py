@@ -0,0 +1,224 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from werewolf.metrics import Metrics
+from werewolf.models import Player
+from werewolf.notifiers import CoalescingNotifier, MeteredNotifier, QueuedNotifier
+
+from .test_models import FakeNotifier
+
+
+class TestCoalescingNotifier(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fake_notifier = FakeNotifier()
+        self.notifier = CoalescingNotifier(self.fake_notifier, window=0.01)
+
+    async def test_select_player_should_be_delayed(self):
+        self.notifier.send_to_game('part', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.assertEqual(self.fake_notifier.messages_sent, [])
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.select_player', {'name': 'Tom', 'selected': 1})])
+
+    async def test_only_latest_state_of_player_should_be_sent(self):
+        self.notifier.send_to_role('part', 'werewolf', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.notifier.send_to_role('part', 'werewolf', 'select_player', {'name': 'Lea', 'selected': 1})
+        self.notifier.send_to_role('part', 'werewolf', 'select_player', {'name': 'Tom', 'selected': 0})
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.werewolf.select_player', {'name': 'Tom', 'selected': 0}),
+                          ('part.werewolf.select_player', {'name': 'Lea', 'selected': 1})])
+
+    async def test_other_messages_should_be_sent_after_pending_messages(self):
+        self.notifier.send_to_game('part', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.notifier.send_to_game('part', 'close_phase.villager', {'killed': 'Tom'})
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.select_player', {'name': 'Tom', 'selected': 1}),
+                          ('part.close_phase.villager', {'killed': 'Tom'})])
+
+    async def test_batch_should_send_one_message_per_topic(self):
+        self.notifier.batch = True
+        self.notifier.send_to_game('part', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.notifier.send_to_game('part', 'select_player', {'name': 'Lea', 'selected': 2})
+        self.notifier.flush('part')
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.select_players', [{'name': 'Tom', 'selected': 1},
+                                                   {'name': 'Lea', 'selected': 2}])])
+
+    async def test_select_players_should_be_coalesced_by_player(self):
+        self.notifier.send_to_role('part', 'werewolf', 'select_players', [{'name': 'Tom', 'selected': 1}])
+        self.notifier.send_to_role('part', 'werewolf', 'select_players', [{'name': 'Lea', 'selected': 1},
+                                                                         {'name': 'Tom', 'selected': 0}])
+        self.notifier.flush('part')
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.werewolf.select_players', [{'name': 'Tom', 'selected': 0},
+                                                            {'name': 'Lea', 'selected': 1}])])
+
+
+class TestMeteredNotifier(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fake_notifier = FakeNotifier()
+        self.metrics = Metrics()
+        self.notifier = MeteredNotifier(self.fake_notifier, self.metrics)
+
+    async def test_messages_should_be_counted_by_subject(self):
+        self.notifier.send_to_game('part', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.notifier.send_to_role('part', 'werewolf', 'select_player', {'name': 'Tom', 'selected': 1})
+        self.notifier.send_to_players('part', [Player('Tom'), Player('Lea')], 'start_game', {})
+        self.assertEqual(self.metrics.counter('publishes_total', subject='select_player').value, 2)
+        self.assertEqual(self.metrics.counter('publishes_total', subject='start_game').value, 2)
+        self.assertEqual(len(self.fake_notifier.messages_sent), 4)
+
+
+class AcknowledgingNotifier(FakeNotifier):
+    """
+    Notifier returning a future for each message, resolved by the test.
+    """
+    def __init__(self):
+        super().__init__()
+        self.futures = []
+
+    def send_to_game(self, game_name, subject, message):
+        super().send_to_game(game_name, subject, message)
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        return future
+
+
+class TestQueuedNotifier(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fake_notifier = FakeNotifier()
+        self.metrics = Metrics()
+        self.notifier = QueuedNotifier(self.fake_notifier, max_queue=3, metrics=self.metrics)
+
+    def tearDown(self):
+        self.notifier.close()
+
+    def select(self, name, selected=1):
+        self.notifier.send_to_role('part', 'werewolf', 'select_player',
+                                   {'name': name, 'selected': selected})
+
+    async def test_messages_should_be_sent_by_the_drain_task(self):
+        self.notifier.send_to_game('part', 'players', {'seq': 1})
+        self.assertEqual(self.fake_notifier.messages_sent, [])
+        await self.notifier.join()
+        self.assertEqual(self.fake_notifier.messages_sent, [('part.players', {'seq': 1})])
+
+    async def test_selections_should_be_sent_after_other_messages(self):
+        self.select('Tom')
+        self.notifier.send_to_game('part', 'players', {'seq': 1})
+        await self.notifier.join()
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.players', {'seq': 1}),
+                          ('part.werewolf.select_player', {'name': 'Tom', 'selected': 1})])
+
+    async def test_phase_messages_should_discard_queued_selections(self):
+        self.select('Tom')
+        self.notifier.send_to_game('part', 'close_phase.werewolf', {'killed': 'Tom'})
+        await self.notifier.join()
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.close_phase.werewolf', {'killed': 'Tom'})])
+        self.assertEqual(self.metrics.counter('notifier_dropped_total', subject='select_player',
+                                              reason='superseded').value, 1)
+
+    async def test_selections_of_a_player_should_be_merged(self):
+        self.select('Tom', 1)
+        self.select('Tom', 2)
+        self.assertEqual(len(self.notifier), 1)
+        await self.notifier.join()
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.werewolf.select_player', {'name': 'Tom', 'selected': 2})])
+
+    async def test_select_players_should_be_merged_by_player(self):
+        self.notifier.send_to_game('part', 'select_players', [{'name': 'Tom', 'selected': 1}])
+        self.notifier.send_to_game('part', 'select_players', [{'name': 'Lea', 'selected': 1},
+                                                             {'name': 'Tom', 'selected': 2}])
+        self.assertEqual(len(self.notifier), 1)
+        await self.notifier.join()
+        self.assertEqual(self.fake_notifier.messages_sent,
+                         [('part.select_players', [{'name': 'Tom', 'selected': 2},
+                                                   {'name': 'Lea', 'selected': 1}])])
+
+    async def test_full_queue_should_drop_the_oldest_selection(self):
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.select(name)
+        await self.notifier.join()
+        self.assertEqual([message['name'] for _, message in self.fake_notifier.messages_sent],
+                         ['Lea', 'Bob', 'Isa'])
+
+    async def test_drop_newest_policy_should_drop_the_incoming_selection(self):
+        self.notifier.policy = 'drop_newest'
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.select(name)
+        await self.notifier.join()
+        self.assertEqual([message['name'] for _, message in self.fake_notifier.messages_sent],
+                         ['Tom', 'Lea', 'Bob'])
+        self.assertEqual(self.metrics.counter('notifier_dropped_total', subject='select_player',
+                                              reason='full').value, 1)
+
+    def test_empty_queue_should_be_rejected(self):
+        for options in ({'max_queue': 0}, {'max_in_flight': 0}):
+            with self.assertRaisesRegex(ValueError, 'at least 1'):
+                QueuedNotifier(self.fake_notifier, **options)
+
+    async def test_paused_notifier_should_keep_messages(self):
+        self.notifier.pause()
+        self.notifier.send_to_game('part', 'players', {'seq': 1})
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.fake_notifier.messages_sent, [])
+        self.notifier.resume()
+        await self.notifier.join()
+        self.assertEqual(len(self.fake_notifier.messages_sent), 1)
+
+    async def test_drain_should_wait_for_acknowledgements(self):
+        notifier = AcknowledgingNotifier()
+        self.notifier = QueuedNotifier(notifier, max_in_flight=2)
+        for killed in ('Tom', 'Lea', 'Bob'):
+            self.notifier.send_to_game('part', 'close_phase.villager', {'killed': killed})
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(notifier.messages_sent), 2)
+        notifier.futures[0].set_result(None)
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(notifier.messages_sent), 3)
+
+
+class TestQueuedNotifierWhilePaused(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fake_notifier = FakeNotifier()
+        self.notifier = QueuedNotifier(self.fake_notifier, max_queue=3)
+        self.notifier.pause()
+
+    def tearDown(self):
+        self.notifier.close()
+
+    async def resume(self):
+        self.notifier.resume()
+        await self.notifier.join()
+        return self.fake_notifier.messages_sent
+
+    async def test_players_updates_should_be_merged(self):
+        self.notifier.send_to_game('part', 'players', {'seq': 2, 'added': [{'name': 'Tom'}], 'removed': []})
+        self.notifier.send_to_game('part', 'players', {'seq': 3, 'added': [{'name': 'Lea'}], 'removed': []})
+        self.notifier.send_to_game('part', 'players', {'seq': 4, 'added': [], 'removed': ['Tom', 'Bob']})
+        self.assertEqual(await self.resume(),
+                         [('part.players', {'seq': 4, 'since': 2,
+                                            'added': [{'name': 'Lea'}],
+                                            'removed': ['Bob']})])
+
+    async def test_latest_enter_in_phase_should_replace_the_queued_one(self):
+        self.notifier.send_to_game('part', 'enter_in_phase.werewolf', {'active': ['Bob']})
+        self.notifier.send_to_game('part', 'close_phase.werewolf', {'killed': 'Tom'})
+        self.notifier.send_to_game('part', 'enter_in_phase.seer', {'active': ['Lea']})
+        self.assertEqual(await self.resume(),
+                         [('part.close_phase.werewolf', {'killed': 'Tom'}),
+                          ('part.enter_in_phase.seer', {'active': ['Lea']})])
+
+    async def test_full_queue_should_keep_the_latest_messages(self):
+        for killed in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.notifier.send_to_game('part', 'close_phase.villager', {'killed': killed})
+        self.assertEqual([message['killed'] for _, message in await self.resume()],
+                         ['Lea', 'Bob', 'Isa'])
@@ -0,0 +1,78 @@
+import contextlib
+import tracemalloc
+
+from werewolf.profiling import PhaseProfiler
+
+from .test_models import BaseTestGame
+
+
+class TestGameHooks(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.operations = []
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+
+    @contextlib.contextmanager
+    def hook(self, game, operation):
+        self.operations.append(('start', operation))
+        yield
+        self.operations.append(('end', operation))
+
+    def test_operations_should_be_wrapped(self):
+        self.game.add_hook(self.hook)
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.assertEqual(self.operations,
+                         [('start', 'enter_phase'),
+                          ('start', 'send_to_game'), ('end', 'send_to_game'),
+                          ('start', 'send_to_role'), ('end', 'send_to_role'),
+                          ('end', 'enter_phase'),
+                          ('start', 'select_player'),
+                          ('start', 'send_to_role'), ('end', 'send_to_role'),
+                          ('end', 'select_player')])
+
+    def test_removed_hook_should_not_be_called(self):
+        self.game.add_hook(self.hook)
+        self.game.remove_hook(self.hook)
+        self.game.enter_in_next_phase()
+        self.assertEqual(self.operations, [])
+        self.assertIs(self.game.notifier, self.notifier)
+
+
+class TestPhaseProfiler(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+
+    def play_phase(self):
+        self.game.enter_in_next_phase()
+        self.game.close_the_current_phase()
+
+    def test_one_phase_out_of_every_should_be_reported(self):
+        profiler = PhaseProfiler(every=2)
+        self.game.add_hook(profiler)
+        self.play_phase()
+        self.assertEqual(len(profiler.reports), 0)
+        self.play_phase()
+        self.assertEqual(len(profiler.reports), 1)
+        report = profiler.reports[0]
+        self.assertEqual((report['game'], report['phase'], report['mode']),
+                         ('part', 'seer', 'cprofile'))
+        self.assertIn('close', report['stats'])
+
+    def test_tracemalloc_should_be_stopped_after_the_phase(self):
+        profiler = PhaseProfiler('tracemalloc', every=1)
+        self.game.add_hook(profiler)
+        self.play_phase()
+        self.assertEqual(profiler.reports[0]['mode'], 'tracemalloc')
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_unknown_mode_should_be_rejected(self):
+        with self.assertRaises(ValueError):
+            PhaseProfiler('perf')
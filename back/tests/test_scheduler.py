@@ -0,0 +1,111 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from werewolf.models import Game, GameSettings, Player
+from werewolf.scheduler import GameScheduler
+
+from .test_models import FakeNotifier, role_dispatcher
+
+
+class TestGameScheduler(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.notifier = FakeNotifier()
+        self.game = Game(
+            name='part',
+            notifier=self.notifier,
+            role_dispatcher=role_dispatcher,
+            settings=GameSettings(default_phase_duration=10, pause_duration=0))
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.add_player(Player(name=name))
+        self.game.start()
+
+        self.done = asyncio.get_running_loop().create_future()
+        self.scheduler = GameScheduler(
+            on_game_done=lambda game, exc: self.done.set_result((game, exc)),
+            tick=0.01)
+        self.scheduler.add(self.game)
+
+    async def wait_for_message(self, topic):
+        for _ in range(100):
+            if any(t == topic for t, _ in self.notifier.messages_sent):
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"No message sent to {topic}")
+
+    async def test_first_phase_should_wait_for_players(self):
+        await asyncio.sleep(0.05)
+        self.assertNotIn(
+            'part.enter_in_phase.werewolf',
+            [topic for topic, _ in self.notifier.messages_sent])
+
+    async def test_phase_should_be_closed_once_all_actives_voted(self):
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+        await self.wait_for_message('part.enter_in_phase.werewolf')
+        self.game.select_player_from_name('Tom', 'Bob')
+        await self.wait_for_message('part.close_phase.werewolf')
+        await self.wait_for_message('part.enter_in_phase.seer')
+
+    async def test_done_game_should_be_removed(self):
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+        await self.wait_for_message('part.enter_in_phase.werewolf')
+        self.game.select_player_from_name('Tom', 'Bob')
+        await self.wait_for_message('part.enter_in_phase.seer')
+        self.game.select_player_from_name('Bob', 'Lea')
+        game, exc = await asyncio.wait_for(self.done, 1)
+        self.assertIs(game, self.game)
+        self.assertIsNone(exc)
+        self.assertNotIn('part', self.scheduler)
+
+
+class StubGame:
+    """
+    Game entering and closing phases at once, done on its first close
+    when `done` is set.
+    """
+    def __init__(self, name, done=False):
+        self.name = name
+        self.done = done
+        self.settings = GameSettings(pause_duration=0)
+        self.phase_open = False
+        self.phases = 0
+
+    def add_listener(self, listener):
+        pass
+
+    def remove_listener(self, listener):
+        pass
+
+    def all_player_listen(self):
+        return True
+
+    def enter_in_next_phase(self):
+        self.phases += 1
+        return True
+
+    def current_phase_duration(self):
+        return 0
+
+    def close_the_current_phase(self):
+        return self.done
+
+
+class TestGameSchedulerFailures(IsolatedAsyncioTestCase):
+
+    async def test_failed_on_game_done_should_not_stop_other_games(self):
+        def on_game_done(game, exc):
+            raise RuntimeError('broken')
+
+        scheduler = GameScheduler(on_game_done=on_game_done, tick=0.01)
+        done = StubGame('done', done=True)
+        other = StubGame('other')
+        scheduler.add(done)
+        scheduler.add(other)
+        await asyncio.sleep(0.1)
+        self.assertNotIn('done', scheduler)
+        self.assertIn('other', scheduler)
+        phases = other.phases
+        await asyncio.sleep(0.05)
+        self.assertGreater(other.phases, phases)
@@ -0,0 +1,100 @@
+from collections import Counter
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from autobahn.wamp.exception import ApplicationError
+
+from werewolf.controller import Controller
+from werewolf.local_router import LocalComponent, LocalRouter
+from werewolf.sharding import HashRing
+
+
+class TestHashRing(TestCase):
+
+    def test_owner_should_be_stable(self):
+        self.assertEqual(HashRing(4).owner('part'), HashRing(4).owner('part'))
+
+    def test_single_worker_should_own_every_game(self):
+        ring = HashRing(1)
+        self.assertEqual({ring.owner(f'game-{i}') for i in range(100)}, {0})
+
+    def test_games_should_be_spread_over_workers(self):
+        ring = HashRing(4)
+        owners = Counter(ring.owner(f'game-{i}') for i in range(4000))
+        self.assertEqual(set(owners), {0, 1, 2, 3})
+        self.assertGreater(min(owners.values()), 500)
+
+    def test_adding_worker_should_move_few_games(self):
+        before = HashRing(4)
+        after = HashRing(5)
+        moved = sum(before.owner(f'game-{i}') != after.owner(f'game-{i}')
+                    for i in range(4000))
+        self.assertLess(moved, 4000 * 0.35)
+
+
+class TestShardedControllers(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.router = LocalRouter()
+        self.components = [LocalComponent(self.router) for _ in range(2)]
+        self.controllers = [
+            Controller(component, worker_id=worker_id, nb_workers=2)
+            for worker_id, component in enumerate(self.components)
+        ]
+        for component in self.components:
+            await component.start()
+        self.client = self.router.session()
+        self.ring = HashRing(2)
+
+    async def asyncTearDown(self):
+        for component, controller in zip(self.components, self.controllers):
+            await component.stop()
+            controller._queued_notifier.close()
+
+    async def test_games_of_every_worker_should_be_listed(self):
+        names = [f'game-{i}' for i in range(6)]
+        for name in names:
+            await self.client.call('com.werewolf.create_game', name, 'Tom')
+        listed = []
+        cursor = None
+        while True:
+            page = await self.client.call('com.werewolf.list_games', 'lobby',
+                                          0, cursor, 2)
+            listed.extend(game['name'] for game in page['games'])
+            cursor = page['cursor']
+            if cursor is None:
+                break
+        self.assertEqual(listed, sorted(names, key=self.ring.owner))
+
+    async def test_calls_should_be_routed_to_the_owner(self):
+        # game-2 is owned by worker 1, game-0 by worker 0.
+        for name in ('game-0', 'game-2'):
+            await self.client.call('com.werewolf.create_game', name, 'Tom')
+            # Shared registrations are invoked in turn, so each call is
+            # received by a different worker.
+            for player_name in ('Lea', 'Bob'):
+                await self.client.call('com.werewolf.join_game', name, player_name)
+        self.assertEqual(list(self.controllers[0]._games), ['game-0'])
+        self.assertEqual(list(self.controllers[1]._games), ['game-2'])
+        for name in ('game-0', 'game-2'):
+            owner = self.ring.owner(name)
+            snapshot = await self.client.call(
+                f'com.werewolf.worker.{owner}.get_players', name)
+            self.assertEqual([player['name'] for player in snapshot['players']],
+                             ['Tom', 'Lea', 'Bob'])
+
+    async def test_worker_procedures_should_not_route(self):
+        await self.client.call('com.werewolf.create_game', 'game-2', 'Tom')
+        with self.assertRaises(ApplicationError):
+            await self.client.call('com.werewolf.worker.0.get_players', 'game-2')
+
+    async def test_forwarded_call_should_fail_while_disconnected(self):
+        await self.client.call('com.werewolf.create_game', 'game-2', 'Tom')
+        controller = self.controllers[0]
+        session, controller._session = controller._session, None
+        route = controller._route('get_players', controller.get_players)
+        with self.assertRaises(ApplicationError) as context:
+            await route('game-2')
+        self.assertEqual(context.exception.error, 'com.werewolf.error.unavailable')
+        with self.assertRaises(ApplicationError):
+            await controller.list_games()
+        controller._session = session
@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from werewolf.simulation import first_vote, simulate_game
+
+
+class TestSimulateGame(TestCase):
+
+    def test_game_should_have_a_winner(self):
+        result = simulate_game(12, seed=1)
+        self.assertIn(result.winner, ('villager', 'werewolf'))
+
+    def test_game_should_be_reproducible(self):
+        first = simulate_game(12, seed=3)
+        second = simulate_game(12, seed=3)
+        self.assertEqual((first.winner, first.phases, first.votes),
+                         (second.winner, second.phases, second.votes))
+
+    def test_vote_strategy_should_be_pluggable(self):
+        result = simulate_game(4, vote_strategy=first_vote, seed=0)
+        self.assertGreater(result.votes, 0)
+
+    def test_game_without_vote_should_stop(self):
+        with self.assertRaises(RuntimeError):
+            simulate_game(8,
+                          vote_strategy=lambda elector, selectables, rng: None,
+                          max_phases=10)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from werewolf.controller import Controller
+from werewolf.local_router import LocalComponent, LocalRouter
+from werewolf.models import Game, Player
+from werewolf.snapshot import SnapshotStore, dump_game, load_game
+
+from .test_models import BaseTestGame, FakeNotifier
+
+
+class TestSnapshotInWerewolfPhase(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob'):
+            self.game.player_listen_topic(name)
+        self.game.enter_in_next_phase()
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.restored_notifier = FakeNotifier()
+        self.restored = load_game(dump_game(self.game), self.restored_notifier)
+
+    def test_state_should_be_restored(self):
+        self.assertEqual(self.restored.to_state(), self.game.to_state())
+
+    def test_restored_game_should_continue_the_current_phase(self):
+        self.restored.select_player_from_name('Lea', 'Bob')
+        self.restored.select_player_from_name('Tom', 'Bob')
+        self.restored.close_the_current_phase()
+        self.restored_notifier.assert_message_sent(
+            'part.close_phase.werewolf',
+            {'killed': 'Tom',
+             'resurrected': None,
+             'winner': None,
+             'alive': {'werewolf': 1, 'seer': 1, 'villager': 1}})
+
+    def test_restored_game_should_enter_in_the_next_phase(self):
+        self.restored.close_the_current_phase()
+        self.restored.enter_in_next_phase()
+        self.assertEqual(self.restored.get_status()['phase'], 'seer')
+
+    def test_last_player_should_still_be_expected(self):
+        self.assertFalse(self.restored.all_player_listen())
+        self.restored.player_listen_topic('Isa')
+        self.assertTrue(self.restored.all_player_listen())
+
+
+class TestSnapshotStore(TestCase):
+
+    def test_saved_game_should_be_loaded(self):
+        game = Game(name='part', notifier=FakeNotifier())
+        game.add_player(Player(name='Tom'))
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(os.path.join(directory, 'games'))
+            store.save(game)
+            games = list(store.load_all(FakeNotifier))
+            store.remove('part')
+            self.assertEqual(list(store.load_all(FakeNotifier)), [])
+        self.assertEqual([game.name for game in games], ['part'])
+
+    def test_unreadable_snapshot_should_be_skipped(self):
+        game = Game(name='part', notifier=FakeNotifier())
+        errors = []
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(directory)
+            store.save(game)
+            with open(os.path.join(directory, 'broken.snapshot'), 'wb') as snapshot_file:
+                snapshot_file.write(dump_game(game)[:-3])
+            games = list(store.load_all(FakeNotifier,
+                                        lambda path, exc: errors.append(path)))
+        self.assertEqual([game.name for game in games], ['part'])
+        self.assertEqual([os.path.basename(path) for path in errors],
+                         ['broken.snapshot'])
+
+    def test_unchanged_game_should_not_be_written(self):
+        game = Game(name='part', notifier=FakeNotifier())
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(directory)
+            self.assertTrue(store.save(game))
+            self.assertFalse(store.save(game))
+            game.add_player(Player(name='Tom'))
+            self.assertTrue(store.save(game))
+            restarted = SnapshotStore(directory)
+            loaded = next(restarted.load_all(FakeNotifier))
+            self.assertFalse(restarted.save(loaded))
+
+
+class TestControllerSnapshots(IsolatedAsyncioTestCase):
+
+    async def test_unreadable_snapshot_should_not_prevent_registrations(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'worker-0'))
+            with open(os.path.join(directory, 'worker-0', 'broken.snapshot'),
+                      'wb') as snapshot_file:
+                snapshot_file.write(b'\x92\x01')
+            router = LocalRouter()
+            component = LocalComponent(router)
+            controller = Controller(component, snapshot_dir=directory)
+            await component.start()
+            try:
+                snapshot = await router.session().call(
+                    'com.werewolf.create_game', 'part', 'Tom')
+                self.assertEqual(snapshot['seq'], 1)
+            finally:
+                await component.stop()
+                controller._queued_notifier.close()
@@ -0,0 +1,62 @@
+from werewolf.models import Game
+from werewolf.state import GameStateCache
+
+from .test_models import BaseTestGame, FakeNotifier
+
+
+class TestGameStateCache(BaseTestGame):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        for name in ('Tom', 'Lea', 'Bob', 'Isa'):
+            self.game.player_listen_topic(name)
+        self.game.enter_in_next_phase()
+        self.cache = GameStateCache(self.game)
+
+    def test_state_should_be_built_once_per_version(self):
+        first = self.cache.get('Tom')
+        second = self.cache.get('Isa')
+        self.assertIs(first['state'], second['state'])
+        self.assertEqual(self.cache.builds, 1)
+
+    def test_night_phase_should_be_seen_by_its_role_only(self):
+        villager = self.cache.get('Tom')['state']
+        werewolf = self.cache.get('Bob')['state']
+        self.assertEqual((villager['phase'], villager['active']), ('werewolf', None))
+        self.assertEqual([player['name'] for player in werewolf['active']], ['Bob'])
+        self.game.select_player_from_name('Lea', 'Bob')
+        self.assertIsNone(self.cache.get('Tom')['state']['leader'])
+        self.assertEqual(self.cache.get('Bob')['state']['leader'], 'Lea')
+        self.assertEqual(self.cache.get('Bob')['player']['role'], 'werewolf')
+
+    def test_known_version_should_not_be_modified(self):
+        version = self.cache.get('Tom')['version']
+        self.assertEqual(self.cache.get('Tom', version),
+                         {'version': version,
+                          'not_modified': True,
+                          'player': self.game.get_player('Tom').private_dict()})
+
+    def test_older_version_should_get_a_delta(self):
+        version = self.cache.get('Bob')['version']
+        self.game.select_player_from_name('Lea', 'Bob')
+        response = self.cache.get('Bob', version)
+        self.assertEqual(response['since'], version)
+        self.assertEqual(sorted(response['delta']), ['leader', 'selectable'])
+        self.assertIs(self.cache.get('Bob', version)['delta'], response['delta'])
+
+    def test_unknown_version_should_get_the_whole_state(self):
+        response = self.cache.get('Tom', 1000)
+        self.assertIn('state', response)
+
+    def test_restored_game_should_keep_its_version(self):
+        restored = Game.from_state(self.game.to_state(), FakeNotifier())
+        self.assertEqual(restored.version, self.game.version)
+
+    def test_changed_audience_should_get_the_whole_state(self):
+        version = self.cache.get('Bob')['version']
+        self.cache.get('Tom')
+        self.game.close_the_current_phase()
+        response = self.cache.get('Bob', version)
+        self.assertNotIn('delta', response)
+        self.assertIsNone(response['state']['active'])
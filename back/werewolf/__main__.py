@@ -1,8 +1,70 @@
+import argparse
+import multiprocessing
+
 from autobahn.asyncio.component import Component, run
 
 from .controller import Controller
 
-COMPONENT = Component(transports="ws://localhost:8081/ws", realm="realm1")
-CONTROLLER = Controller(COMPONENT)
+SERIALIZERS = ("json", "msgpack", "cbor", "ubjson")
+
+
+def run_worker(url,
+               realm,
+               worker_id,
+               nb_workers,
+               serializer=None,
+               snapshot_dir=None,
+               journal_dir=None):
+    transport = {"type": "websocket", "url": url}
+    if serializer is not None:
+        transport["serializers"] = [serializer]
+    component = Component(transports=[transport], realm=realm)
+    Controller(component,
+               worker_id=worker_id,
+               nb_workers=nb_workers,
+               snapshot_dir=snapshot_dir,
+               journal_dir=journal_dir)
+    run([component])
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="werewolf")
+    parser.add_argument("--url", default="ws://localhost:8081/ws")
+    parser.add_argument("--realm", default="realm1")
+    parser.add_argument("--workers",
+                        type=int,
+                        default=1,
+                        help="number of controller processes")
+    parser.add_argument("--serializer",
+                        choices=SERIALIZERS,
+                        help="serializer of the connection to the router, "
+                        "negotiated with the router by default")
+    parser.add_argument("--snapshot-dir",
+                        help="directory where games are saved and "
+                        "restored from, one sub-directory per worker")
+    parser.add_argument("--journal-dir",
+                        help="directory of the journal of game events, "
+                        "one sub-directory per worker")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        run_worker(args.url, args.realm, 0, 1, args.serializer,
+                   args.snapshot_dir, args.journal_dir)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_worker,
+                                args=(args.url, args.realm, worker_id,
+                                      args.workers, args.serializer,
+                                      args.snapshot_dir, args.journal_dir),
+                                name=f"werewolf-worker-{worker_id}")
+        for worker_id in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
 
-run([COMPONENT])
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Inbox of the commands sent to a game by the RPC handlers.
+
+    actor = GameActor(game)
+    is_selected = await actor.select("Tom", "Lucy")
+
+Commands are queued and the inbox is drained by a single callback of the
+event loop, after the handlers that ran in the same loop iteration have
+queued theirs. Consecutive commands of the same kind are applied as one
+batch: the joins with one `players` update and the votes with one
+`select_players` message, instead of a publish per command. As a drain
+runs in one callback, nothing else (the scheduler closing the phase,
+another game) is interleaved with the commands of a batch.
+
+With `select_delay`, an inbox holding only votes is drained after this
+number of seconds, so repeated toggles of a player during the delay are
+applied in one batch and only their net change is notified. Pending
+votes are applied before the phase is closed, as a hook of the game.
+"""
+
+import asyncio
+import collections
+import contextlib
+import itertools
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .models import Game, Player
+
+Command = Tuple[str, tuple, asyncio.Future]
+
+
+class GameActor:
+    """
+    Apply the commands sent to game in batches, one drain per loop
+    iteration.
+    """
+    def __init__(self, game: Game, select_delay: float = 0):
+        self.game = game
+        self.select_delay = select_delay
+        self._inbox: Deque[Command] = collections.deque()
+        self._scheduled = False
+        # Handle of the delayed drain of votes
+        self._delayed: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        self.drains = 0
+        self.commands = 0
+        if select_delay:
+            game.add_hook(self._before_operation)
+
+    def __len__(self):
+        return len(self._inbox)
+
+    def join(self, player_name: str) -> asyncio.Future:
+        """
+        Add player_name to the lobby, see `Game.add_player`.
+        """
+        return self._submit("join", player_name)
+
+    def listen(self, player_name: str) -> asyncio.Future:
+        """
+        See `Game.player_listen_topic`.
+        """
+        return self._submit("listen", player_name)
+
+    def select(self, selected: str, elector: str) -> asyncio.Future:
+        """
+        See `Game.select_player_from_name`.
+        """
+        return self._submit("select", selected, elector)
+
+    def call(self, function: Callable, *args) -> asyncio.Future:
+        """
+        Call function(*args) in turn with the other commands.
+        """
+        return self._submit("call", function, *args)
+
+    def _submit(self, kind: str, *args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._closed:
+            future.set_exception(
+                ValueError(f"The game {self.game.name!r} is removed"))
+            return future
+        self._inbox.append((kind, args, future))
+        if self._scheduled:
+            return future
+        if kind == "select" and self.select_delay:
+            if self._delayed is None:
+                self._delayed = loop.call_later(self.select_delay,
+                                                self._drain)
+            return future
+        if self._delayed is not None:
+            self._delayed.cancel()
+            self._delayed = None
+        self._scheduled = True
+        loop.call_soon(self._drain)
+        return future
+
+    def _before_operation(self, game: Game, operation: str):  # pylint: disable=unused-argument
+        if operation == "close_phase" and self._delayed is not None:
+            self._drain()
+        return contextlib.nullcontext()
+
+    def close(self):
+        """
+        Fail the pending commands and the next ones, when the game is
+        removed.
+        """
+        self._closed = True
+        if self.select_delay:
+            self.game.remove_hook(self._before_operation)
+        if self._delayed is not None:
+            self._delayed.cancel()
+            self._delayed = None
+        while self._inbox:
+            _, _, future = self._inbox.popleft()
+            _resolve(future,
+                     error=ValueError(
+                         f"The game {self.game.name!r} is removed"))
+
+    def _drain(self):
+        self._scheduled = False
+        if self._delayed is not None:
+            self._delayed.cancel()
+            self._delayed = None
+        if not self._inbox:
+            return
+        inbox, self._inbox = self._inbox, collections.deque()
+        self.drains += 1
+        self.commands += len(inbox)
+        for kind, commands in itertools.groupby(inbox, key=lambda c: c[0]):
+            commands = list(commands)
+            try:
+                getattr(self, f"_apply_{kind}")(commands)
+            except Exception as exc:  # pylint: disable=broad-except
+                for _, _, future in commands:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _apply_join(self, commands: List[Command]):
+        errors = self.game.add_players(
+            [Player(player_name) for _, (player_name, ), _ in commands])
+        snapshot = self.game.get_players_snapshot()
+        for (_, _, future), error in zip(commands, errors):
+            _resolve(future, snapshot, error)
+
+    def _apply_select(self, commands: List[Command]):
+        results = self.game.select_players_from_names(
+            [args for _, args, _ in commands])
+        for (_, _, future), result in zip(commands, results):
+            if isinstance(result, Exception):
+                _resolve(future, error=result)
+            else:
+                _resolve(future, result)
+
+    def _apply_listen(self, commands: List[Command]):
+        for _, (player_name, ), future in commands:
+            try:
+                self.game.player_listen_topic(player_name)
+            except Exception as exc:  # pylint: disable=broad-except
+                _resolve(future, error=exc)
+            else:
+                _resolve(future, None)
+
+    def _apply_call(self, commands: List[Command]):
+        for _, (function, *args), future in commands:
+            try:
+                result = function(*args)
+            except Exception as exc:  # pylint: disable=broad-except
+                _resolve(future, error=exc)
+            else:
+                _resolve(future, result)
+
+
+def _resolve(future: asyncio.Future, result=None, error=None):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,96 @@
+"""
+Admission control of the selections sent by players.
+
+    limiter = SelectionLimiter(elector_rate=5, elector_burst=10,
+                               game_rate=100, game_burst=200)
+    reason = limiter.admit("game", "Tom")  # None, "elector" or "game"
+
+Each elector of a game and each game have a token bucket: a selection
+takes one token of both, tokens are refilled at `rate` per second up to
+`burst`. A limit whose rate is None is not applied.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst,
+                          self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+class SelectionLimiter:
+    """
+    Token buckets of the electors and games.
+    """
+    def __init__(self,
+                 elector_rate: Optional[float] = None,
+                 elector_burst: float = 10,
+                 game_rate: Optional[float] = None,
+                 game_burst: float = 100,
+                 clock: Callable[[], float] = time.monotonic):
+        for name, value in (("elector_burst", elector_burst),
+                            ("game_burst", game_burst)):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1 not {value!r}")
+        self.elector_rate = elector_rate
+        self.elector_burst = elector_burst
+        self.game_rate = game_rate
+        self.game_burst = game_burst
+        self.clock = clock
+        # Bucket of each game and of its electors
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket],
+                                       Dict[str, TokenBucket]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.elector_rate is not None or self.game_rate is not None
+
+    def admit(self, game_name: str, elector: str) -> Optional[str]:
+        """
+        Take a token for a selection of elector in game, return the
+        limit preventing it ("elector" or "game") or None.
+        """
+        now = self.clock()
+        buckets = self._buckets.get(game_name)
+        if buckets is None:
+            game_bucket = None
+            if self.game_rate is not None:
+                game_bucket = TokenBucket(self.game_rate, self.game_burst,
+                                          now)
+            buckets = self._buckets[game_name] = (game_bucket, {})
+        game_bucket, elector_buckets = buckets
+
+        elector_bucket = None
+        if self.elector_rate is not None:
+            elector_bucket = elector_buckets.get(elector)
+            if elector_bucket is None:
+                elector_bucket = elector_buckets[elector] = TokenBucket(
+                    self.elector_rate, self.elector_burst, now)
+            elector_bucket.refill(now)
+            if elector_bucket.tokens < 1:
+                return "elector"
+        if game_bucket is not None:
+            game_bucket.refill(now)
+            if game_bucket.tokens < 1:
+                return "game"
+            game_bucket.tokens -= 1
+        if elector_bucket is not None:
+            elector_bucket.tokens -= 1
+        return None
+
+    def forget(self, game_name: str):
+        """
+        Drop the buckets of a removed game.
+        """
+        self._buckets.pop(game_name, None)
@@ -0,0 +1,224 @@
+"""
+Estimate the balance of role dispatchers with batches of games.
+
+Games are simulated at once as arrays of counters (alive and dead
+players of each role), applying the kill and resurrect rules of
+`WerewolfPhase`, `SeerPhase` and `VillagerPhase`. The player killed by
+a vote is drawn at random among selectable players, a `VotingPolicy`
+can make werewolves more likely to be chosen.
+
+    >>> report = simulate_balance(12, nb_games=10000, seed=0)
+    >>> round(report.win_rates["villager"] + report.win_rates["werewolf"], 6)
+    1.0
+"""
+
+from random import shuffle
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .models import Player, Role, RoleDispatcher, default_role_dispatcher
+
+# Indexes of counters
+ALIVE_WEREWOLF, ALIVE_SEER, ALIVE_VILLAGER, DEAD_WEREWOLF, DEAD_SEER, \
+    DEAD_VILLAGER = range(6)
+
+
+class VotingPolicy:
+    """
+    Weights of werewolves when a vote is drawn.
+
+    A weight of 1 selects a werewolf as often as any other player, 2
+    makes a werewolf twice as likely to be selected.
+    """
+    def __init__(self, day_werewolf_weight=1.0, seer_werewolf_weight=1.0):
+        self.day_werewolf_weight = day_werewolf_weight
+        self.seer_werewolf_weight = seer_werewolf_weight
+
+
+RANDOM_POLICY = VotingPolicy()
+
+
+class BalanceReport:
+    """
+    Outcome of simulated games.
+
+    `lengths` counts games by number of played phases.
+    """
+    def __init__(self, nb_players: int, role_counts: Dict[str, int],
+                 winners: np.ndarray, lengths: np.ndarray):
+        self.nb_players = nb_players
+        self.role_counts = role_counts
+        self.nb_games = len(winners)
+        self.win_rates = {
+            Role.villager.value: float(np.mean(winners == 0)),
+            Role.werewolf.value: float(np.mean(winners == 1)),
+        }
+        self.lengths = np.bincount(lengths)
+        self.mean_length = float(np.mean(lengths))
+
+    def __repr__(self):
+        return (f"<BalanceReport players={self.nb_players} "
+                f"roles={self.role_counts} win_rates={self.win_rates} "
+                f"mean_length={self.mean_length:.1f}>")
+
+
+def role_counts(nb_players: int,
+                role_dispatcher: RoleDispatcher = default_role_dispatcher
+                ) -> Dict[str, int]:
+    """
+    Return the number of players of each role given by role_dispatcher.
+    """
+    players = [Player(f"player-{i}") for i in range(nb_players)]
+    role_dispatcher(players)
+    counts = {role.value: 0 for role in Role}
+    for player in players:
+        counts[player.role.value] += 1
+    return counts
+
+
+def _draw(rng: np.random.Generator, weights: np.ndarray) -> np.ndarray:
+    """
+    Draw a column index of weights for each row.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    draws = rng.random(len(weights)) * cumulative[:, -1]
+    return (draws[:, None] >= cumulative).sum(axis=1)
+
+
+def simulate_balance(nb_players: int,
+                     role_dispatcher: RoleDispatcher = default_role_dispatcher,
+                     nb_games: int = 100000,
+                     policy: VotingPolicy = RANDOM_POLICY,
+                     seed=None,
+                     max_phases: int = 10000) -> BalanceReport:
+    """
+    Simulate nb_games games of nb_players using role_dispatcher.
+    """
+    rng = np.random.default_rng(seed)
+    counts = role_counts(nb_players, role_dispatcher)
+    state = np.zeros((nb_games, 6), dtype=np.int64)
+    state[:, ALIVE_WEREWOLF] = counts[Role.werewolf.value]
+    state[:, ALIVE_SEER] = counts[Role.seer.value]
+    state[:, ALIVE_VILLAGER] = counts[Role.villager.value]
+
+    # -1 while the game is running, 0 villager wins, 1 werewolf wins
+    winners = np.full(nb_games, -1, dtype=np.int8)
+    lengths = np.zeros(nb_games, dtype=np.int64)
+    phases = (_werewolf_phase, _seer_phase, _villager_phase)
+    phase_index = 0
+    while (winners == -1).any():
+        if lengths.max() >= max_phases:
+            raise RuntimeError(f"Games not done after {max_phases} phases.")
+        running = np.flatnonzero(winners == -1)
+        played = phases[phase_index](rng, state, running, policy)
+        phase_index = (phase_index + 1) % len(phases)
+        lengths[played] += 1
+
+        alive_villager = state[played, ALIVE_VILLAGER] > 0
+        alive_werewolf = state[played, ALIVE_WEREWOLF] > 0
+        winners[played] = np.where(
+            alive_villager & alive_werewolf, -1,
+            np.where(alive_villager, 0, 1))
+
+    return BalanceReport(nb_players, counts, winners, lengths)
+
+
+def _werewolf_phase(rng, state, running, policy):  # pylint: disable=unused-argument
+    games = running[state[running, ALIVE_WEREWOLF] > 0]
+    weights = state[games][:, [ALIVE_SEER, ALIVE_VILLAGER]].astype(float)
+    killed = _draw(rng, weights)
+    _kill(state, games[killed == 0], ALIVE_SEER, DEAD_SEER)
+    _kill(state, games[killed == 1], ALIVE_VILLAGER, DEAD_VILLAGER)
+    return games
+
+
+def _seer_phase(rng, state, running, policy):
+    games = running[state[running, ALIVE_SEER] > 0]
+    weights = state[games][:, [
+        ALIVE_WEREWOLF, DEAD_WEREWOLF, ALIVE_VILLAGER, DEAD_VILLAGER
+    ]].astype(float)
+    weights[:, :2] *= policy.seer_werewolf_weight
+    selected = _draw(rng, weights)
+    _kill(state, games[selected == 0], ALIVE_WEREWOLF, DEAD_WEREWOLF)
+    _kill(state, games[selected == 1], DEAD_WEREWOLF, ALIVE_WEREWOLF)
+    _kill(state, games[selected == 2], ALIVE_VILLAGER, DEAD_VILLAGER)
+    _kill(state, games[selected == 3], DEAD_VILLAGER, ALIVE_VILLAGER)
+    return games
+
+
+def _villager_phase(rng, state, running, policy):
+    alive = [ALIVE_WEREWOLF, ALIVE_SEER, ALIVE_VILLAGER]
+    games = running[state[running][:, alive].sum(axis=1) > 0]
+    weights = state[games][:, alive].astype(float)
+    weights[:, 0] *= policy.day_werewolf_weight
+    killed = _draw(rng, weights)
+    _kill(state, games[killed == 0], ALIVE_WEREWOLF, DEAD_WEREWOLF)
+    _kill(state, games[killed == 1], ALIVE_SEER, DEAD_SEER)
+    _kill(state, games[killed == 2], ALIVE_VILLAGER, DEAD_VILLAGER)
+    return games
+
+
+def _kill(state, games, from_counter, to_counter):
+    """
+    Move a player of games from from_counter to to_counter.
+    """
+    state[games, from_counter] -= 1
+    state[games, to_counter] += 1
+
+
+def werewolf_dispatcher(nb_werewolves: Dict[int, int]) -> RoleDispatcher:
+    """
+    Return a dispatcher giving the number of werewolves found in
+    nb_werewolves according to the number of players, one seer and
+    villager to others. Unknown player counts use
+    `default_role_dispatcher`.
+    """
+    def dispatch(players):
+        nb_werewolf = nb_werewolves.get(len(players))
+        if nb_werewolf is None:
+            default_role_dispatcher(players)
+            return
+        roles_to_distribute = [Role.werewolf] * nb_werewolf
+        roles_to_distribute.append(Role.seer)
+        roles_to_distribute.extend([Role.villager] *
+                                   (len(players) - nb_werewolf - 1))
+        shuffle(roles_to_distribute)
+        for player, role in zip(players, roles_to_distribute):
+            player.role = role
+
+    return dispatch
+
+
+def balanced_role_dispatcher(player_counts: Iterable[int] = range(4, 41),
+                             nb_games: int = 20000,
+                             policy: VotingPolicy = RANDOM_POLICY,
+                             seed=None,
+                             reports: Optional[Dict[int, BalanceReport]] = None
+                             ) -> RoleDispatcher:
+    """
+    Return a dispatcher whose number of werewolves gives the win rate
+    closest to 50% for each player count.
+
+    When given, reports is filled with the report of the chosen number
+    of werewolves by player count.
+    """
+    rng = np.random.default_rng(seed)
+    nb_werewolves = {}
+    for nb_players in player_counts:
+        best = None
+        for nb_werewolf in range(1, (nb_players - 1) // 2 + 1):
+            report = simulate_balance(
+                nb_players,
+                werewolf_dispatcher({nb_players: nb_werewolf}),
+                nb_games=nb_games,
+                policy=policy,
+                seed=rng.integers(2**32))
+            gap = abs(report.win_rates[Role.werewolf.value] - 0.5)
+            if best is None or gap < best[0]:
+                best = (gap, nb_werewolf, report)
+        if best is not None:
+            nb_werewolves[nb_players] = best[1]
+            if reports is not None:
+                reports[nb_players] = best[2]
+    return werewolf_dispatcher(nb_werewolves)
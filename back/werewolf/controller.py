@@ -2,6 +2,11 @@
 
 Topics:
 
+    com.werewolf.{game}.players    {"seq": 0, "added": [], "removed": []}
+                                   "since": 0 when updates have been merged
+    com.werewolf.{game}.evicted    {"reason": "lobby" or "waiting" or "running"
+                                               or "capacity"}
+
     com.werewolf.{game}.user.{user}.start_game    {"role": ""}
 
     com.werewolf.{game}.enter_in_phase.{phase}
@@ -11,123 +16,675 @@ Topics:
 
     com.werewolf.{game}.
     com.werewolf.{game}.role.{role}.select_player    {"name": "", selected: 0}
+    com.werewolf.{game}.role.{role}.select_players   [{"name": "", selected: 0}]
 
 
     com.werewolf.{game}.close_phase                 {"killed": "" or null,
                                                      "resurrected": "" or null,
-                                                     "winner": "" or null}
+                                                     "winner": "" or null,
+                                                     "alive": {"werewolf": 0,
+                                                               "seer": 0,
+                                                               "villager": 0}}
 """
 
 import asyncio
-from typing import Dict, List, Optional
+import functools
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
 
 import txaio
 from autobahn.asyncio.component import Component
+from autobahn.wamp.exception import ApplicationError
 from autobahn.wamp.interfaces import ISession
+from autobahn.wamp.types import PublishOptions, RegisterOptions
 
-from .models import Game, Notifier, Player
+from .actor import GameActor
+from .admission import SelectionLimiter
+from .directory import GameDirectory
+from .eviction import GameReaper
+from .journal import Journal, replay_games
+from .metrics import GameMetrics, Metrics
+from .models import Game, GameSettings, Notifier, Player, Role
+from .notifiers import CoalescingNotifier, MeteredNotifier, QueuedNotifier
+from .profiling import PhaseProfiler
+from .scheduler import GameScheduler
+from .sharding import HashRing
+from .snapshot import SnapshotStore
+from .state import GameStateCache
 
 txaio.use_asyncio()
 txaio.start_logging(level="debug")  # pylint: disable=no-member
 
 
+PHASE_SUBJECTS = tuple(f"{subject}.{role.value}"
+                       for subject in ("enter_in_phase", "close_phase")
+                       for role in Role) + ("select_player", "select_players")
+GAME_SUBJECTS = ("players", "evicted") + PHASE_SUBJECTS
+
+
+class GameTopics:
+    """
+    Interned topic URIs of a game, built once by subject.
+    """
+    def __init__(self, game_name: str):
+        self.prefix = f"com.werewolf.{game_name}"
+        self._game: Dict[str, str] = {}
+        self._role: Dict[Tuple[str, str], str] = {}
+        self._user: Dict[Tuple[str, str], str] = {}
+
+    def precompute(self, player_names=()):
+        """
+        Build the topics published by a game, so none is built while it
+        is played.
+        """
+        for subject in GAME_SUBJECTS:
+            self.game(subject)
+        for role in Role:
+            for subject in PHASE_SUBJECTS:
+                self.role(role.value, subject)
+        for player_name in player_names:
+            self.user(player_name, "start_game")
+
+    def game(self, subject: str) -> str:
+        topic = self._game.get(subject)
+        if topic is None:
+            topic = self._game[subject] = sys.intern(
+                f"{self.prefix}.{subject}")
+        return topic
+
+    def role(self, role: str, subject: str) -> str:
+        key = (role, subject)
+        topic = self._role.get(key)
+        if topic is None:
+            topic = self._role[key] = sys.intern(
+                f"{self.prefix}.role.{role}.{subject}")
+        return topic
+
+    def user(self, player_name: str, subject: str) -> str:
+        key = (player_name, subject)
+        topic = self._user.get(key)
+        if topic is None:
+            topic = self._user[key] = sys.intern(
+                f"{self.prefix}.user.{player_name}.{subject}")
+        return topic
+
+
 class WampNotifier(Notifier):
-    def __init__(self, session):
-        self._session = session
+    """
+    Publish messages with the current session.
+
+    `session` is None while the controller is disconnected. With
+    `acknowledge`, methods return a future resolved when the router has
+    accepted the messages.
+
+    Topics of the games registered with `add_game` are built once, the
+    ones of other games at each publish.
+    """
+    def __init__(self, session: Optional[ISession], acknowledge=False):
+        self.session = session
+        self.acknowledge = acknowledge
+        self._options = PublishOptions(acknowledge=True)
+        self._topics: Dict[str, GameTopics] = {}
+
+    def add_game(self, game: Game):
+        topics = self._topics[game.name] = GameTopics(game.name)
+        topics.precompute(player.name for player in game.get_players())
+
+    def remove_game(self, game_name: str):
+        self._topics.pop(game_name, None)
+
+    def topics(self, game_name: str) -> GameTopics:
+        topics = self._topics.get(game_name)
+        if topics is None:
+            return GameTopics(game_name)
+        return topics
+
+    def _publish(self, topic: str, message):
+        if self.acknowledge:
+            return self.session.publish(topic, message, options=self._options)
+        self.session.publish(topic, message)
+        return None
 
     def send_to_players(self, game_name: str, players: List[Player],
                         subject: str, message):
         """
         Send message to player.
         """
-        for player in players:
-            self._session.publish(
-                f"com.werewolf.{game_name}.user.{player.name}.{subject}",
-                message)
+        topics = self.topics(game_name)
+        results = [
+            self._publish(topics.user(player.name, subject), message)
+            for player in players
+        ]
+        if self.acknowledge:
+            return asyncio.gather(*results)
+        return None
 
     def send_to_game(self, game_name: str, subject: str, message):
         """
         Send message to all player of game.
         """
-        self._session.publish(f"com.werewolf.{game_name}.{subject}", message)
+        return self._publish(self.topics(game_name).game(subject), message)
 
     def send_to_role(self, game_name: str, role: str, subject: str, message):
-        self._session.publish(
-            f"com.werewolf.{game_name}.role.{role}.{subject}", message)
+        return self._publish(
+            self.topics(game_name).role(role, subject), message)
 
 
 class Controller:
-    def __init__(self, wamp_component: Component):
+    """
+    Expose games through WAMP procedures.
+
+    When `coalesce_window` is set, `select_player` messages are coalesced
+    during this number of seconds, `batch_selections` sends them in
+    one `select_players` message.
+
+    Games can be shared between `nb_workers` controllers, each one
+    running in its own process. Every worker registers the public
+    procedures as shared registrations and forwards the calls about
+    games owned by an other worker to `com.werewolf.worker.{id}.*`. A call
+    forwarded while the worker is disconnected from the router fails with
+    `com.werewolf.error.unavailable`.
+
+    When `snapshot_dir` is set, games are saved every `snapshot_interval`
+    seconds and when the WAMP connection is lost, then restored when
+    the controller joins the router. When `journal_dir` is set, game
+    events are written to a journal replayed at the same time, a game
+    found in the journal is not restored from its snapshot.
+
+    Messages are queued by game and published by a single task, a game
+    queue holds at most `max_queue` messages and `queue_policy` tells
+    which ones are dropped when it is full (see `QueuedNotifier`).
+    Publishes are acknowledged by the router, so a slow router fills
+    queues instead of the transport buffers. Messages are held while the
+    controller is disconnected and sent once procedures are registered
+    again, superseded messages being collapsed meanwhile.
+
+    Games idle for longer than the TTL of their stage (`lobby_ttl`,
+    `waiting_ttl` or `running_ttl` seconds) are evicted, as well as the
+    least recently used games beyond `max_games`.
+
+    Selections of an elector are limited to `elector_rate` per second
+    with bursts of `elector_burst`, selections in a game to `game_rate`
+    per second with bursts of `game_burst`. Rejected selections fail
+    with `com.werewolf.error.too_many_selections`. With `select_damping`,
+    selections are applied every `select_damping` seconds so repeated
+    toggles are notified once, by their net change (see `GameActor`).
+
+    Worker procedures (`com.werewolf.metrics`, `com.werewolf.set_profiling`
+    and `com.werewolf.get_profiles`) are about the worker answering the
+    call, `com.werewolf.worker.{id}.*` targets a given worker.
+    `com.werewolf.list_games` lists the games of every worker, worker by
+    worker, its cursor holds the id of the worker to read next.
+    `set_profiling` samples phases with a `PhaseProfiler` until it is
+    called with mode None.
+    """
+    procedures = ("create_game", "join_game", "leave_game", "get_players",
+                  "start_game", "select_player", "get_game_status",
+                  "get_game_state", "player_listen_topic")
+    worker_procedures = {
+        "metrics": "get_metrics",
+        "set_profiling": "set_profiling",
+        "get_profiles": "get_profiles",
+        "list_worker_games": "list_worker_games",
+    }
+
+    def __init__(self,
+                 wamp_component: Component,
+                 coalesce_window: Optional[float] = None,
+                 batch_selections: bool = False,
+                 worker_id: int = 0,
+                 nb_workers: int = 1,
+                 snapshot_dir: Optional[str] = None,
+                 snapshot_interval: float = 10,
+                 journal_dir: Optional[str] = None,
+                 lobby_ttl: float = 3600,
+                 waiting_ttl: float = 300,
+                 running_ttl: float = 1800,
+                 max_games: Optional[int] = None,
+                 reap_interval: float = 30,
+                 max_queue: int = 1000,
+                 queue_policy: str = "merge",
+                 elector_rate: Optional[float] = None,
+                 elector_burst: float = 10,
+                 game_rate: Optional[float] = None,
+                 game_burst: float = 100,
+                 select_damping: float = 0):
         self._wamp = wamp_component
+        self.coalesce_window = coalesce_window
+        self.batch_selections = batch_selections
+        self.worker_id = worker_id
+        self._ring = HashRing(nb_workers)
         self._session: Optional[
             ISession] = None  # "None" while we're disconnected from WAMP router
         self._wamp.on("join", self._initialize)
         self._wamp.on("leave", self._uninitialize)
         self._games: Dict[str:Game] = {}
+        # Inbox of the commands of each game, see `GameActor`.
+        self._actors: Dict[str, GameActor] = {}
+        self._state_caches: Dict[str, GameStateCache] = {}
+        self._directory = GameDirectory()
+        self._limiter = SelectionLimiter(elector_rate=elector_rate,
+                                         elector_burst=elector_burst,
+                                         game_rate=game_rate,
+                                         game_burst=game_burst)
+        self.select_damping = select_damping
+        self._scheduler = GameScheduler(on_game_done=self._on_game_done)
+        self._snapshots: Optional[SnapshotStore] = None
+        if snapshot_dir is not None:
+            self._snapshots = SnapshotStore(
+                os.path.join(snapshot_dir, f"worker-{worker_id}"))
+        self.snapshot_interval = snapshot_interval
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._journal: Optional[Journal] = None
+        if journal_dir is not None:
+            self._journal = Journal(
+                os.path.join(journal_dir, f"worker-{worker_id}"))
+        self._restored = False
+        self._reaper = GameReaper(self._on_game_evicted,
+                                  lobby_ttl=lobby_ttl,
+                                  waiting_ttl=waiting_ttl,
+                                  running_ttl=running_ttl,
+                                  max_games=max_games)
+        self.reap_interval = reap_interval
+        self._reap_task: Optional[asyncio.Task] = None
+        self._profiler: Optional[PhaseProfiler] = None
+        self.metrics = Metrics()
+        self._game_metrics = GameMetrics(self.metrics)
+        self.metrics.gauge("games", lambda: len(self._games))
+        self.metrics.gauge("running_games", lambda: len(self._scheduler))
+        self.metrics.gauge(
+            "players",
+            lambda: sum(game.nb_players for game in self._games.values()))
+        self._wamp_notifier = WampNotifier(None, acknowledge=True)
+        self._queued_notifier = QueuedNotifier(
+            MeteredNotifier(self._wamp_notifier, self.metrics),
+            max_queue=max_queue,
+            policy=queue_policy,
+            metrics=self.metrics)
+        self._queued_notifier.pause()
+        self._notifier: Notifier = self._queued_notifier
+        if coalesce_window is not None:
+            self._notifier = CoalescingNotifier(self._notifier,
+                                                coalesce_window,
+                                                batch_selections)
         self.log = txaio.make_logger()  # pylint:disable=no-member
 
-    def _initialize(self, session: ISession, details):  # pylint: disable=unused-argument
+    async def _initialize(self, session: ISession, details):  # pylint: disable=unused-argument
         self._session = session
-        session.register(self.create_game, "com.werewolf.create_game")
-        session.register(self.join_game, "com.werewolf.join_game")
-        session.register(self.start_game, "com.werewolf.start_game")
-        session.register(self.select_player, "com.werewolf.select_player")
-        session.register(self.player_listen_topic,
-                         "com.werewolf.player_listen_topic")
+        self._wamp_notifier.session = session
+        if not self._restored:
+            self._restored = True
+            self._restore_games()
+        if self._snapshots is not None and self._snapshot_task is None:
+            self._snapshot_task = asyncio.ensure_future(
+                self._save_games_periodically())
+        if self._reap_task is None:
+            self._reap_task = asyncio.ensure_future(
+                self._reap_games_periodically())
+        await asyncio.gather(*self._register_procedures(session))
+
+        # Send messages buffered while disconnected once procedures are
+        # available again to clients.
+        self.log.info("Sending {count} buffered messages",
+                      count=len(self._queued_notifier))
+        self._queued_notifier.resume()
+
+    def _register_procedures(self, session: ISession) -> list:
+        """
+        Register procedures and return the registration futures.
+        """
+        if self._ring.nb_workers == 1:
+            registrations = [
+                session.register(self._timed(name, getattr(self, name)),
+                                 f"com.werewolf.{name}")
+                for name in self.procedures
+            ]
+            registrations.extend(
+                session.register(getattr(self, name), f"com.werewolf.{uri}")
+                for uri, name in self.worker_procedures.items())
+            registrations.append(
+                session.register(self.list_games, "com.werewolf.list_games"))
+            return registrations
+
+        shared = RegisterOptions(invoke="roundrobin")
+        registrations = []
+        for name in self.procedures:
+            procedure = self._timed(name, getattr(self, name))
+            registrations.append(
+                session.register(self._route(name, procedure),
+                                 f"com.werewolf.{name}",
+                                 options=shared))
+            registrations.append(
+                session.register(
+                    procedure,
+                    f"com.werewolf.worker.{self.worker_id}.{name}"))
+        for uri, name in self.worker_procedures.items():
+            registrations.append(
+                session.register(getattr(self, name),
+                                 f"com.werewolf.{uri}",
+                                 options=shared))
+            registrations.append(
+                session.register(
+                    getattr(self, name),
+                    f"com.werewolf.worker.{self.worker_id}.{uri}"))
+        registrations.append(
+            session.register(self.list_games,
+                             "com.werewolf.list_games",
+                             options=shared))
+        return registrations
+
+    def _timed(self, name, procedure):
+        """
+        Return procedure recording its duration and failures in metrics.
+        """
+        duration = self.metrics.histogram("rpc_duration_seconds",
+                                          procedure=name)
+        errors = self.metrics.counter("rpc_errors_total", procedure=name)
+
+        @functools.wraps(procedure)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await procedure(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+
+        return timed
+
+    def _route(self, name, procedure):
+        """
+        Return procedure calling the worker owning the game.
+        """
+        @functools.wraps(procedure)
+        async def route(game_name, *args, **kwargs):
+            owner = self._ring.owner(game_name)
+            if owner == self.worker_id:
+                return await procedure(game_name, *args, **kwargs)
+            return await self._call_worker(owner, name, game_name, *args,
+                                           **kwargs)
+
+        return route
+
+    async def _call_worker(self, worker_id, name, *args, **kwargs):
+        """
+        Call the procedure name of an other worker.
+        """
+        if self._session is None:
+            raise ApplicationError(
+                "com.werewolf.error.unavailable",
+                f"Worker {self.worker_id} is disconnected from the router")
+        return await self._session.call(
+            f"com.werewolf.worker.{worker_id}.{name}", *args, **kwargs)
 
     def _uninitialize(self, session, reason):  # pylint:disable=unused-argument
         self.log.error("Lost WAMP connection")
         self._session = None
+        self._queued_notifier.pause()
+        self._wamp_notifier.session = None
+        self._save_games()
+
+    def _restore_games(self):
+        if self._journal is not None:
+            games = replay_games(self._journal.replay(), self._make_notifier)
+            for game in games.values():
+                game.add_listener(self._journal.record)
+                self._restore_game(game)
+        if self._snapshots is not None:
+            for game in self._snapshots.load_all(self._make_notifier,
+                                                 self._on_snapshot_error):
+                if game.name not in self._games:
+                    self._restore_game(game)
 
-    async def create_game(self, game_name, player_name):
+    def _on_snapshot_error(self, path: str, exc: Exception):
+        self.log.error("Snapshot {path} skipped: {exc}", path=path, exc=exc)
+
+    def _restore_game(self, game: Game):
+        self._games[game.name] = game
+        self._actors[game.name] = GameActor(game, self.select_damping)
+        self._wamp_notifier.add_game(game)
+        self._directory.add(game)
+        game.add_listener(self._directory, GameDirectory.events)
+        game.add_listener(self._game_metrics, GameMetrics.events)
+        if self._profiler is not None:
+            game.add_hook(self._profiler)
+        self._reaper.add(game)
+        if game.started:
+            self._scheduler.add(game)
+        self.log.info("Game {name} restored", name=game.name)
+
+    def _add_game(self, game: Game):
+        self._games[game.name] = game
+        self._actors[game.name] = GameActor(game, self.select_damping)
+        self._wamp_notifier.add_game(game)
+        self._directory.add(game)
+        game.add_listener(self._directory, GameDirectory.events)
+        if self._journal is not None:
+            self._journal.game_created(game)
+        game.add_listener(self._game_metrics, GameMetrics.events)
+        if self._profiler is not None:
+            game.add_hook(self._profiler)
+        self._reaper.add(game)
+
+    def _remove_game(self, game: Game):
+        del self._games[game.name]
+        self._actors.pop(game.name).close()
+        self._wamp_notifier.remove_game(game.name)
+        self._directory.remove(game.name)
+        self._limiter.forget(game.name)
+        self._state_caches.pop(game.name, None)
+        self._reaper.remove(game.name)
+        self._game_metrics.forget(game.name)
+        if self._profiler is not None:
+            game.remove_hook(self._profiler)
+            self._profiler.forget(game)
+        if self._snapshots is not None:
+            self._snapshots.remove(game.name)
+        if self._journal is not None:
+            self._journal.game_done(game)
+
+    def _save_games(self):
+        if self._snapshots is None:
+            return
+        for game in self._games.values():
+            self._snapshots.save(game)
+
+    def _get_actor(self, game_name) -> GameActor:
+        """
+        Return the actor of game and record a player activity on it.
+        """
+        actor = self._actors[game_name]
+        self._reaper.touch(game_name)
+        return actor
+
+    def _on_game_evicted(self, game: Game, reason: str):
+        self.log.info("Game {name} evicted ({reason})",
+                      name=game.name,
+                      reason=reason)
+        self.metrics.counter("games_evicted_total", reason=reason).inc()
+        if game.name in self._scheduler:
+            self._scheduler.remove(game.name)
+        self._remove_game(game)
+        game.notifier.send_to_game(game.name, "evicted", {"reason": reason})
+
+    async def _reap_games_periodically(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            self._reaper.reap()
+
+    async def _save_games_periodically(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self._save_games()
+
+    def _make_notifier(self) -> Notifier:
+        return self._notifier
+
+    async def create_game(self, game_name, player_name, settings=None):
         if game_name in self._games:
             raise Exception(f"The game with {game_name} already exist")
 
-        game = Game(game_name, WampNotifier(self._session))
+        if settings is None:
+            settings = {}
+        game = Game(game_name,
+                    self._make_notifier(),
+                    settings=GameSettings(**settings))
+        self._add_game(game)
         player = Player(player_name)
         game.add_player(player)
-        self._games[game_name] = game
+        return game.get_players_snapshot()
 
     async def join_game(self, game_name, player_name):
+        return await self._get_actor(game_name).join(player_name)
+
+    async def leave_game(self, game_name, player_name):
+        actor = self._get_actor(game_name)
+        await actor.call(actor.game.remove_player, player_name)
+        if (not any(actor.game.get_players())
+                and self._games.get(game_name) is actor.game):
+            self._remove_game(actor.game)
+
+    async def get_players(self, game_name):
         game = self._games[game_name]
-        new_player = Player(player_name)
-        return game.add_player(new_player)
+        return game.get_players_snapshot()
 
     async def start_game(self, game_name):
-        game = self._games[game_name]
-        game.start()
+        actor = self._get_actor(game_name)
+        game = actor.game
+        await actor.call(game.start)
 
         self.log.error("start game")
-        future = asyncio.create_task(self._run_game(game))
+        self._scheduler.add(game)
 
-        def log_game_error(game_task):
-            exc = game_task.exception()
-            if exc is not None:
-                self.log.error(exc)
-            del self._games[game_name]
+    def _on_game_done(self, game, exc):
+        if exc is not None:
+            self.log.error(exc)
+        self._remove_game(game)
+        if exc is None:
+            self._directory.finish(game)
 
-        future.add_done_callback(log_game_error)
-
-    async def player_listen_topic(self, game_name, player_name):
+    async def get_game_status(self, game_name):
         game = self._games[game_name]
-        game.player_listen_topic(player_name)
+        return game.get_status()
 
-    async def _run_game(self, game):
-        await game.wait_for_all_player_listen()
-        while True:
-            i = 0
-            while not game.enter_in_next_phase():
-                i += 1
-                if i > 3:
-                    raise RuntimeError("No next phase but game is not done.")
-
-            await asyncio.sleep(30)
-            if game.close_the_current_phase():
-                break
-            await asyncio.sleep(3)
+    async def get_game_state(self, game_name, player_name, version=None):
+        """
+        Return the state of game seen by player, see `GameStateCache`.
+        """
+        cache = self._state_caches.get(game_name)
+        if cache is None:
+            cache = self._state_caches[game_name] = GameStateCache(
+                self._games[game_name])
+        return cache.get(player_name, version)
+
+    async def player_listen_topic(self, game_name, player_name):
+        await self._get_actor(game_name).listen(player_name)
 
     async def select_player(self, game_name, selected_player_name: str,
                             elector_player_name: str):
-        game = self._games[game_name]
-        return game.select_player_from_name(selected_player_name,
-                                            elector_player_name)
+        actor = self._get_actor(game_name)
+        if self._limiter.enabled:
+            if actor.game.get_player(elector_player_name) is None:
+                raise ValueError(
+                    f"Player {elector_player_name!r} does not exist")
+            reason = self._limiter.admit(game_name, elector_player_name)
+            if reason is not None:
+                self.metrics.counter("selections_rejected_total",
+                                     reason=reason).inc()
+                raise ApplicationError(
+                    "com.werewolf.error.too_many_selections",
+                    f"Too many selections ({reason} limit)")
+        return await actor.select(selected_player_name, elector_player_name)
+
+    async def get_metrics(self, output_format="json"):
+        """
+        Return metrics as a dict, or as Prometheus text when
+        output_format is "prometheus".
+        """
+        if output_format == "prometheus":
+            return self.metrics.to_prometheus()
+        return {
+            "worker": self.worker_id,
+            "uptime": time.time() - self.metrics.started,
+            "metrics": self.metrics.snapshot(),
+        }
+
+    async def set_profiling(self, mode=None, every=10):
+        """
+        Sample one phase out of every with mode ("cprofile" or
+        "tracemalloc"), or stop sampling when mode is None.
+        """
+        if self._profiler is not None:
+            for game in self._games.values():
+                game.remove_hook(self._profiler)
+            self._profiler.cancel()
+            self._profiler = None
+        if mode is None:
+            return
+        self._profiler = PhaseProfiler(mode, every)
+        for game in self._games.values():
+            game.add_hook(self._profiler)
+
+    async def list_worker_games(self,
+                                state="lobby",
+                                min_seats=0,
+                                cursor=None,
+                                limit=20):
+        """
+        Return a page of the games of this worker in state ("lobby",
+        "running" or "finished") with at least min_seats open seats, see
+        `GameDirectory.list`.
+        """
+        return self._directory.list(state, min_seats, cursor, limit)
+
+    async def list_games(self,
+                         state="lobby",
+                         min_seats=0,
+                         cursor=None,
+                         limit=20):
+        """
+        Return a page of the games of every worker, see
+        `list_worker_games`.
+
+        The cursor is `[worker_id, cursor of the worker]`, the page is
+        completed with the games of the next workers. `total` counts the
+        games of the workers read for the page.
+        """
+        worker_id, worker_cursor = (0, None) if cursor is None else cursor
+        games = []
+        total = 0
+        next_cursor = None
+        while worker_id < self._ring.nb_workers:
+            if worker_id == self.worker_id:
+                page = await self.list_worker_games(state, min_seats,
+                                                    worker_cursor,
+                                                    limit - len(games))
+            else:
+                page = await self._call_worker(worker_id,
+                                               "list_worker_games", state,
+                                               min_seats, worker_cursor,
+                                               limit - len(games))
+            games.extend(page["games"])
+            total += page["total"]
+            if page["cursor"] is not None:
+                next_cursor = [worker_id, page["cursor"]]
+                break
+            worker_id += 1
+            worker_cursor = None
+            if len(games) == limit:
+                if worker_id < self._ring.nb_workers:
+                    next_cursor = [worker_id, None]
+                break
+        return {"games": games, "total": total, "cursor": next_cursor}
+
+    async def get_profiles(self):
+        """
+        Return the reports of the latest sampled phases.
+        """
+        if self._profiler is None:
+            return []
+        return list(self._profiler.reports)
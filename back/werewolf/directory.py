@@ -0,0 +1,204 @@
+"""
+Directory of the games of a controller, to let clients discover them.
+
+    directory = GameDirectory()
+    directory.add(game)
+    game.add_listener(directory, GameDirectory.events)
+    page = directory.list("lobby", min_seats=1)
+    next_page = directory.list("lobby", min_seats=1, cursor=page["cursor"])
+
+Games are indexed by lifecycle state (lobby, running and finished) in
+their creation order, a page is read from the position of the cursor in
+the index of the state instead of scanning every game. Each index has a
+version changed on every change of its games, first pages are cached
+until it changes so polling lobby browsers rarely build a page. Lobbies
+with open seats have their own index, read when `min_seats` is given so
+full lobbies are not scanned.
+"""
+
+import bisect
+import itertools
+from typing import Dict, List, Optional, Tuple, Union
+
+from .models import Game
+
+STATES = ("lobby", "running", "finished")
+
+
+class _Index:
+    """
+    Entries of one state ordered by sequence number.
+    """
+    def __init__(self):
+        self.seqs: List[int] = []
+        self.entries: Dict[int, Union[Game, dict]] = {}
+        self.version = 0
+        self.first_pages: Dict[Tuple[int, int], dict] = {}
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def insert(self, seq: int, entry: Union[Game, dict]):
+        if not self.seqs or seq > self.seqs[-1]:
+            self.seqs.append(seq)
+        else:
+            bisect.insort(self.seqs, seq)
+        self.entries[seq] = entry
+        self.changed()
+
+    def remove(self, seq: int):
+        del self.seqs[bisect.bisect_left(self.seqs, seq)]
+        del self.entries[seq]
+        self.changed()
+
+    def changed(self):
+        self.version += 1
+        if self.first_pages:
+            self.first_pages = {}
+
+
+class GameDirectory:
+    """
+    Index of games by lifecycle state, kept up to date as a game
+    listener registered with `events`.
+
+    Finished games are not game objects anymore, a summary of the
+    `max_finished` latest ones is kept.
+    """
+    events = ("player_added", "player_removed", "roles_dispatched")
+
+    def __init__(self, max_finished: int = 1000, max_limit: int = 100):
+        self.max_finished = max_finished
+        self.max_limit = max_limit
+        self._seqs = itertools.count()
+        self._indexes = {state: _Index() for state in STATES}
+        # Lobbies with open seats
+        self._open = _Index()
+        # Sequence number and state of the games being played
+        self._games: Dict[str, Tuple[int, str]] = {}
+        self.page_builds = 0
+
+    def __len__(self):
+        return len(self._games)
+
+    def counts(self) -> Dict[str, int]:
+        return {state: len(index) for state, index in self._indexes.items()}
+
+    def add(self, game: Game):
+        state = "running" if game.started else "lobby"
+        seq = next(self._seqs)
+        self._games[game.name] = (seq, state)
+        self._indexes[state].insert(seq, game)
+        self._update_open(seq, state, game)
+
+    def remove(self, game_name: str):
+        seq, state = self._games.pop(game_name)
+        self._indexes[state].remove(seq)
+        if seq in self._open.entries:
+            self._open.remove(seq)
+
+    def _update_open(self, seq: int, state: str, game: Game):
+        is_open = state == "lobby" and game.open_seats != 0
+        if is_open != (seq in self._open.entries):
+            if is_open:
+                self._open.insert(seq, game)
+            else:
+                self._open.remove(seq)
+        elif is_open:
+            self._open.changed()
+
+    def finish(self, game: Game):
+        """
+        Move game to the finished games.
+        """
+        if game.name in self._games:
+            self.remove(game.name)
+        index = self._indexes["finished"]
+        index.insert(
+            next(self._seqs), {
+                "name": game.name,
+                "state": "finished",
+                "players": game.nb_players,
+                "open_seats": 0,
+                "winner": game.get_status()["winner"],
+            })
+        while len(index) > self.max_finished:
+            index.remove(index.seqs[0])
+
+    def __call__(self, game: Game, event: str, details: dict):
+        if game.name not in self._games:
+            return
+        seq, state = self._games[game.name]
+        if event == "roles_dispatched":
+            self._indexes[state].remove(seq)
+            self._games[game.name] = (seq, "running")
+            self._indexes["running"].insert(seq, game)
+            state = "running"
+        else:
+            self._indexes[state].changed()
+        self._update_open(seq, state, game)
+
+    def list(self,
+             state: str = "lobby",
+             min_seats: int = 0,
+             cursor: Optional[int] = None,
+             limit: int = 20) -> dict:
+        """
+        Return a page of the games in state with at least min_seats open
+        seats, following cursor when it is given:
+
+            {"games": [{"name": "", "state": "", "players": 0,
+                        "open_seats": 0 or null}],
+             "total": 0,
+             "cursor": 0 or null}
+
+        `total` counts the games in state, `cursor` is null on the last
+        page. `open_seats` is null when the number of players is not
+        limited.
+        """
+        index = self._indexes.get(state)
+        if index is None:
+            raise ValueError(f"state must be one of {STATES!r} not {state!r}")
+        if not 1 <= limit <= self.max_limit:
+            raise ValueError(
+                f"limit must be in [1, {self.max_limit}] not {limit!r}")
+        total = len(index)
+        if state == "lobby" and min_seats > 0:
+            index = self._open
+        if cursor is None:
+            key = (min_seats, limit)
+            page = index.first_pages.get(key)
+            if page is None:
+                page = index.first_pages[key] = self._page(
+                    index, state, min_seats, 0, limit, total)
+            return page
+        return self._page(index, state, min_seats,
+                          bisect.bisect_right(index.seqs, cursor), limit,
+                          total)
+
+    def _page(self, index: _Index, state: str, min_seats: int,
+              position: int, limit: int, total: int) -> dict:
+        self.page_builds += 1
+        games = []
+        seqs = index.seqs
+        while position < len(seqs) and len(games) < limit:
+            entry = index.entries[seqs[position]]
+            position += 1
+            if isinstance(entry, dict):
+                summary = entry
+            else:
+                summary = {
+                    "name": entry.name,
+                    "state": state,
+                    "players": entry.nb_players,
+                    "open_seats": entry.open_seats,
+                }
+            seats = summary["open_seats"]
+            if min_seats and seats is not None and seats < min_seats:
+                continue
+            games.append(summary)
+        return {
+            "games": games,
+            "total": total,
+            "cursor": seqs[position - 1] if position < len(seqs) else None,
+        }
@@ -0,0 +1,100 @@
+"""
+Evict idle games and keep the number of games bounded.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from .models import Game
+
+EvictCallback = Callable[[Game, str], None]
+
+
+def game_stage(game: Game) -> str:
+    """
+    Return the lifecycle stage of game: lobby, waiting or running.
+    """
+    if not game.started:
+        return "lobby"
+    if not game.all_player_listen():
+        return "waiting"
+    return "running"
+
+
+class GameReaper:
+    """
+    Track the last activity of games.
+
+    A game idle for longer than the TTL of its stage is evicted by
+    `reap`. When more than `max_games` games are tracked, the least
+    recently used one is evicted. `on_evict` is called with the evicted
+    game and the reason (the stage or "capacity"), `evictions` counts
+    evictions by reason.
+    """
+    def __init__(self,
+                 on_evict: EvictCallback,
+                 lobby_ttl: float = 3600,
+                 waiting_ttl: float = 300,
+                 running_ttl: float = 1800,
+                 max_games: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.on_evict = on_evict
+        self.ttls = {
+            "lobby": lobby_ttl,
+            "waiting": waiting_ttl,
+            "running": running_ttl,
+        }
+        self.max_games = max_games
+        self.clock = clock
+        self.evictions: Dict[str, int] = {}
+        # Games ordered from the least to the most recently used.
+        self._last_activity: "OrderedDict[str, float]" = OrderedDict()
+        self._games: Dict[str, Game] = {}
+
+    def __len__(self):
+        return len(self._games)
+
+    def add(self, game: Game):
+        self._games[game.name] = game
+        self._last_activity[game.name] = self.clock()
+        if self.max_games is not None:
+            while len(self._games) > self.max_games:
+                oldest = next(iter(self._last_activity))
+                self._evict(oldest, "capacity")
+
+    def remove(self, game_name: str):
+        self._games.pop(game_name, None)
+        self._last_activity.pop(game_name, None)
+
+    def touch(self, game_name: str):
+        """
+        Record an activity on game.
+        """
+        if game_name in self._last_activity:
+            self._last_activity[game_name] = self.clock()
+            self._last_activity.move_to_end(game_name)
+
+    def reap(self):
+        """
+        Evict the games idle for longer than the TTL of their stage.
+        """
+        now = self.clock()
+        min_ttl = min(self.ttls.values())
+        expired = []
+        for game_name, last_activity in self._last_activity.items():
+            idle = now - last_activity
+            if idle < min_ttl:
+                # Following games have been used more recently.
+                break
+            stage = game_stage(self._games[game_name])
+            if idle >= self.ttls[stage]:
+                expired.append((game_name, stage))
+        for game_name, stage in expired:
+            self._evict(game_name, stage)
+
+    def _evict(self, game_name: str, reason: str):
+        game = self._games[game_name]
+        self.remove(game_name)
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        self.on_evict(game, reason)
@@ -0,0 +1,240 @@
+"""
+Append-only journal of game events.
+
+The journal is a directory of segments. A segment is a sequence of
+records, each one being a 4 bytes little-endian length followed by the
+msgpack encoding of `[timestamp, game_name, event, details]`. Events
+are the ones sent to `GameListener` plus:
+
+    game_created    {"settings": {...}}
+    game_done       {}
+
+Segments are rotated once they exceed `segment_size` bytes. On
+rotation, the records of the done games are removed from the rotated
+segments and segments left empty are deleted. A segment without records
+is deleted when the journal is opened or closed.
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+import msgpack
+
+from .models import Game, GameSettings, Notifier, Player, Role
+from .notifiers import NullNotifier
+
+HEADER = struct.Struct("<I")
+
+Record = list  # [timestamp, game_name, event, details]
+
+
+def read_segment(path: str) -> Iterator[Record]:
+    """
+    Yield the records of segment.
+
+    A truncated record at the end of segment, left by a crash while it
+    was written, is ignored.
+    """
+    with open(path, "rb") as segment:
+        size = os.fstat(segment.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(segment.fileno(), 0,
+                       access=mmap.ACCESS_READ) as mapping:
+            offset = 0
+            while offset + HEADER.size <= size:
+                (length, ) = HEADER.unpack_from(mapping, offset)
+                start = offset + HEADER.size
+                end = start + length
+                if end > size:
+                    break
+                yield msgpack.unpackb(mapping[start:end], raw=False)
+                offset = end
+
+
+class Journal:
+    """
+    Journal of a controller stored in directory.
+
+    Call `record` on each game event, it can be registered as a game
+    listener.
+    """
+    prefix = "segment-"
+    suffix = ".journal"
+
+    def __init__(self, directory: str, segment_size: int = 64 * 2**20):
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._games_by_segment: Dict[str, Set[str]] = {}
+        self._done_games: Set[str] = set()
+        for path in self.segments():
+            game_names = set()
+            for _, game_name, event, _ in read_segment(path):
+                game_names.add(game_name)
+                if event == "game_done":
+                    self._done_games.add(game_name)
+            if game_names:
+                self._games_by_segment[path] = game_names
+            else:
+                os.remove(path)
+        self.compactions = 0
+        self._file = None
+        self._path: Optional[str] = None
+        self._size = 0
+        self._rotate()
+
+    def segments(self) -> List[str]:
+        """
+        Return the paths of segments from the oldest to the newest.
+        """
+        return sorted(
+            os.path.join(self.directory, file_name)
+            for file_name in os.listdir(self.directory)
+            if file_name.startswith(self.prefix)
+            and file_name.endswith(self.suffix))
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        segments = self.segments()
+        number = 0
+        if segments:
+            number = int(
+                os.path.basename(segments[-1])[len(self.prefix):-len(
+                    self.suffix)]) + 1
+        self._path = os.path.join(self.directory,
+                                  f"{self.prefix}{number:08d}{self.suffix}")
+        self._file = open(self._path, "ab")
+        self._size = 0
+        self._games_by_segment[self._path] = set()
+
+    def append(self, game_name: str, event: str, details: dict):
+        payload = msgpack.packb([time.time(), game_name, event, details],
+                                use_bin_type=True)
+        self._file.write(HEADER.pack(len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self._size += HEADER.size + len(payload)
+        self._games_by_segment[self._path].add(game_name)
+        if self._size >= self.segment_size:
+            self._rotate()
+            self.compact()
+
+    def record(self, game: Game, event: str, details: dict):
+        self.append(game.name, event, details)
+
+    def game_created(self, game: Game):
+        """
+        Record the creation of game and follow its events.
+        """
+        self.append(game.name, "game_created",
+                    {"settings": game.to_state()["settings"]})
+        game.add_listener(self.record)
+
+    def game_done(self, game: Game):
+        """
+        Record the end of game and stop following its events.
+        """
+        game.remove_listener(self.record)
+        self._done_games.add(game.name)
+        self.append(game.name, "game_done", {})
+
+    def compact(self):
+        """
+        Remove the records of done games from rotated segments.
+        """
+        if not self._done_games:
+            return
+        self.compactions += 1
+        for path, game_names in list(self._games_by_segment.items()):
+            if path == self._path or not game_names & self._done_games:
+                continue
+            game_names -= self._done_games
+            if not game_names:
+                os.remove(path)
+                del self._games_by_segment[path]
+                continue
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as segment:
+                for record in read_segment(path):
+                    if record[1] in game_names:
+                        payload = msgpack.packb(record, use_bin_type=True)
+                        segment.write(HEADER.pack(len(payload)))
+                        segment.write(payload)
+            os.replace(tmp_path, path)
+
+        # Forget done games once their records are only in rotated
+        # segments that have been compacted.
+        self._done_games &= self._games_by_segment[self._path]
+
+    def replay(self) -> Iterator[Record]:
+        """
+        Yield the records of every segment in order.
+        """
+        self._file.flush()
+        for path in self.segments():
+            yield from read_segment(path)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if not self._size:
+            os.remove(self._path)
+            del self._games_by_segment[self._path]
+
+
+def replay_games(records: Iterator[Record],
+                 make_notifier: Callable[[], Notifier]) -> Dict[str, Game]:
+    """
+    Rebuild the games not done from records.
+
+    Games are replayed with a notifier dropping messages, then restored
+    with a notifier given by make_notifier.
+    """
+    games: Dict[str, Game] = {}
+    for _, game_name, event, details in records:
+        if event == "game_created":
+            games[game_name] = Game(
+                game_name,
+                NullNotifier(),
+                settings=GameSettings(**details["settings"]))
+            continue
+        game = games.get(game_name)
+        if game is None:
+            continue
+        if event == "game_done":
+            del games[game_name]
+        elif event == "player_added":
+            game.add_player(Player(details["name"]))
+        elif event == "player_removed":
+            game.remove_player(details["name"])
+        elif event == "roles_dispatched":
+            game.role_dispatcher = _recorded_roles(details["roles"])
+            game.start()
+        elif event == "player_listen":
+            game.player_listen_topic(details["name"])
+        elif event == "phase_entered":
+            game.enter_in_next_phase()
+        elif event == "player_selected":
+            game.select_player_from_name(details["selected"],
+                                         details["elector"])
+        elif event == "phase_closed":
+            game.close_the_current_phase()
+
+    return {
+        name: Game.from_state(game.to_state(), make_notifier())
+        for name, game in games.items()
+    }
+
+
+def _recorded_roles(roles: Dict[str, str]):
+    def dispatch(players):
+        for player in players:
+            player.role = Role(roles[player.name])
+
+    return dispatch
@@ -0,0 +1,260 @@
+"""
+In-process stand-in for a WAMP router, to run controllers and clients in
+one event loop without crossbar.
+
+    router = LocalRouter()
+    component = LocalComponent(router)
+    Controller(component)
+    await component.start()
+    client = router.session()
+    await client.call("com.werewolf.create_game", "game", "Tom")
+
+It implements the part of WAMP used by the controller and the front:
+registrations (shared ones are invoked round robin), calls, exact and
+prefix subscriptions, and publications that exclude the publisher and
+are acknowledged on request. Events are delivered by the event loop,
+after the publish returns, like a router does. With `measure`, the time
+between a publish and the delivery of each event is recorded in the
+`delivery_delays` histogram.
+"""
+
+import asyncio
+import inspect
+import itertools
+import time
+from typing import Callable, Dict, List, Optional
+
+from autobahn.wamp.exception import ApplicationError
+from autobahn.wamp.request import Publication, Registration, Subscription
+from autobahn.wamp.types import EventDetails
+
+from .metrics import Histogram
+
+
+class LocalRegistration(Registration):
+    async def unregister(self):
+        self.session.router.unregister(self)
+
+
+class LocalSubscription(Subscription):
+    def __init__(self, session: "LocalSession", subscription_id: int,
+                 topic: str, handler: Callable, match: str,
+                 details_arg: Optional[str]):
+        super().__init__(subscription_id, topic, session, handler)
+        self.match = match
+        self.details_arg = details_arg
+
+    async def unsubscribe(self):
+        self.session.router.unsubscribe(self)
+
+
+class LocalRouter:
+    """
+    Route calls and events between the sessions it creates.
+    """
+    def __init__(self, measure: bool = False):
+        self.measure = measure
+        self.delivery_delays = Histogram()
+        self._ids = itertools.count(1)
+        # Registrations by procedure, with the index of the next one to
+        # invoke for shared registrations.
+        self._registrations: Dict[str, List[LocalRegistration]] = {}
+        self._next_registration: Dict[str, int] = {}
+        self._exact: Dict[str, List[LocalSubscription]] = {}
+        # Prefix subscriptions by prefix, a topic is matched by looking up
+        # its beginnings of each prefix length.
+        self._prefix: Dict[str, List[LocalSubscription]] = {}
+        self._prefix_lengths: Dict[int, int] = {}
+        self.published = 0
+        self.delivered = 0
+
+    def session(self) -> "LocalSession":
+        return LocalSession(self)
+
+    def register(self, registration: LocalRegistration, invoke: str):
+        registrations = self._registrations.setdefault(
+            registration.procedure, [])
+        if registrations and invoke == "single":
+            raise ApplicationError(ApplicationError.PROCEDURE_ALREADY_EXISTS,
+                                   registration.procedure)
+        registrations.append(registration)
+
+    def unregister(self, registration: LocalRegistration):
+        registrations = self._registrations.get(registration.procedure, [])
+        if registration in registrations:
+            registrations.remove(registration)
+        if not registrations:
+            self._registrations.pop(registration.procedure, None)
+
+    def subscribe(self, subscription: LocalSubscription):
+        if subscription.match == "prefix":
+            length = len(subscription.topic)
+            self._prefix_lengths[length] = self._prefix_lengths.get(
+                length, 0) + 1
+            self._prefix.setdefault(subscription.topic,
+                                    []).append(subscription)
+        else:
+            self._exact.setdefault(subscription.topic, []).append(subscription)
+
+    def unsubscribe(self, subscription: LocalSubscription):
+        if subscription.match == "prefix":
+            self._prefix[subscription.topic].remove(subscription)
+            length = len(subscription.topic)
+            self._prefix_lengths[length] -= 1
+            if not self._prefix_lengths[length]:
+                del self._prefix_lengths[length]
+        else:
+            self._exact[subscription.topic].remove(subscription)
+
+    def remove_session(self, session: "LocalSession"):
+        for registrations in list(self._registrations.values()):
+            for registration in list(registrations):
+                if registration.session is session:
+                    self.unregister(registration)
+        for subscriptions in itertools.chain(
+                list(self._exact.values()), list(self._prefix.values())):
+            for subscription in list(subscriptions):
+                if subscription.session is session:
+                    self.unsubscribe(subscription)
+
+    async def call(self, procedure: str, args, kwargs):
+        registrations = self._registrations.get(procedure)
+        if not registrations:
+            raise ApplicationError(ApplicationError.NO_SUCH_PROCEDURE,
+                                   procedure)
+        index = self._next_registration.get(procedure, 0) % len(registrations)
+        self._next_registration[procedure] = index + 1
+        try:
+            result = registrations[index].endpoint(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+        except ApplicationError:
+            raise
+        except Exception as exc:
+            raise ApplicationError("wamp.error.runtime_error",
+                                   str(exc)) from exc
+        return result
+
+    def publish(self, publisher: "LocalSession", topic: str, args, kwargs,
+                exclude_me: bool) -> int:
+        publication_id = next(self._ids)
+        self.published += 1
+        subscriptions = list(self._exact.get(topic, ()))
+        for length in self._prefix_lengths:
+            subscriptions.extend(self._prefix.get(topic[:length], ()))
+        loop = asyncio.get_running_loop()
+        published_at = time.perf_counter() if self.measure else None
+        for subscription in subscriptions:
+            if exclude_me and subscription.session is publisher:
+                continue
+            loop.call_soon(self._deliver, subscription, publication_id, topic,
+                           args, kwargs, published_at)
+        return publication_id
+
+    def _deliver(self, subscription: LocalSubscription, publication_id: int,
+                 topic: str, args, kwargs, published_at: Optional[float]):
+        self.delivered += 1
+        if published_at is not None:
+            self.delivery_delays.observe(time.perf_counter() - published_at)
+        if subscription.details_arg is not None:
+            kwargs = dict(kwargs)
+            kwargs[subscription.details_arg] = EventDetails(subscription,
+                                                            publication_id,
+                                                            topic=topic)
+        result = subscription.handler(*args, **kwargs)
+        if inspect.isawaitable(result):
+            asyncio.ensure_future(result)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+
+class LocalSession:
+    """
+    Session of a `LocalRouter`, with the methods of an autobahn session
+    used by the controller and clients.
+    """
+    def __init__(self, router: LocalRouter):
+        self.router = router
+
+    async def register(self, endpoint: Callable, procedure: str,
+                       options=None) -> LocalRegistration:
+        registration = LocalRegistration(self, self.router.next_id(),
+                                         procedure, endpoint)
+        invoke = "single"
+        if options is not None and options.invoke is not None:
+            invoke = options.invoke
+        self.router.register(registration, invoke)
+        return registration
+
+    async def call(self, procedure: str, *args, **kwargs):
+        kwargs.pop("options", None)
+        return await self.router.call(procedure, args, kwargs)
+
+    async def subscribe(self, handler: Callable, topic: str,
+                        options=None) -> LocalSubscription:
+        match = "exact"
+        details_arg = None
+        if options is not None:
+            match = options.match or "exact"
+            if options.details_arg is not None:
+                details_arg = options.details_arg
+            elif options.details:
+                details_arg = "details"
+        subscription = LocalSubscription(self, self.router.next_id(), topic,
+                                         handler, match, details_arg)
+        self.router.subscribe(subscription)
+        return subscription
+
+    def publish(self, topic: str, *args, options=None, **kwargs):
+        exclude_me = True
+        acknowledge = False
+        if options is not None:
+            if options.exclude_me is not None:
+                exclude_me = options.exclude_me
+            acknowledge = bool(options.acknowledge)
+        publication_id = self.router.publish(self, topic, args, kwargs,
+                                             exclude_me)
+        if not acknowledge:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(Publication(publication_id, was_encrypted=False))
+        return future
+
+    def leave(self):
+        self.router.remove_session(self)
+
+
+class LocalComponent:
+    """
+    Stand-in for an autobahn `Component` whose session is a
+    `LocalSession`.
+    """
+    def __init__(self, router: LocalRouter):
+        self.router = router
+        self.session: Optional[LocalSession] = None
+        self._handlers: Dict[str, List[Callable]] = {}
+
+    def on(self, event: str, handler: Callable):  # pylint: disable=invalid-name
+        self._handlers.setdefault(event, []).append(handler)
+
+    async def _fire(self, event: str, *args):
+        for handler in self._handlers.get(event, ()):
+            result = handler(*args)
+            if inspect.isawaitable(result):
+                await result
+
+    async def start(self):
+        """
+        Join the router, as on a (re)connection.
+        """
+        self.session = self.router.session()
+        await self._fire("join", self.session, None)
+
+    async def stop(self):
+        """
+        Leave the router, as on a connection loss.
+        """
+        session, self.session = self.session, None
+        session.leave()
+        await self._fire("leave", session, None)
@@ -0,0 +1,296 @@
+"""
+Counters, gauges and latency histograms of a controller.
+
+    >>> metrics = Metrics()
+    >>> metrics.counter("publishes_total", subject="close_phase").inc()
+    >>> metrics.histogram("rpc_duration_seconds",
+    ...                   procedure="join_game").observe(0.002)
+    >>> metrics.snapshot()["publishes_total"]["samples"]
+    [{'labels': {'subject': 'close_phase'}, 'value': 1}]
+
+Histograms keep log-linear buckets, like HDR histograms: each power of
+two is split in `sub_buckets` buckets, so quantiles are given with a
+relative error below 1 / sub_buckets whatever the range of values.
+"""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import Game
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    __slots__ = ("value", )
+
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """
+    Value set by the caller, or computed by function when given.
+    """
+    __slots__ = ("value", "function")
+
+    kind = "gauge"
+
+    def __init__(self, function: Optional[Callable[[], float]] = None):
+        self.value = 0
+        self.function = function
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def snapshot(self):
+        if self.function is not None:
+            return self.function()
+        return self.value
+
+
+class Histogram:
+    """
+    Distribution of positive values.
+    """
+    __slots__ = ("sub_buckets", "buckets", "count", "sum", "min", "max")
+
+    kind = "histogram"
+    quantiles = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self, sub_buckets: int = 16):
+        self.sub_buckets = sub_buckets
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value > 0:
+            mantissa, exponent = math.frexp(value)
+            key = exponent * self.sub_buckets + int(
+                (mantissa - 0.5) * 2 * self.sub_buckets)
+        else:
+            key = None
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def upper_bound(self, key: Optional[int]) -> float:
+        """
+        Return the highest value counted in bucket key.
+        """
+        if key is None:
+            return 0.0
+        exponent, sub_bucket = divmod(key, self.sub_buckets)
+        return math.ldexp(0.5 + (sub_bucket + 1) / (2 * self.sub_buckets),
+                          exponent)
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """
+        Return the (upper bound, number of values lower or equal) of
+        each non-empty bucket, in ascending order.
+        """
+        result = []
+        total = 0
+        for key in sorted(self.buckets,
+                          key=lambda key: -math.inf if key is None else key):
+            total += self.buckets[key]
+            result.append((self.upper_bound(key), total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        for upper_bound, total in self.cumulative_buckets():
+            if total >= rank:
+                return min(max(upper_bound, self.min), self.max)
+        return self.max
+
+    def snapshot(self):
+        result = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in self.quantiles:
+            result[f"p{q * 100:g}"] = self.quantile(q)
+        return result
+
+
+class Metrics:
+    """
+    Registry of the metrics of a controller, by name and labels.
+    """
+    prefix = "werewolf_"
+
+    def __init__(self):
+        self._metrics: Dict[str, Dict[Labels, object]] = {}
+        self._kinds: Dict[str, str] = {}
+        self.started = time.time()
+
+    def _get(self, cls, name: str, labels: Dict[str, str], **kwargs):
+        kind = self._kinds.setdefault(name, cls.kind)
+        if kind != cls.kind:
+            raise ValueError(f"The metric {name!r} is a {kind}")
+        by_labels = self._metrics.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        metric = by_labels.get(key)
+        if metric is None:
+            metric = by_labels[key] = cls(**kwargs)
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self,
+              name: str,
+              function: Optional[Callable[[], float]] = None,
+              **labels) -> Gauge:
+        gauge = self._get(Gauge, name, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._get(Histogram, name, labels)
+
+    def snapshot(self) -> dict:
+        """
+        Return the value of every metric as JSON-friendly data.
+        """
+        result = {}
+        for name, by_labels in self._metrics.items():
+            result[name] = {
+                "type": self._kinds[name],
+                "samples": [{
+                    "labels": dict(labels),
+                    "value": metric.snapshot()
+                } for labels, metric in by_labels.items()],
+            }
+        return result
+
+    def to_prometheus(self) -> str:
+        """
+        Return metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, by_labels in self._metrics.items():
+            full_name = self.prefix + name
+            kind = self._kinds[name]
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, metric in by_labels.items():
+                if kind != "histogram":
+                    lines.append(f"{full_name}{_format_labels(labels)} "
+                                 f"{_format_value(metric.snapshot())}")
+                    continue
+                for upper_bound, total in metric.cumulative_buckets():
+                    bucket_labels = labels + (("le", repr(upper_bound)), )
+                    lines.append(f"{full_name}_bucket"
+                                 f"{_format_labels(bucket_labels)} {total}")
+                bucket_labels = labels + (("le", "+Inf"), )
+                lines.append(f"{full_name}_bucket"
+                             f"{_format_labels(bucket_labels)} {metric.count}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} "
+                             f"{_format_value(metric.sum)}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} "
+                             f"{metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name,
+                         str(value).replace("\\", "\\\\").replace(
+                             '"', '\\"').replace("\n", "\\n"))
+        for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return "NaN"
+    return repr(float(value))
+
+
+class GameMetrics:
+    """
+    Game listener measuring phase durations, selections per phase and
+    players per game.
+
+    Register it with `events` so it is not called on each selection.
+    """
+    events = ("roles_dispatched", "phase_entered", "phase_closed")
+
+    def __init__(self,
+                 metrics: Metrics,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.metrics = metrics
+        self.clock = clock
+        self._events: Dict[str, Counter] = {}
+        self._damped = metrics.counter("selections_damped_total")
+        self._phase_histograms: Dict[str, Tuple[Histogram, Histogram]] = {}
+        # Time at which the current phase of each game has been entered
+        self._entered_at: Dict[str, float] = {}
+
+    def _count(self, event: str, amount: int = 1):
+        counter = self._events.get(event)
+        if counter is None:
+            counter = self._events[event] = self.metrics.counter(
+                "game_events_total", event=event)
+        counter.value += amount
+
+    def __call__(self, game: Game, event: str, details: dict):
+        self._count(event)
+        if event == "phase_entered":
+            if details["entered"]:
+                self._entered_at[game.name] = self.clock()
+        elif event == "phase_closed":
+            self._count("player_selected", details["selections"])
+            self._damped.value += details["damped"]
+            entered_at = self._entered_at.pop(game.name, None)
+            if entered_at is None:
+                return
+            phase = details["phase"]
+            histograms = self._phase_histograms.get(phase)
+            if histograms is None:
+                histograms = self._phase_histograms[phase] = (
+                    self.metrics.histogram("phase_duration_seconds",
+                                           phase=phase),
+                    self.metrics.histogram("selections_per_phase",
+                                           phase=phase))
+            histograms[0].observe(self.clock() - entered_at)
+            histograms[1].observe(details["selections"])
+        elif event == "roles_dispatched":
+            self.metrics.histogram("players_per_game").observe(
+                len(details["roles"]))
+
+    def forget(self, game_name: str):
+        """
+        Drop the state kept for a removed game.
+        """
+        self._entered_at.pop(game_name, None)
@@ -1,9 +1,13 @@
 import abc
 import asyncio
+import contextlib
+import heapq
+import math
+from dataclasses import asdict, dataclass, field
 from enum import Enum
-from itertools import cycle
 from random import shuffle
-from typing import Callable, ClassVar, Iterable, List, Optional, Set
+from typing import (AbstractSet, Callable, ClassVar, ContextManager, Dict,
+                    Iterable, Iterator, List, Optional, Set, Tuple)
 
 
 class Role(Enum):
@@ -18,48 +22,274 @@ class PlayerState(Enum):
 
 
 class Player:
+    """
+    A player of game.
+
+    The dicts returned by `public_dict` and `private_dict` are cached
+    until the state, the role or the selection of player change. They
+    are shared, never mutate them.
+
+    Players use slots and create the set of electors on the first
+    selection to keep large games small in memory.
+    """
+    __slots__ = ("name", "_role", "_state", "_selected_by", "_public_dict",
+                 "_private_dict")
+
     name: str
-    role: Optional[Role]
-    state: PlayerState
-    selected_by: Set["Player"]
 
     def __str__(self):
         return f"<{self.name} {self.role.value} {self.state.value}>"
 
     def __init__(self, name: str):
         self.name = name
-        self.role = None
-        self.state = PlayerState.alive
-        self.selected_by = set()
+        self._role: Optional[Role] = None
+        self._state = PlayerState.alive
+        self._selected_by: Optional[Set[str]] = None
+        self._public_dict: Optional[dict] = None
+        self._private_dict: Optional[dict] = None
+
+    def _invalidate(self):
+        self._public_dict = None
+        self._private_dict = None
+
+    @property
+    def role(self) -> Optional[Role]:
+        return self._role
+
+    @role.setter
+    def role(self, role: Optional[Role]):
+        self._role = role
+        self._invalidate()
+
+    @property
+    def state(self) -> PlayerState:
+        return self._state
+
+    @state.setter
+    def state(self, state: PlayerState):
+        self._state = state
+        self._invalidate()
+
+    @property
+    def selected_by(self) -> AbstractSet[str]:
+        if self._selected_by is None:
+            return frozenset()
+        return self._selected_by
 
     @property
     def selected(self):
-        return len(self.selected_by)
+        if self._selected_by is None:
+            return 0
+        return len(self._selected_by)
 
     def select(self, selected_by: str):
-        if selected_by in self.selected_by:
-            self.selected_by.remove(selected_by)
+        self._invalidate()
+        if self._selected_by is None:
+            self._selected_by = set()
+        elif selected_by in self._selected_by:
+            self._selected_by.remove(selected_by)
             return False
 
-        self.selected_by.add(selected_by)
+        self._selected_by.add(selected_by)
         return True
 
     def clear_selection(self):
-        self.selected_by.clear()
+        if self._selected_by:
+            self._selected_by = None
+            self._invalidate()
+
+    def public_dict(self) -> dict:
+        """
+        Return the player as seen by the other players, without role.
+        """
+        if self._public_dict is None:
+            self._public_dict = {
+                "name": self.name,
+                "state": self._state.value,
+                "selected": self.selected,
+            }
+        return self._public_dict
+
+    def private_dict(self) -> dict:
+        """
+        Return the player as seen by himself.
+        """
+        if self._private_dict is None:
+            self._private_dict = {
+                "name": self.name,
+                "role": None if self._role is None else self._role.value,
+                "state": self._state.value,
+                "selected": self.selected,
+            }
+        return self._private_dict
 
     def to_dict(self, without=None):
+        """
+        Return a new dict of player without the fields listed in without.
+
+        without can be a field name or an iterable of field names.
+        """
         if without is None:
-            without = ()
-        dct = {}
-        if "name" not in without:
-            dct["name"] = self.name
-        if "role" not in without:
-            dct["role"] = None if self.role is None else self.role.value
-        if "state" not in without:
-            dct["state"] = self.state.value
-        if "selected" not in without:
-            dct["selected"] = self.selected
-        return dct
+            return dict(self.private_dict())
+        if isinstance(without, str):
+            without = (without, )
+        return {
+            key: value
+            for key, value in self.private_dict().items()
+            if key not in without
+        }
+
+
+class PlayerRegistry:
+    """
+    Players of a game indexed by name.
+
+    Iterating over the registry yields the players in join order.
+
+    The registry counts alive players of each role, change the state of
+    a player with `set_state` and call `count_alive_players` once roles
+    are dispatched to keep the counters right.
+    """
+    def __init__(self):
+        self._players_by_name: Dict[str, Player] = {}
+        self._positions: Dict[str, int] = {}
+        self._next_position = 0
+        self._alive_by_role: Dict[Optional[Role], int] = {}
+
+    def __iter__(self) -> Iterator[Player]:
+        return iter(self._players_by_name.values())
+
+    def __len__(self):
+        return len(self._players_by_name)
+
+    def __contains__(self, name: str):
+        return name in self._players_by_name
+
+    def add(self, player: Player):
+        if player.name in self._players_by_name:
+            raise ValueError(f"Player {player.name!r} already exist")
+        self._positions[player.name] = self._next_position
+        self._next_position += 1
+        self._players_by_name[player.name] = player
+        if player.state is PlayerState.alive:
+            self._add_alive(player.role, 1)
+
+    def remove(self, name: str) -> Player:
+        if name not in self._players_by_name:
+            raise ValueError(f"Player {name!r} does not exist")
+        del self._positions[name]
+        player = self._players_by_name.pop(name)
+        if player.state is PlayerState.alive:
+            self._add_alive(player.role, -1)
+        return player
+
+    def _add_alive(self, role: Optional[Role], count: int):
+        self._alive_by_role[role] = self._alive_by_role.get(role, 0) + count
+
+    def set_state(self, player: Player, state: PlayerState):
+        if player.state is state:
+            return
+        self._add_alive(player.role,
+                        1 if state is PlayerState.alive else -1)
+        player.state = state
+
+    def count_alive_players(self):
+        """
+        Count again the alive players of each role.
+        """
+        self._alive_by_role = {}
+        for player in self:
+            if player.state is PlayerState.alive:
+                self._add_alive(player.role, 1)
+
+    def alive_count(self, role: Role) -> int:
+        return self._alive_by_role.get(role, 0)
+
+    def winner(self) -> Optional[Role]:
+        """
+        Return the winner role or None while villagers and werewolves are
+        alive.
+        """
+        villager_alive = self.alive_count(Role.villager)
+        werewolf_alive = self.alive_count(Role.werewolf)
+        if villager_alive and werewolf_alive:
+            return None
+        if villager_alive:
+            return Role.villager
+        return Role.werewolf
+
+    def alive_counts(self) -> Dict[str, int]:
+        """
+        Return the number of alive players by role name.
+        """
+        return {role.value: self.alive_count(role) for role in Role}
+
+    def get(self, name: str) -> Optional[Player]:
+        return self._players_by_name.get(name)
+
+    def position(self, name: str) -> int:
+        """
+        Return the join order of player.
+        """
+        return self._positions[name]
+
+
+class VoteTally:
+    """
+    Number of votes received by each player during a phase.
+
+    The leader is the player with the most votes, ties are broken using
+    the join order of players. Candidates are kept in a heap where
+    outdated entries are discarded lazily when the leader is looked up.
+    """
+    def __init__(self, players: PlayerRegistry):
+        self._players = players
+        self._votes: Dict[str, int] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def reset(self):
+        self._votes = {}
+        self._heap = []
+
+    def add(self, player: Player, count: int):
+        """
+        Add count votes (may be negative) to player.
+        """
+        votes = self._votes.get(player.name, 0) + count
+        self._votes[player.name] = votes
+        if len(self._heap) > 4 * len(self._votes) + 16:
+            self._heap = [(-nb_votes, self._players.position(name), name)
+                          for name, nb_votes in self._votes.items()]
+            heapq.heapify(self._heap)
+        else:
+            heapq.heappush(
+                self._heap,
+                (-votes, self._players.position(player.name), player.name))
+
+    def votes(self, name: str) -> int:
+        return self._votes.get(name, 0)
+
+    def voted_players(self) -> Iterator[Player]:
+        """
+        Yield players having received at least one vote during the phase.
+        """
+        for name in self._votes:
+            yield self._players.get(name)
+
+    @property
+    def leader(self) -> Optional[Player]:
+        """
+        Player with the most votes or None if nobody has been selected.
+        """
+        heap = self._heap
+        while heap:
+            votes, _, name = heap[0]
+            if votes == -self._votes[name]:
+                if not votes:
+                    return None
+                return self._players.get(name)
+            heapq.heappop(heap)
+        return None
 
 
 class Notifier(metaclass=abc.ABCMeta):
@@ -100,16 +330,37 @@ class Phase(metaclass=abc.ABCMeta):
 
     is_night: ClassVar[bool] = True
     notifier: Notifier
-    actives: List[Player]
-    selectables: List[Player]
 
-    def __init__(self, game_name: str, players: List[Player],
+    def __init__(self, game_name: str, players: PlayerRegistry,
                  notifier: Notifier):
-        self.players: List[Player] = players
+        self.players = players
         self.notifier = notifier
         self.game_name = game_name
         self.actives = []
         self.selectables = []
+        self.tally = VoteTally(players)
+        self._ballots: Dict[str, int] = {}
+
+    @property
+    def actives(self) -> List[Player]:
+        return self._actives
+
+    @actives.setter
+    def actives(self, players: List[Player]):
+        self._actives = players
+        self._active_names: Set[str] = {player.name for player in players}
+
+    @property
+    def selectables(self) -> List[Player]:
+        return self._selectables
+
+    @selectables.setter
+    def selectables(self, players: List[Player]):
+        self._selectables = players
+        self._selectable_names: Set[str] = {
+            player.name
+            for player in players
+        }
 
     def _current_role_players(self):
         return [
@@ -123,11 +374,57 @@ class Phase(metaclass=abc.ABCMeta):
             player.state is PlayerState.alive and player.role is not self.role
         ]
 
-    def _kill_max_selected_player(self):
-        player_to_kill = max(self.players, key=lambda p: p.selected)
-        player_to_kill.state = PlayerState.dead
-        for player in self.players:
+    @property
+    def leader(self) -> Optional[Player]:
+        """
+        Player with the most votes in this phase.
+        """
+        return self.tally.leader
+
+    def _close_vote(self) -> Player:
+        """
+        Return the most selected player and clear the selections.
+
+        The first player is returned when nobody has been selected.
+        """
+        selected_player = self.tally.leader
+        if selected_player is None:
+            selected_player = next(iter(self.players))
+        self._reset_votes()
+        return selected_player
+
+    def _reset_votes(self):
+        for player in self.tally.voted_players():
             player.clear_selection()
+        self.tally.reset()
+        self._ballots = {}
+
+    def restore(self, actives: List[str], selectables: List[str]):
+        """
+        Restore active and selectable players from their names, votes are
+        read from the selections of players.
+        """
+        self.actives = [self.players.get(name) for name in actives]
+        self.selectables = [self.players.get(name) for name in selectables]
+        self.tally.reset()
+        self._ballots = {}
+        for player in self.players:
+            if player.selected:
+                self.tally.add(player, player.selected)
+                for elector in player.selected_by:
+                    self._ballots[elector] = self._ballots.get(elector,
+                                                               0) + 1
+
+    def has_quorum(self, ratio: float = 1.0) -> bool:
+        """
+        Return True if at least ratio of active players have selected a
+        player.
+        """
+        return len(self._ballots) >= math.ceil(ratio * len(self.actives))
+
+    def _kill_max_selected_player(self):
+        player_to_kill = self._close_vote()
+        self.players.set_state(player_to_kill, PlayerState.dead)
         return player_to_kill
 
     @abc.abstractmethod
@@ -152,42 +449,77 @@ class Phase(metaclass=abc.ABCMeta):
         pass
 
     def select_player_from_name(self, selected: str, elector: str):
-        if elector not in (player.name for player in self.actives):
-            raise ValueError(
-                f"Player {elector!r} cannot select an other player")
+        player, is_selected = self._select(selected, elector)
+        self._notify_when_player_is_selected(player)
+        return is_selected
 
-        for player in self.players:
-            if player.name == selected:
-                if player not in self.selectables:
-                    raise ValueError(f"Player {selected!r} is not selectable")
-                is_selected = player.select(elector)
-                self._notify_when_player_is_selected(player)
-                return is_selected
-        raise ValueError(f"Player {selected!r} does not exist")
+    def select_players_from_names(
+            self, votes: List[Tuple[str, str]]) -> List[object]:
+        """
+        Apply the (selected, elector) votes in order and notify the new
+        state of the selected players in one `select_players` message.
 
-    def _close_msg(self, *, killed=None, resurrected=None):
+        Players whose selections are back to their state before the votes
+        (toggled an even number of times) are not notified.
 
-        villager_alive = False
-        werewolf_alive = False
-        for player in self.players:
-            if player.state is PlayerState.alive:
-                if player.role is Role.werewolf:
-                    werewolf_alive = True
-                    if villager_alive:
-                        winner = None
-                        break
-                elif player.role is Role.villager:
-                    villager_alive = True
-                    if werewolf_alive:
-                        winner = None
-                        break
+        Return for each vote the result of `select_player_from_name` or
+        the ValueError raised by it.
+        """
+        results: List[object] = []
+        changed: Dict[str, Player] = {}
+        for selected, elector in votes:
+            try:
+                player, is_selected = self._select(selected, elector)
+            except ValueError as exc:
+                results.append(exc)
+                continue
+            changed[player.name] = player
+            results.append(is_selected)
+        net_changes = net_selections(votes, results)
+        players = [
+            player for name, player in changed.items() if net_changes[name]
+        ]
+        if players:
+            self._notify_when_players_are_selected(players)
+        return results
+
+    def _notify_when_players_are_selected(self, players: List[Player]):
+        message = [player.public_dict() for player in players]
+        if self.is_night:
+            self.notifier.send_to_role(self.game_name, self.role.value,
+                                       "select_players", message)
+        else:
+            self.notifier.send_to_game(self.game_name, "select_players",
+                                       message)
+
+    def _select(self, selected: str, elector: str) -> Tuple[Player, bool]:
+        if elector not in self._active_names:
+            raise ValueError(
+                f"Player {elector!r} cannot select an other player")
+
+        player = self.players.get(selected)
+        if player is None:
+            raise ValueError(f"Player {selected!r} does not exist")
+        if selected not in self._selectable_names:
+            raise ValueError(f"Player {selected!r} is not selectable")
+        is_selected = player.select(elector)
+        count = 1 if is_selected else -1
+        self.tally.add(player, count)
+        ballots = self._ballots.get(elector, 0) + count
+        if ballots:
+            self._ballots[elector] = ballots
         else:
-            if villager_alive:
-                winner = Role.villager.value
-            else:
-                winner = Role.werewolf.value
+            del self._ballots[elector]
+        return player, is_selected
 
-        return {"killed": killed, "resurrected": resurrected, "winner": winner}
+    def _close_msg(self, *, killed=None, resurrected=None):
+        winner = self.players.winner()
+        return {
+            "killed": killed,
+            "resurrected": resurrected,
+            "winner": None if winner is None else winner.value,
+            "alive": self.players.alive_counts(),
+        }
 
 
 class WerewolfPhase(Phase):
@@ -195,6 +527,7 @@ class WerewolfPhase(Phase):
     is_night = True
 
     def enter(self):
+        self._reset_votes()
         self.actives = self._current_role_players()
         if not self.actives:
             return False
@@ -210,9 +543,9 @@ class WerewolfPhase(Phase):
             self.role.value,
             f"enter_in_phase.{self.role.value}",
             {
-                "active": [p.to_dict(without="role") for p in self.actives],
+                "active": [p.public_dict() for p in self.actives],
                 "selectable":
-                [p.to_dict(without="role") for p in self.selectables],
+                [p.public_dict() for p in self.selectables],
             },
         )
         return True
@@ -228,7 +561,7 @@ class WerewolfPhase(Phase):
             game_name=self.game_name,
             role=self.role.value,
             subject="select_player",
-            message=player.to_dict(without="role"),
+            message=player.public_dict(),
         )
 
 
@@ -237,19 +570,19 @@ class SeerPhase(Phase):
     is_night = True
 
     def close(self):
-        selected_player = max(self.players, key=lambda p: p.selected)
-        selected_player.clear_selection()
+        selected_player = self._close_vote()
         if selected_player.state is PlayerState.dead:
-            selected_player.state = PlayerState.alive
+            self.players.set_state(selected_player, PlayerState.alive)
             msg = self._close_msg(resurrected=selected_player.name)
         else:
-            selected_player.state = PlayerState.dead
+            self.players.set_state(selected_player, PlayerState.dead)
             msg = self._close_msg(killed=selected_player.name)
 
         self.notifier.send_to_game(self.game_name, "close_phase.seer", msg)
         return msg["winner"] is not None
 
     def enter(self):
+        self._reset_votes()
         self.actives = self._current_role_players()
         if not self.actives:
             return False
@@ -265,9 +598,9 @@ class SeerPhase(Phase):
             self.role.value,
             f"enter_in_phase.{self.role.value}",
             {
-                "active": [p.to_dict(without="role") for p in self.actives],
+                "active": [p.public_dict() for p in self.actives],
                 "selectable":
-                [p.to_dict(without="role") for p in self.selectables],
+                [p.public_dict() for p in self.selectables],
             },
         )
         return True
@@ -277,7 +610,7 @@ class SeerPhase(Phase):
             game_name=self.game_name,
             role=self.role.value,
             subject="select_player",
-            message=player.to_dict(without="role"),
+            message=player.public_dict(),
         )
 
 
@@ -292,6 +625,7 @@ class VillagerPhase(Phase):
         return msg["winner"] is not None
 
     def enter(self):
+        self._reset_votes()
         all_player_alive = [
             p for p in self.players if p.state is PlayerState.alive
         ]
@@ -306,9 +640,9 @@ class VillagerPhase(Phase):
             {
                 "is_night":
                 self.is_night,
-                "active": [p.to_dict(without="role") for p in self.actives],
+                "active": [p.public_dict() for p in self.actives],
                 "selectable":
-                [p.to_dict(without="role") for p in self.selectables],
+                [p.public_dict() for p in self.selectables],
             },
         )
 
@@ -318,12 +652,89 @@ class VillagerPhase(Phase):
         self.notifier.send_to_game(
             game_name=self.game_name,
             subject="select_player",
-            message=player.to_dict(without="role"),
+            message=player.public_dict(),
         )
 
 
+def net_selections(votes: List[Tuple[str, str]],
+                   results: List[object]) -> Dict[str, int]:
+    """
+    Return the change of the number of selections of each player selected
+    by votes, given the results of `Phase.select_players_from_names`.
+    """
+    changes: Dict[str, int] = {}
+    for (selected, _), result in zip(votes, results):
+        if isinstance(result, Exception):
+            continue
+        changes[selected] = changes.get(selected, 0) + (1 if result else -1)
+    return changes
+
+
 RoleDispatcher = Callable[[List[Player]], None]
 
+GameListener = Callable[["Game", str, dict], None]
+"""
+Called with the game, the name of event and its details.
+
+Events:
+
+    player_added         {"name": ""}
+    player_removed       {"name": ""}
+    roles_dispatched     {"roles": {"name": "role"}}
+    player_listen        {"name": ""}
+    all_player_listen    {}
+    phase_entered        {"phase": "role", "entered": true}
+    player_selected      {"selected": "", "elector": "", "is_selected": true}
+    quorum_reached       {}
+    phase_closed         {"phase": "role", "done": false, "selections": 0,
+                          "damped": 0}
+
+`selections` is the number of selections applied during the phase,
+`damped` the number of players whose selections were not notified
+because a batch of votes left them unchanged.
+"""
+
+GameHook = Callable[["Game", str], ContextManager]
+"""
+Called with the game and the name of an operation before it runs, the
+returned context manager wraps the operation.
+
+Operations:
+
+    enter_phase        Phase.enter, current_phase is the entered phase
+    close_phase        Phase.close
+    select_player      Phase.select_player_from_name
+    select_players     Phase.select_players_from_names
+    send_to_players    Notifier methods
+    send_to_game
+    send_to_role
+"""
+
+_NO_HOOK = contextlib.nullcontext()
+
+
+class _HookedNotifier(Notifier):
+    """
+    Notifier running the hooks of game around each message.
+    """
+    def __init__(self, notifier: Notifier, game: "Game"):
+        self.notifier = notifier
+        self._game = game
+
+    def send_to_players(self, game_name: str, players: List[Player],
+                        subject: str, message):
+        with self._game._hooked("send_to_players"):  # pylint: disable=protected-access
+            self.notifier.send_to_players(game_name, players, subject,
+                                          message)
+
+    def send_to_game(self, game_name: str, subject: str, message):
+        with self._game._hooked("send_to_game"):  # pylint: disable=protected-access
+            self.notifier.send_to_game(game_name, subject, message)
+
+    def send_to_role(self, game_name: str, role: str, subject: str, message):
+        with self._game._hooked("send_to_role"):  # pylint: disable=protected-access
+            self.notifier.send_to_role(game_name, role, subject, message)
+
 
 def default_role_dispatcher(players: [List[Player]]):
     nb_werewolf = len(players) // 4
@@ -339,57 +750,437 @@ def default_role_dispatcher(players: [List[Player]]):
         player.role = role
 
 
+@dataclass
+class GameSettings:
+    """
+    Timing of game, durations are in seconds.
+
+    `phase_durations` maps a role to the duration of its phase, phases
+    missing from it last `default_phase_duration`. A phase is closed
+    before its deadline once `quorum` (a ratio) of active players have
+    selected a player. No more than `max_players` players can join the
+    game when it is set.
+    """
+    phase_durations: Dict[str, float] = field(default_factory=dict)
+    default_phase_duration: float = 30
+    pause_duration: float = 3
+    quorum: float = 1.0
+    max_players: Optional[int] = None
+
+    def __post_init__(self):
+        if not 0 < self.quorum <= 1:
+            raise ValueError(f"quorum must be in ]0, 1] not {self.quorum!r}")
+        if self.max_players is not None and self.max_players < 1:
+            raise ValueError(
+                f"max_players must be at least 1 not {self.max_players!r}")
+        unknown_roles = set(self.phase_durations) - {r.value for r in Role}
+        if unknown_roles:
+            raise ValueError(f"Unknown phases {sorted(unknown_roles)!r}")
+
+    def phase_duration(self, role: Role) -> float:
+        return self.phase_durations.get(role.value,
+                                        self.default_phase_duration)
+
+
 class Game:
     def __init__(self,
                  name: str,
                  notifier: Notifier,
-                 role_dispatcher: RoleDispatcher = default_role_dispatcher):
+                 role_dispatcher: RoleDispatcher = default_role_dispatcher,
+                 settings: Optional[GameSettings] = None):
         self.name = name
         self.notifier = notifier
         self.role_dispatcher = role_dispatcher
-        self._players: List[Player] = []
-        self._phases: Iterable[Phase] = cycle((
+        self.settings = GameSettings() if settings is None else settings
+        self._players = PlayerRegistry()
+        self._phases: List[Phase] = [
             WerewolfPhase(self.name, self._players, notifier),
             SeerPhase(self.name, self._players, notifier),
             VillagerPhase(self.name, self._players, notifier),
-        ))
+        ]
+        self._phase_index = -1
+        self._phase_open = False
 
         self._current_phase: Optional[Phase] = None
+        self._started = False
+        self._players_version = 0
+        self._version = 0
         self._not_listening_players = set()
         self._all_player_listen = asyncio.Event()
+        self._quorum_reached = asyncio.Event()
+        self._phase_selections = 0
+        self._phase_damped = 0
+        self._listeners: List[GameListener] = []
+        self._event_listeners: Dict[str, List[GameListener]] = {}
+        self._hooks: List[GameHook] = []
+
+    def add_listener(self,
+                     listener: GameListener,
+                     events: Optional[Iterable[str]] = None):
+        """
+        Call listener on each game event, or only on the given events.
+        """
+        if events is None:
+            self._listeners.append(listener)
+            return
+        for event in events:
+            self._event_listeners.setdefault(event, []).append(listener)
+
+    def remove_listener(self, listener: GameListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        for listeners in self._event_listeners.values():
+            if listener in listeners:
+                listeners.remove(listener)
+
+    def add_hook(self, hook: GameHook):
+        """
+        Wrap the operations of game with the context managers returned by
+        hook. Games without hooks run operations unwrapped.
+        """
+        if not self._hooks:
+            self._set_notifier(_HookedNotifier(self.notifier, self))
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: GameHook):
+        self._hooks.remove(hook)
+        if not self._hooks:
+            self._set_notifier(self.notifier.notifier)
+
+    def _set_notifier(self, notifier: Notifier):
+        self.notifier = notifier
+        for phase in self._phases:
+            phase.notifier = notifier
+
+    def _hooked(self, operation: str) -> ContextManager:
+        hooks = self._hooks
+        if not hooks:
+            return _NO_HOOK
+        if len(hooks) == 1:
+            return hooks[0](self, operation)
+        stack = contextlib.ExitStack()
+        with stack:
+            for hook in hooks:
+                stack.enter_context(hook(self, operation))
+            return stack.pop_all()
+
+    @property
+    def version(self) -> int:
+        """
+        Number incremented on each change of the game, that is on each
+        event sent to listeners.
+        """
+        return self._version
+
+    def _emit(self, event: str, **details):
+        self._version += 1
+        for listener in self._listeners:
+            listener(self, event, details)
+        for listener in self._event_listeners.get(event, ()):
+            listener(self, event, details)
 
     def add_player(self, player: Player):
-        self._players.append(player)
-        self._not_listening_players.add(player.name)
-        msg = [player.to_dict(without="role") for player in self._players]
+        """
+        Add player to the lobby, see `add_players`.
+        """
+        error = self.add_players([player])[0]
+        if error is not None:
+            raise error
+
+    def add_players(self, players: List[Player]) -> List[Optional[Exception]]:
+        """
+        Add players to the lobby and send one update of players.
+
+        Return for each player the ValueError preventing it from joining
+        the game or None.
+        """
+        errors: List[Optional[Exception]] = []
+        added = []
+        for player in players:
+            try:
+                if self._started:
+                    raise ValueError(
+                        f"The game {self.name!r} is already started")
+                if self.open_seats == 0:
+                    raise ValueError(f"The game {self.name!r} is full")
+                self._players.add(player)
+            except ValueError as exc:
+                errors.append(exc)
+                continue
+            errors.append(None)
+            self._not_listening_players.add(player.name)
+            self._emit("player_added", name=player.name)
+            added.append(player.public_dict())
+        if added:
+            self._send_players_update(added=added)
+        return errors
+
+    def remove_player(self, player_name: str):
+        """
+        Remove player from the lobby.
+        """
+        if self._started:
+            raise ValueError(f"The game {self.name!r} is already started")
+        self._players.remove(player_name)
+        self._not_listening_players.discard(player_name)
+        self._emit("player_removed", name=player_name)
+        self._send_players_update(removed=[player_name])
+
+    def _send_players_update(self, added=(), removed=()):
+        self._players_version += 1
         self.notifier.send_to_game(game_name=self.name,
-                                   subject="add_player",
-                                   message=msg)
-        return msg
+                                   subject="players",
+                                   message={
+                                       "seq": self._players_version,
+                                       "added": list(added),
+                                       "removed": list(removed),
+                                   })
+
+    def get_players_snapshot(self):
+        """
+        Return the players and the sequence number of the last update.
+        """
+        return {
+            "seq": self._players_version,
+            "players":
+            [player.public_dict() for player in self._players],
+        }
+
+    @property
+    def nb_players(self) -> int:
+        return len(self._players)
+
+    @property
+    def open_seats(self) -> Optional[int]:
+        """
+        Number of players who can still join the game, None when it is
+        not limited.
+        """
+        if self._started:
+            return 0
+        if self.settings.max_players is None:
+            return None
+        return max(self.settings.max_players - len(self._players), 0)
 
     def get_players(self):
         return (player for player in self._players)
 
+    def get_player(self, name: str) -> Optional[Player]:
+        return self._players.get(name)
+
+    def get_status(self):
+        """
+        Return the current phase, the number of alive players by role and
+        the winner.
+        """
+        winner = self._players.winner() if self._started else None
+        return {
+            "phase":
+            None if self._current_phase is None else
+            self._current_phase.role.value,
+            "players": len(self._players),
+            "alive": self._players.alive_counts(),
+            "winner": None if winner is None else winner.value,
+        }
+
     def start(self):
-        self.role_dispatcher(self._players)
+        if self._started:
+            raise ValueError(f"The game {self.name!r} is already started")
+        self._started = True
+        self.role_dispatcher(list(self._players))
+        self._players.count_alive_players()
+        self._emit("roles_dispatched",
+                   roles={
+                       player.name: player.role.value
+                       for player in self._players
+                   })
         for player in self._players:
             self.notifier.send_to_players(self.name, [player], "start_game",
-                                          player.to_dict())
+                                          player.private_dict())
 
     def player_listen_topic(self, player_name):
         self._not_listening_players.remove(player_name)
+        self._emit("player_listen", name=player_name)
         if not self._not_listening_players:
             self._all_player_listen.set()
+            self._emit("all_player_listen")
+
+    def all_player_listen(self) -> bool:
+        return self._all_player_listen.is_set()
 
     async def wait_for_all_player_listen(self):
         await self._all_player_listen.wait()
 
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def current_phase(self) -> Optional[Phase]:
+        return self._current_phase
+
+    @property
+    def phase_open(self) -> bool:
+        """
+        True between a successful enter and the close of current phase.
+        """
+        return self._phase_open
+
     def enter_in_next_phase(self):
-        self._current_phase = next(self._phases)
-        return self._current_phase.enter()
+        self._quorum_reached.clear()
+        self._phase_selections = 0
+        self._phase_damped = 0
+        self._phase_index = (self._phase_index + 1) % len(self._phases)
+        self._current_phase = self._phases[self._phase_index]
+        with self._hooked("enter_phase"):
+            self._phase_open = self._current_phase.enter()
+        self._emit("phase_entered",
+                   phase=self._current_phase.role.value,
+                   entered=self._phase_open)
+        return self._phase_open
+
+    def current_phase_duration(self) -> float:
+        return self.settings.phase_duration(self._current_phase.role)
+
+    def quorum_reached(self) -> bool:
+        return self._quorum_reached.is_set()
+
+    async def wait_for_quorum(self):
+        """
+        Wait until enough active players have voted in the current phase.
+        """
+        await self._quorum_reached.wait()
 
     def close_the_current_phase(self):
-        return self._current_phase.close()
+        # Hooks run before the phase is marked closed, so they can still
+        # apply pending selections.
+        with self._hooked("close_phase"):
+            self._phase_open = False
+            done = self._current_phase.close()
+        self._emit("phase_closed",
+                   phase=self._current_phase.role.value,
+                   done=done,
+                   selections=self._phase_selections,
+                   damped=self._phase_damped)
+        return done
+
+    def _check_phase_open(self):
+        if not self._phase_open:
+            raise ValueError(f"No phase of game {self.name!r} is open")
 
     def select_player_from_name(self, selected: str, elector: str):
-        self._current_phase.select_player_from_name(selected, elector)
+        self._check_phase_open()
+        with self._hooked("select_player"):
+            is_selected = self._current_phase.select_player_from_name(
+                selected, elector)
+        self._phase_selections += 1
+        self._emit("player_selected",
+                   selected=selected,
+                   elector=elector,
+                   is_selected=is_selected)
+        self._check_quorum()
+        return is_selected
+
+    def select_players_from_names(
+            self, votes: List[Tuple[str, str]]) -> List[object]:
+        """
+        Apply the (selected, elector) votes with one notification, see
+        `Phase.select_players_from_names`.
+        """
+        try:
+            self._check_phase_open()
+        except ValueError as exc:
+            return [exc] * len(votes)
+        with self._hooked("select_players"):
+            results = self._current_phase.select_players_from_names(votes)
+        net_changes = net_selections(votes, results)
+        self._phase_damped += sum(net_changes[selected] == 0
+                                  for selected in net_changes)
+        for (selected, elector), result in zip(votes, results):
+            if isinstance(result, Exception):
+                continue
+            self._phase_selections += 1
+            self._emit("player_selected",
+                       selected=selected,
+                       elector=elector,
+                       is_selected=result)
+        self._check_quorum()
+        return results
+
+    def _check_quorum(self):
+        if (not self._quorum_reached.is_set()
+                and self._current_phase.has_quorum(self.settings.quorum)):
+            self._quorum_reached.set()
+            self._emit("quorum_reached")
+
+    def get_leader(self) -> Optional[Player]:
+        """
+        Return the most selected player of the current phase.
+        """
+        if self._current_phase is None:
+            return None
+        return self._current_phase.leader
+
+    def to_state(self) -> dict:
+        """
+        Return the state of game as plain data, see `from_state`.
+        """
+        phase = self._current_phase
+        return {
+            "name": self.name,
+            "settings": asdict(self.settings),
+            "started": self._started,
+            "players_version": self._players_version,
+            "version": self._version,
+            "players": [[
+                player.name,
+                None if player.role is None else player.role.value,
+                player.state.value,
+                sorted(player.selected_by),
+            ] for player in self._players],
+            "not_listening": sorted(self._not_listening_players),
+            "phase": self._phase_index,
+            "phase_open": self._phase_open,
+            "actives": [] if phase is None else
+            [player.name for player in phase.actives],
+            "selectables": [] if phase is None else
+            [player.name for player in phase.selectables],
+        }
+
+    @classmethod
+    def from_state(cls,
+                   state: dict,
+                   notifier: Notifier,
+                   role_dispatcher: RoleDispatcher = default_role_dispatcher
+                   ) -> "Game":
+        """
+        Rebuild a game from the result of `to_state`.
+        """
+        game = cls(state["name"],
+                   notifier,
+                   role_dispatcher=role_dispatcher,
+                   settings=GameSettings(**state["settings"]))
+        for name, role, player_state, electors in state["players"]:
+            player = Player(name)
+            player.role = None if role is None else Role(role)
+            player.state = PlayerState(player_state)
+            for elector in electors:
+                player.select(elector)
+            game._players.add(player)
+        game._players.count_alive_players()
+        game._started = state["started"]
+        game._players_version = state["players_version"]
+        game._version = state.get("version", 0)
+        game._not_listening_players = set(state["not_listening"])
+        if game._started and not game._not_listening_players:
+            game._all_player_listen.set()
+
+        game._phase_index = state["phase"]
+        game._phase_open = state["phase_open"]
+        if game._phase_index >= 0:
+            phase = game._phases[game._phase_index]
+            phase.restore(state["actives"], state["selectables"])
+            game._current_phase = phase
+            if game._phase_open and phase.has_quorum(game.settings.quorum):
+                game._quorum_reached.set()
+        return game
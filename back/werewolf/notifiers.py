@@ -0,0 +1,433 @@
+"""
+Notifiers wrapping an other notifier, and `NullNotifier` dropping every
+message.
+"""
+
+import asyncio
+import collections
+import inspect
+import itertools
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from .metrics import Counter, Metrics
+from .models import Notifier, Player
+
+
+class NullNotifier(Notifier):
+    """
+    Notifier dropping every message.
+    """
+    def send_to_players(self, game_name, players, subject, message):
+        pass
+
+    def send_to_game(self, game_name, subject, message):
+        pass
+
+    def send_to_role(self, game_name, role, subject, message):
+        pass
+
+
+class CoalescingNotifier(Notifier):
+    """
+    Delay `select_player` messages and send only the latest state of
+    each selected player.
+
+    Messages are held `window` seconds after the first pending message of
+    a game. With `batch`, the pending messages of a topic are sent as
+    one `select_players` message holding the list of players.
+    `select_players` messages are held player by player as well, and
+    sent as batches.
+
+    Any other message of a game sends the pending messages of this game
+    first, so messages are delivered in order.
+    """
+    coalesced_subjects = frozenset(("select_player", "select_players"))
+
+    def __init__(self,
+                 notifier: Notifier,
+                 window: float = 0.1,
+                 batch: bool = False):
+        self._notifier = notifier
+        self.window = window
+        self.batch = batch
+        self._pending: Dict[str, Dict[Tuple[Optional[str], str, str],
+                                      dict]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # Games whose pending messages are sent as batches
+        self._batched: Set[str] = set()
+
+    def send_to_players(self, game_name: str, players: List[Player],
+                        subject: str, message):
+        self.flush(game_name)
+        self._notifier.send_to_players(game_name, players, subject, message)
+
+    def send_to_game(self, game_name: str, subject: str, message):
+        if subject in self.coalesced_subjects:
+            self._hold(game_name, None, subject, message)
+        else:
+            self.flush(game_name)
+            self._notifier.send_to_game(game_name, subject, message)
+
+    def send_to_role(self, game_name: str, role: str, subject: str, message):
+        if subject in self.coalesced_subjects:
+            self._hold(game_name, role, subject, message)
+        else:
+            self.flush(game_name)
+            self._notifier.send_to_role(game_name, role, subject, message)
+
+    def _hold(self, game_name: str, role: Optional[str], subject: str,
+              message):
+        pending = self._pending.setdefault(game_name, {})
+        if isinstance(message, list):
+            self._batched.add(game_name)
+            for player in message:
+                pending[(role, "select_player", player["name"])] = player
+        else:
+            pending[(role, subject, message["name"])] = message
+        if game_name not in self._timers:
+            self._timers[game_name] = asyncio.get_running_loop().call_later(
+                self.window, self.flush, game_name)
+
+    def flush(self, game_name: str):
+        """
+        Send the pending messages of game.
+        """
+        timer = self._timers.pop(game_name, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(game_name, None)
+        batched = game_name in self._batched
+        self._batched.discard(game_name)
+        if not pending:
+            return
+
+        if self.batch or batched:
+            batches: Dict[Tuple[Optional[str], str], List[dict]] = {}
+            for (role, subject, _), message in pending.items():
+                batches.setdefault((role, subject), []).append(message)
+            for (role, subject), messages in batches.items():
+                self._send(game_name, role, f"{subject}s", messages)
+        else:
+            for (role, subject, _), message in pending.items():
+                self._send(game_name, role, subject, message)
+
+    def flush_all(self):
+        for game_name in list(self._pending):
+            self.flush(game_name)
+
+    def _send(self, game_name: str, role: Optional[str], subject: str,
+              message):
+        if role is None:
+            self._notifier.send_to_game(game_name, subject, message)
+        else:
+            self._notifier.send_to_role(game_name, role, subject, message)
+
+
+class MeteredNotifier(Notifier):
+    """
+    Count the messages sent by subject in the `publishes_total` counter
+    of metrics, and return what the wrapped notifier returns.
+    """
+    def __init__(self, notifier: Notifier, metrics: Metrics):
+        self._notifier = notifier
+        self._metrics = metrics
+        self._counters: Dict[str, Counter] = {}
+
+    def _count(self, subject: str, amount: int = 1):
+        counter = self._counters.get(subject)
+        if counter is None:
+            counter = self._counters[subject] = self._metrics.counter(
+                "publishes_total", subject=subject)
+        counter.value += amount
+
+    def send_to_players(self, game_name: str, players: List[Player],
+                        subject: str, message):
+        self._count(subject, len(players))
+        return self._notifier.send_to_players(game_name, players, subject,
+                                              message)
+
+    def send_to_game(self, game_name: str, subject: str, message):
+        self._count(subject)
+        return self._notifier.send_to_game(game_name, subject, message)
+
+    def send_to_role(self, game_name: str, role: str, subject: str, message):
+        self._count(subject)
+        return self._notifier.send_to_role(game_name, role, subject,
+                                           message)
+
+
+Call = Tuple[str, tuple]  # (notifier method, arguments)
+
+
+def merge_players_updates(first: dict, second: dict) -> dict:
+    """
+    Return the `players` update equivalent to first followed by second.
+
+    `since` is the sequence number of the first merged update, clients
+    apply the result when it follows their last known sequence number.
+    """
+    second_removed = set(second["removed"])
+    added_names = {player["name"] for player in first["added"]}
+    return {
+        "seq": second["seq"],
+        "since": first.get("since", first["seq"]),
+        "added": [
+            player for player in first["added"]
+            if player["name"] not in second_removed
+        ] + second["added"],
+        "removed": first["removed"] + [
+            name for name in second["removed"] if name not in added_names
+        ],
+    }
+
+
+def merge_selections(first: List[dict], second: List[dict]) -> List[dict]:
+    """
+    Return the `select_players` message equivalent to first followed by
+    second: the latest state of each player.
+    """
+    players = {player["name"]: player for player in first}
+    players.update((player["name"], player) for player in second)
+    return list(players.values())
+
+
+class _GameQueue:
+    __slots__ = ("urgent", "chatter")
+
+    def __init__(self):
+        self.urgent: Deque[Call] = collections.deque()
+        self.chatter: "collections.OrderedDict[object, Call]" = \
+            collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.urgent) + len(self.chatter)
+
+
+class QueuedNotifier(Notifier):
+    """
+    Queue messages by game and send them from a single drain task.
+
+    Each game queue holds at most `max_queue` messages. Selection
+    messages (`chatter_subjects`) are sent after the other messages of
+    their game and are discarded when a phase is entered or closed, as
+    they describe a vote that is over. When a queue is full:
+
+    - "drop_newest" drops the incoming selection,
+    - "drop_oldest" drops the oldest queued selection,
+    - "merge" drops the oldest queued selection too, but also replaces
+      a queued selection of the same player by its latest state at any
+      time, `select_players` lists being merged player by player.
+
+    Other messages are never dropped for a selection, they drop the
+    oldest message of the game when nothing else can be dropped, so a
+    queue is a ring of the latest messages while the notifier is paused.
+    Superseded messages collapse as well: an `enter_in_phase` message
+    replaces the queued one of the same topic prefix, and a message
+    whose subject is in `mergers` is merged with the last queued
+    message of its game when they have the same topic.
+
+    When the wrapped notifier returns awaitables (acknowledged
+    publishes), at most `max_in_flight` of them are pending: the drain
+    task waits for the router before sending more messages, and queues
+    absorb the difference. `pause` stops the drain until `resume`.
+    """
+    chatter_subjects = frozenset(("select_player", "select_players"))
+    phase_subjects = ("enter_in_phase", "close_phase")
+    latest_subjects = ("enter_in_phase", )
+    mergers = {"players": merge_players_updates}
+    policies = ("drop_newest", "drop_oldest", "merge")
+
+    def __init__(self,
+                 notifier: Notifier,
+                 max_queue: int = 1000,
+                 policy: str = "merge",
+                 max_in_flight: int = 100,
+                 metrics: Optional[Metrics] = None):
+        if policy not in self.policies:
+            raise ValueError(
+                f"policy must be one of {self.policies!r} not {policy!r}")
+        for name, value in (("max_queue", max_queue),
+                            ("max_in_flight", max_in_flight)):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1 not {value!r}")
+        self._notifier = notifier
+        self.max_queue = max_queue
+        self.policy = policy
+        self.max_in_flight = max_in_flight
+        self.metrics = Metrics() if metrics is None else metrics
+        # Queues of games having messages to send, in drain order
+        self._queues: "collections.OrderedDict[str, _GameQueue]" = \
+            collections.OrderedDict()
+        self._depth = 0
+        self._keys = itertools.count()
+        self._in_flight: Set[asyncio.Future] = set()
+        self._paused = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.metrics.gauge("notifier_queue_depth", lambda: self._depth)
+        self.metrics.gauge("notifier_queued_games", lambda: len(self._queues))
+        self.metrics.gauge("notifier_in_flight", lambda: len(self._in_flight))
+        self._merged = self.metrics.counter("notifier_merged_total")
+        self._errors = self.metrics.counter("notifier_errors_total")
+        self._dropped: Dict[Tuple[str, str], Counter] = {}
+
+    def __len__(self):
+        return self._depth
+
+    def send_to_players(self, game_name: str, players: List[Player],
+                        subject: str, message):
+        self._put(game_name, subject, None, message,
+                  ("send_to_players", (game_name, players, subject, message)))
+
+    def send_to_game(self, game_name: str, subject: str, message):
+        self._put(game_name, subject, None, message,
+                  ("send_to_game", (game_name, subject, message)))
+
+    def send_to_role(self, game_name: str, role: str, subject: str, message):
+        self._put(game_name, subject, role, message,
+                  ("send_to_role", (game_name, role, subject, message)))
+
+    def _put(self, game_name: str, subject: str, role: Optional[str],
+             message, call: Call):
+        queue = self._queues.get(game_name)
+        if queue is None:
+            queue = self._queues[game_name] = _GameQueue()
+
+        if subject in self.chatter_subjects:
+            key = next(self._keys)
+            if self.policy == "merge" and isinstance(message, dict):
+                key = (role, subject, message.get("name"))
+                if key in queue.chatter:
+                    queue.chatter[key] = call
+                    self._merged.inc()
+                    return
+            elif self.policy == "merge" and isinstance(message, list):
+                key = (role, subject)
+                queued = queue.chatter.get(key)
+                if queued is not None:
+                    method, args = queued
+                    queue.chatter[key] = (method, args[:-1] + (
+                        merge_selections(args[-1], message), ))
+                    self._merged.inc()
+                    return
+            if len(queue) >= self.max_queue:
+                if self.policy == "drop_newest" or not queue.chatter:
+                    self._drop(subject)
+                    return
+                self._drop_oldest_chatter(queue)
+            queue.chatter[key] = call
+        else:
+            if subject.startswith(self.phase_subjects):
+                while queue.chatter:
+                    self._drop_oldest_chatter(queue, "superseded")
+            if subject.startswith(self.latest_subjects):
+                self._drop_superseded(queue, call)
+            elif subject in self.mergers and queue.urgent:
+                method, args = queue.urgent[-1]
+                if method == call[0] and args[:-1] == call[1][:-1]:
+                    merged = self.mergers[subject](args[-1], message)
+                    queue.urgent[-1] = (method, args[:-1] + (merged, ))
+                    self._merged.inc()
+                    return
+            if len(queue) >= self.max_queue:
+                if queue.chatter:
+                    self._drop_oldest_chatter(queue)
+                else:
+                    _, args = queue.urgent.popleft()
+                    self._depth -= 1
+                    self._drop(args[-2])
+            queue.urgent.append(call)
+
+        self._depth += 1
+        self._wakeup.set()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(
+                self._drain())
+
+    def _drop_superseded(self, queue: _GameQueue, call: Call):
+        method, args = call
+        for queued in list(queue.urgent):
+            queued_method, queued_args = queued
+            if (queued_method == method and queued_args[:-2] == args[:-2]
+                    and queued_args[-2].startswith(self.latest_subjects)):
+                queue.urgent.remove(queued)
+                self._depth -= 1
+                self._drop(queued_args[-2], "superseded")
+
+    def _drop_oldest_chatter(self, queue: _GameQueue, reason="full"):
+        _, (_, args) = queue.chatter.popitem(last=False)
+        self._depth -= 1
+        self._drop(args[-2], reason)
+
+    def _drop(self, subject: str, reason: str = "full"):
+        counter = self._dropped.get((subject, reason))
+        if counter is None:
+            counter = self._dropped[(subject, reason)] = self.metrics.counter(
+                "notifier_dropped_total", subject=subject, reason=reason)
+        counter.value += 1
+
+    def pause(self):
+        """
+        Stop sending messages, they are kept in queues.
+        """
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+        self._wakeup.set()
+
+    async def _drain(self):
+        sent = 0
+        while True:
+            while self._paused or not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Send one message of each game in turn.
+            game_name, queue = next(iter(self._queues.items()))
+            if queue.urgent:
+                method, args = queue.urgent.popleft()
+            else:
+                _, (method, args) = queue.chatter.popitem(last=False)
+            self._depth -= 1
+            if queue:
+                self._queues.move_to_end(game_name)
+            else:
+                del self._queues[game_name]
+
+            try:
+                result = getattr(self._notifier, method)(*args)
+            except Exception:  # pylint: disable=broad-except
+                self._errors.inc()
+                continue
+            if inspect.isawaitable(result):
+                future = asyncio.ensure_future(result)
+                self._in_flight.add(future)
+                future.add_done_callback(self._on_sent)
+                if len(self._in_flight) >= self.max_in_flight:
+                    await asyncio.wait(self._in_flight,
+                                       return_when=asyncio.FIRST_COMPLETED)
+            sent += 1
+            if not sent % 100:
+                # Let other tasks run while queues are long.
+                await asyncio.sleep(0)
+
+    def _on_sent(self, future: asyncio.Future):
+        self._in_flight.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self._errors.inc()
+
+    async def join(self):
+        """
+        Wait until queued messages are sent and acknowledged.
+        """
+        while self._queues or self._in_flight:
+            if self._in_flight:
+                await asyncio.wait(self._in_flight)
+            else:
+                await asyncio.sleep(0)
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,133 @@
+"""
+Sampling profiler of game phases, plugged as a `GameHook`.
+
+    >>> profiler = PhaseProfiler(every=10)
+    >>> game.add_hook(profiler)  # doctest: +SKIP
+
+Every `every`-th phase entered, among all the games using the profiler,
+is profiled from its enter to its close. Only the hooked operations of
+this phase are measured (enter, close, selections and messages), so
+neither the idle time between them nor other games are measured. Reports
+of the latest sampled phases are kept in `reports`.
+"""
+
+import collections
+import contextlib
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from typing import Deque, Optional
+
+from .models import Game
+
+MODES = ("cprofile", "tracemalloc")
+
+
+class PhaseProfiler:
+    """
+    Profile one phase out of every with cProfile or tracemalloc.
+    """
+    def __init__(self,
+                 mode: str = "cprofile",
+                 every: int = 10,
+                 max_reports: int = 10,
+                 top: int = 25):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES!r} not {mode!r}")
+        if every < 1:
+            raise ValueError(f"every must be at least 1 not {every!r}")
+        self.mode = mode
+        self.every = every
+        self.top = top
+        self.reports: Deque[dict] = collections.deque(maxlen=max_reports)
+        self._phases = 0
+        # Game whose current phase is sampled
+        self._sampled: Optional[Game] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self._depth = 0
+        self._duration = 0.0
+
+    def __call__(self, game: Game, operation: str):
+        if operation == "enter_phase" and self._sampled is None:
+            self._phases += 1
+            if self._phases % self.every == 0:
+                self._start(game)
+        if game is not self._sampled:
+            return contextlib.nullcontext()
+        return self._measure(game, operation)
+
+    @contextlib.contextmanager
+    def _measure(self, game: Game, operation: str):
+        self._depth += 1
+        if self._depth == 1:
+            if self._profile is not None:
+                self._profile.enable()
+            start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._duration += time.perf_counter() - start
+                if self._profile is not None:
+                    self._profile.disable()
+                if operation == "close_phase" or (operation == "enter_phase"
+                                                  and not game.phase_open):
+                    self._stop(game)
+
+    def _start(self, game: Game):
+        self._sampled = game
+        self._duration = 0.0
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def _stop(self, game: Game):
+        report = {
+            "game": game.name,
+            "phase": game.current_phase.role.value,
+            "mode": self.mode,
+            "time": time.time(),
+            "duration": self._duration,
+        }
+        if self._profile is not None:
+            output = io.StringIO()
+            pstats.Stats(self._profile, stream=output).sort_stats(
+                "cumulative").print_stats(self.top)
+            report["stats"] = output.getvalue()
+            self._profile = None
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            report["stats"] = "\n".join(
+                str(stat)
+                for stat in snapshot.statistics("lineno")[:self.top])
+        self.reports.append(report)
+        self._sampled = None
+
+    def forget(self, game: Game):
+        """
+        Cancel the sampling of game, when it is removed during a phase.
+        """
+        if game is self._sampled:
+            self.cancel()
+
+    def cancel(self):
+        """
+        Stop the sampling in progress without report.
+        """
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._sampled = None
+        self._depth = 0
@@ -0,0 +1,196 @@
+"""
+Drive the phases of every running game from a single timer.
+
+Each game has at most one pending step (enter in the next phase or
+close the current phase) and its deadline. Deadlines are rounded up to
+the next tick and kept in a heap, so all the steps expiring during the
+same tick are run in one batch and the event loop holds a single timer
+handle whatever the number of games.
+"""
+
+import asyncio
+import heapq
+import math
+from enum import Enum
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+import txaio
+
+from .models import Game
+
+txaio.use_asyncio()
+
+GameDoneCallback = Callable[[Game, Optional[BaseException]], None]
+
+
+class Step(Enum):
+    wait_for_players = "wait_for_players"
+    enter = "enter"
+    close = "close"
+
+
+class _Entry:
+    __slots__ = ("game", "step", "deadline", "generation")
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.step = Step.wait_for_players
+        self.deadline: Optional[float] = None
+        self.generation = 0
+
+
+class GameScheduler:
+    """
+    Run games added with `add` until they are done.
+
+    `on_game_done` is called with the game and the exception raised
+    while running it, or None if the game ended normally. An exception
+    raised by `on_game_done` is logged, it does not stop the other games.
+    """
+    def __init__(self,
+                 on_game_done: Optional[GameDoneCallback] = None,
+                 tick: float = 0.05):
+        self.on_game_done = on_game_done
+        self.tick = tick
+        self._entries: Dict[str, _Entry] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._sequence = count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+        self.log = txaio.make_logger()  # pylint:disable=no-member
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, game_name: str):
+        return game_name in self._entries
+
+    def add(self, game: Game):
+        """
+        Schedule game, its first phase starts once all players listen.
+
+        A game restored from a snapshot resumes its current phase.
+        """
+        if game.name in self._entries:
+            raise ValueError(f"The game {game.name!r} is already scheduled")
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        self._entries[game.name] = _Entry(game)
+        game.add_listener(self._on_game_event)
+        if game.phase_open:
+            # Game restored in the middle of a phase.
+            self._schedule(
+                game.name, Step.close,
+                0 if game.quorum_reached() else game.current_phase_duration())
+        elif game.all_player_listen():
+            self._schedule(game.name, Step.enter, 0)
+
+    def remove(self, game_name: str):
+        """
+        Stop running game.
+        """
+        entry = self._entries.pop(game_name)
+        entry.generation += 1
+        entry.game.remove_listener(self._on_game_event)
+
+    def _on_game_event(self, game: Game, event: str, details: dict):  # pylint: disable=unused-argument
+        entry = self._entries.get(game.name)
+        if entry is None:
+            return
+        if event == "all_player_listen" and entry.step is Step.wait_for_players:
+            self._schedule(game.name, Step.enter, 0)
+        elif event == "quorum_reached" and entry.step is Step.close:
+            self._schedule(game.name, Step.close, 0)
+
+    def _schedule(self, game_name: str, step: Step, delay: float):
+        entry = self._entries[game_name]
+        now = self._loop.time()
+        deadline = math.ceil((now + delay) / self.tick) * self.tick
+        entry.step = step
+        entry.deadline = deadline
+        entry.generation += 1
+        heapq.heappush(
+            self._heap,
+            (deadline, next(self._sequence), game_name, entry.generation))
+        if self._timer_deadline is None or deadline < self._timer_deadline:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self._loop.call_at(deadline, self._on_tick)
+            self._timer_deadline = deadline
+
+    def _on_tick(self):
+        self._timer = None
+        self._timer_deadline = None
+        # Deadlines are multiples of tick, half a tick absorbs the clock
+        # resolution of the event loop.
+        now = self._loop.time() + self.tick / 2
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            _, _, game_name, generation = heapq.heappop(heap)
+            entry = self._entries.get(game_name)
+            if entry is not None and entry.generation == generation:
+                expired.append(entry)
+
+        try:
+            for entry in expired:
+                self._run_step(entry)
+        finally:
+            self._rearm()
+
+    def _rearm(self):
+        heap = self._heap
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_deadline = None
+        while heap:
+            _, _, game_name, generation = heap[0]
+            entry = self._entries.get(game_name)
+            if entry is not None and entry.generation == generation:
+                self._timer = self._loop.call_at(heap[0][0], self._on_tick)
+                self._timer_deadline = heap[0][0]
+                break
+            heapq.heappop(heap)
+
+    def _run_step(self, entry: _Entry):
+        game = entry.game
+        try:
+            done = self._step(entry)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._done(game, exc)
+        else:
+            if done:
+                self._done(game, None)
+
+    def _step(self, entry: _Entry) -> bool:
+        """
+        Run the pending step of game and return True if it is done.
+        """
+        game = entry.game
+        if entry.step is Step.enter:
+            i = 0
+            while not game.enter_in_next_phase():
+                i += 1
+                if i > 3:
+                    raise RuntimeError("No next phase but game is not done.")
+            self._schedule(game.name, Step.close,
+                           game.current_phase_duration())
+            return False
+        if game.close_the_current_phase():
+            return True
+        self._schedule(game.name, Step.enter, game.settings.pause_duration)
+        return False
+
+    def _done(self, game: Game, exc: Optional[BaseException]):
+        self.remove(game.name)
+        if self.on_game_done is None:
+            return
+        try:
+            self.on_game_done(game, exc)
+        except Exception as error:  # pylint: disable=broad-except
+            self.log.error("on_game_done failed for game {name}: {error}",
+                           name=game.name,
+                           error=error)
@@ -0,0 +1,40 @@
+"""
+Partition games between controller workers with consistent hashing.
+"""
+
+import bisect
+import hashlib
+from typing import List
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Map game names to workers.
+
+    Each worker owns `replicas` points of the ring, a game belongs to the
+    worker owning the first point following the hash of its name. Adding
+    a worker only moves about 1/nb_workers of games.
+    """
+    def __init__(self, nb_workers: int, replicas: int = 64):
+        if nb_workers < 1:
+            raise ValueError(f"nb_workers must be positive not {nb_workers}")
+        self.nb_workers = nb_workers
+        points = sorted((_hash(f"worker-{worker}-{replica}"), worker)
+                        for worker in range(nb_workers)
+                        for replica in range(replicas))
+        self._hashes: List[int] = [point for point, _ in points]
+        self._workers: List[int] = [worker for _, worker in points]
+
+    def owner(self, game_name: str) -> int:
+        """
+        Return the index of worker owning game.
+        """
+        if self.nb_workers == 1:
+            return 0
+        index = bisect.bisect(self._hashes, _hash(game_name))
+        return self._workers[index % len(self._workers)]
@@ -0,0 +1,141 @@
+"""
+Play complete games in process, without WAMP router nor sleep.
+
+    >>> result = simulate_game(8, vote_strategy=random_vote, seed=42)
+    >>> result.winner in ('villager', 'werewolf')
+    True
+"""
+
+import random
+import time
+from typing import Callable, List, Optional, Sequence
+
+from .models import (Game, GameSettings, Notifier, Player, RoleDispatcher,
+                     default_role_dispatcher)
+from .notifiers import NullNotifier
+
+VoteStrategy = Callable[[Player, Sequence[Player], random.Random],
+                        Optional[Player]]
+"""
+Return the player selected by elector among selectables or None to
+abstain.
+"""
+
+
+def random_vote(elector: Player, selectables: Sequence[Player],
+                rng: random.Random) -> Optional[Player]:  # pylint: disable=unused-argument
+    """
+    Select a random player other than elector.
+    """
+    for _ in range(3):
+        player = rng.choice(selectables)
+        if player is not elector:
+            return player
+    return None
+
+
+def first_vote(elector: Player, selectables: Sequence[Player],
+               rng: random.Random) -> Optional[Player]:  # pylint: disable=unused-argument
+    """
+    Select the first selectable player other than elector.
+    """
+    for player in selectables:
+        if player is not elector:
+            return player
+    return None
+
+
+class SimulationResult:
+    """
+    Result of a simulated game, durations are in seconds.
+    """
+    def __init__(self, winner: str):
+        self.winner = winner
+        self.phases = 0
+        self.votes = 0
+        self.enter_duration = 0.0
+        self.close_duration = 0.0
+
+    def __repr__(self):
+        return (f"<SimulationResult winner={self.winner!r} "
+                f"phases={self.phases} votes={self.votes}>")
+
+
+def simulate_game(nb_players: int,
+                  vote_strategy: VoteStrategy = random_vote,
+                  seed=None,
+                  notifier: Optional[Notifier] = None,
+                  role_dispatcher: RoleDispatcher = default_role_dispatcher,
+                  max_phases: int = 100000,
+                  on_game: Optional[Callable[[Game], None]] = None
+                  ) -> SimulationResult:
+    """
+    Play a game of nb_players until a role wins.
+
+    Every active player votes once per phase using vote_strategy.
+    on_game is called with the game before players join it.
+    """
+    rng = random.Random(seed)
+    game = Game("simulation",
+                NullNotifier() if notifier is None else notifier,
+                role_dispatcher=_seeded(role_dispatcher, rng),
+                settings=GameSettings())
+    if on_game is not None:
+        on_game(game)
+    players: List[Player] = [Player(f"player-{i}") for i in range(nb_players)]
+    for player in players:
+        game.add_player(player)
+    game.start()
+    for player in players:
+        game.player_listen_topic(player.name)
+
+    phases = votes = 0
+    enter_duration = close_duration = 0.0
+    while phases < max_phases:
+        start = time.perf_counter()
+        i = 0
+        while not game.enter_in_next_phase():
+            i += 1
+            if i > 3:
+                raise RuntimeError("No next phase but game is not done.")
+        enter_duration += time.perf_counter() - start
+        phases += 1
+
+        phase = game.current_phase
+        for elector in phase.actives:
+            selected = vote_strategy(elector, phase.selectables, rng)
+            if selected is not None:
+                game.select_player_from_name(selected.name, elector.name)
+                votes += 1
+
+        start = time.perf_counter()
+        done = game.close_the_current_phase()
+        close_duration += time.perf_counter() - start
+        if done:
+            break
+    else:
+        raise RuntimeError(f"Game not done after {max_phases} phases.")
+
+    result = SimulationResult(game.get_status()["winner"])
+    result.phases = phases
+    result.votes = votes
+    result.enter_duration = enter_duration
+    result.close_duration = close_duration
+    return result
+
+
+def _seeded(role_dispatcher: RoleDispatcher,
+            rng: random.Random) -> RoleDispatcher:
+    """
+    Shuffle with rng the roles given by role_dispatcher, so a seed gives
+    the same roles whatever the dispatcher.
+    """
+    def dispatch(players):
+        role_dispatcher(players)
+        roles = sorted((player.role for player in players),
+                       key=lambda role: role.value)
+        rng.shuffle(roles)
+        for player, role in zip(players, roles):
+            player.role = role
+
+    return dispatch
@@ -0,0 +1,95 @@
+"""
+Versioned binary snapshots of games.
+
+A snapshot is the msgpack encoding of `[version, Game.to_state()]`. It
+is used to resume games after a restart of the controller and to move a
+game from a worker process to an other one.
+"""
+
+import os
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import quote
+
+import msgpack
+
+from .models import Game, Notifier
+
+SNAPSHOT_VERSION = 1
+
+
+def dump_game(game: Game) -> bytes:
+    return msgpack.packb([SNAPSHOT_VERSION, game.to_state()],
+                         use_bin_type=True)
+
+
+def load_game(data: bytes, notifier: Notifier) -> Game:
+    version, state = msgpack.unpackb(data, raw=False)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {version!r}")
+    return Game.from_state(state, notifier)
+
+
+class SnapshotStore:
+    """
+    Directory holding the last snapshot of each game.
+
+    The version of each saved or loaded game is kept, a game is written
+    again only once its version changed.
+    """
+    suffix = ".snapshot"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._versions: Dict[str, int] = {}
+
+    def _path(self, game_name: str) -> str:
+        return os.path.join(self.directory,
+                            quote(game_name, safe="") + self.suffix)
+
+    def save(self, game: Game) -> bool:
+        """
+        Write the snapshot of game unless it did not change since the
+        last one, return True if it is written.
+        """
+        if self._versions.get(game.name) == game.version:
+            return False
+        path = self._path(game.name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as snapshot_file:
+            snapshot_file.write(dump_game(game))
+        os.replace(tmp_path, path)
+        self._versions[game.name] = game.version
+        return True
+
+    def remove(self, game_name: str):
+        self._versions.pop(game_name, None)
+        try:
+            os.remove(self._path(game_name))
+        except FileNotFoundError:
+            pass
+
+    def load_all(
+        self,
+        make_notifier: Callable[[], Notifier],
+        on_error: Optional[Callable[[str, Exception], None]] = None
+    ) -> Iterator[Game]:
+        """
+        Yield the games of every snapshot in the directory.
+
+        A snapshot which can not be read is skipped, on_error is called
+        with its path and the exception.
+        """
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path, "rb") as snapshot_file:
+                    game = load_game(snapshot_file.read(), make_notifier())
+            except Exception as exc:  # pylint: disable=broad-except
+                if on_error is not None:
+                    on_error(path, exc)
+                continue
+            self._versions[game.name] = game.version
+            yield game
@@ -0,0 +1,164 @@
+"""
+Current state of a game as seen by a player, for clients joining or
+reloading in the middle of a game.
+
+Views are built once per version of the game and shared by every player
+of the same audience: the players of the role of the current phase see
+its active and selectable players and the leader, the most selected
+player (everybody during the day), others only see the phase. A client sending the version of its last view gets
+either:
+
+    {"version": 0, "not_modified": true, "player": {...}}
+    {"version": 0, "since": 0, "delta": {key: value}, "player": {...}}
+    {"version": 0, "state": {...}, "player": {...}}
+
+`delta` holds the keys of the view changed since the version known by
+the client, `player` is the private view of the player. A delta is only
+sent when the player had the same audience at the known version, as its
+view was another one otherwise.
+"""
+
+import collections
+from typing import Deque, Dict, Optional, Tuple
+
+from .models import Game
+
+Audience = Optional[str]  # role seeing the current phase, None for others
+PhaseKey = Optional[Tuple[str, bool]]  # role and is_night of an open phase
+
+
+class GameStateCache:
+    """
+    Views of game by audience, rebuilt when the version of game changes.
+
+    The views of the `history` latest versions are kept to answer with a
+    delta, deltas are computed once per known version.
+    """
+    def __init__(self, game: Game, history: int = 16):
+        self.game = game
+        self.history = history
+        self._views: Dict[Audience, Deque[Tuple[int, dict]]] = {}
+        self._deltas: Dict[Tuple[Audience, int], dict] = {}
+        self._deltas_version = -1
+        # Phase of the latest versions served, to know the audience of a
+        # player at a known version.
+        self._phase_keys: "collections.OrderedDict[int, PhaseKey]" = \
+            collections.OrderedDict()
+        self.builds = 0
+
+    def _phase_key(self) -> PhaseKey:
+        phase = self.game.current_phase
+        if phase is None or not self.game.phase_open:
+            return None
+        return phase.role.value, phase.is_night
+
+    @staticmethod
+    def _audience(phase_key: PhaseKey, role: Optional[str]) -> Audience:
+        if phase_key is None:
+            return None
+        phase_role, is_night = phase_key
+        if not is_night or phase_role == role:
+            return phase_role
+        return None
+
+    def _remember_phase(self, version: int) -> PhaseKey:
+        if version not in self._phase_keys:
+            self._phase_keys[version] = self._phase_key()
+            while len(self._phase_keys) > self.history:
+                self._phase_keys.popitem(last=False)
+        return self._phase_keys[version]
+
+    def view(self, audience: Audience) -> dict:
+        """
+        Return the view of the current version for audience.
+        """
+        views = self._views.get(audience)
+        if views is None:
+            views = self._views[audience] = collections.deque(
+                maxlen=self.history)
+        version = self.game.version
+        if views and views[-1][0] == version:
+            return views[-1][1]
+        view = self._build(audience)
+        views.append((version, view))
+        return view
+
+    def _build(self, audience: Audience) -> dict:
+        self.builds += 1
+        game = self.game
+        phase = game.current_phase
+        status = game.get_status()
+        view = {
+            "started": game.started,
+            "phase": status["phase"],
+            "phase_open": game.phase_open,
+            "is_night": None if phase is None else phase.is_night,
+            "alive": status["alive"],
+            "winner": status["winner"],
+            "players": [{
+                "name": player.name,
+                "state": player.state.value,
+            } for player in game.get_players()],
+            "active": None,
+            "selectable": None,
+            "leader": None,
+        }
+        if audience is not None:
+            view["active"] = [player.public_dict() for player in phase.actives]
+            view["selectable"] = [
+                player.public_dict() for player in phase.selectables
+            ]
+            leader = game.get_leader()
+            view["leader"] = None if leader is None else leader.name
+        return view
+
+    def get(self, player_name: str,
+            known_version: Optional[int] = None) -> dict:
+        """
+        Return the state of game seen by player, as a change since
+        known_version when it is given.
+        """
+        player = self.game.get_player(player_name)
+        if player is None:
+            raise ValueError(f"Player {player_name!r} does not exist")
+        role = None if player.role is None else player.role.value
+        version = self.game.version
+        audience = self._audience(self._remember_phase(version), role)
+        response = {"version": version, "player": player.private_dict()}
+        if known_version == version:
+            response["not_modified"] = True
+            return response
+
+        view = self.view(audience)
+        if (known_version in self._phase_keys
+                and self._audience(self._phase_keys[known_version],
+                                   role) == audience):
+            delta = self._delta(audience, known_version, view)
+            if delta is not None:
+                response["since"] = known_version
+                response["delta"] = delta
+                return response
+        response["state"] = view
+        return response
+
+    def _delta(self, audience: Audience, known_version: int,
+               view: dict) -> Optional[dict]:
+        if self._deltas_version != self.game.version:
+            self._deltas = {}
+            self._deltas_version = self.game.version
+        key = (audience, known_version)
+        if key in self._deltas:
+            return self._deltas[key]
+
+        for version, known_view in self._views[audience]:
+            if version == known_version:
+                delta = {
+                    name: value
+                    for name, value in view.items()
+                    if known_view.get(name) != value
+                }
+                break
+        else:
+            delta = None
+        self._deltas[key] = delta
+        return delta
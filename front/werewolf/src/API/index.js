@@ -18,14 +18,16 @@ var subscribeAfterJoinGameFactory = function (api, gameName, playerName) {
                            {match: "prefix"}).then(onSubscribeWithSuccess, onSubscribeWithError);
         api.session.subscribe(`${prefix}.select_player`,
                            api.$onSelectedPlayer.bind(api)).then(onSubscribeWithSuccess, onSubscribeWithError);
+        api.session.subscribe(`${prefix}.select_players`,
+                           api.$onSelectedPlayers.bind(api)).then(onSubscribeWithSuccess, onSubscribeWithError);
         api.session.subscribe(`${prefix}.close_phase`,
                            api.$onClosePhase.bind(api),
                            {match: "prefix"}).then(onSubscribeWithSuccess, onSubscribeWithError);
-        api.session.subscribe(`${prefix}.add_player`,
-                          api.$onPlayerJoin.bind(api)).then(onSubscribeWithSuccess, onSubscribeWithError);
+        api.session.subscribe(`${prefix}.players`,
+                          api.$onPlayersUpdate.bind(api)).then(onSubscribeWithSuccess, onSubscribeWithError);
         api.session.subscribe(`${prefix}.user.${playerName}.start_game`,
                           api.$onPlayerStartGame.bind(api)).then(onSubscribeWithSuccess, onSubscribeWithError);
-        return result;
+        return api.$applyPlayersSnapshot(result);
     };
 }
 
@@ -80,6 +82,7 @@ export default class API {
         );
     }
     createGame(gameName, playerName) {
+        this.gameName = gameName;
         var subscribeAfterJoinGame = subscribeAfterJoinGameFactory(this, gameName, playerName);
 
         return this.session.call('com.werewolf.create_game', [gameName, playerName]).then(
@@ -90,6 +93,7 @@ export default class API {
         );
     }
     joinGame(gameName, playerName) {
+        this.gameName = gameName;
         var subscribeAfterJoinGame = subscribeAfterJoinGameFactory(this, gameName, playerName);
         return this.session.call('com.werewolf.join_game', [gameName, playerName]).then(
             subscribeAfterJoinGame,
@@ -98,6 +102,31 @@ export default class API {
             }
         );
     }
+    getGameState(gameName, playerName) {
+        // Send the version of the last known state, the server answers
+        // with the changed keys only or nothing when it is up to date.
+        var that = this;
+        return this.session.call('com.werewolf.get_game_state', [gameName, playerName, this.stateVersion]).then(
+            function (result) {
+                if (result.state !== undefined) {
+                    that.state = result.state;
+                } else if (result.delta !== undefined) {
+                    that.state = Object.assign({}, that.state, result.delta);
+                }
+                that.stateVersion = result.version;
+                that.player = result.player;
+                return that.state;
+            },
+            function (error) {
+                throw error;
+            }
+        );
+    }
+    listGames(state, minSeats, cursor) {
+        // Pass the cursor of the previous page to get the next one, the
+        // last page has a null cursor.
+        return this.session.call('com.werewolf.list_games', [state || 'lobby', minSeats || 0, cursor === undefined ? null : cursor]);
+    }
     startGame(gameName) {
         return this.session.call('com.werewolf.start_game', [gameName]);
     }
@@ -128,6 +157,8 @@ export default class API {
             this.$onEnterInPhase.bind(this), {match: "prefix"}).then(onSubscribeWithSuccess, onSubscribeWithError);
         this.session.subscribe(`${prefix}.select_player`,
             this.$onSelectedPlayer.bind(this)).then(onSubscribeWithSuccess, onSubscribeWithError);
+        this.session.subscribe(`${prefix}.select_players`,
+            this.$onSelectedPlayers.bind(this)).then(onSubscribeWithSuccess, onSubscribeWithError);
 
         var that = this;
         return this.session.call('com.werewolf.player_listen_topic', [gameName, playerName]).then(
@@ -159,10 +190,47 @@ export default class API {
             this.onSelectedPlayer(args[0]);
         }
     }
-    $onPlayerJoin(args, kwargs, details) {
+    $onSelectedPlayers(args, kwargs, details) {
         console.log(args, kwargs, details);
+        if (this.onSelectedPlayer !== undefined) {
+            args[0].forEach(player => this.onSelectedPlayer(player));
+        }
+    }
+    $applyPlayersSnapshot(snapshot) {
+        this.playersSeq = snapshot.seq;
+        this.players = snapshot.players;
+        return this.players;
+    }
+    $onPlayersUpdate(args, kwargs, details) {
+        console.log(args, kwargs, details);
+        var update = args[0];
+        if (this.playersSeq !== undefined && update.seq <= this.playersSeq) {
+            return;
+        }
+        // Updates merged by the server start at "since".
+        var first = update.since === undefined ? update.seq : update.since;
+        if (this.playersSeq === undefined || first > this.playersSeq + 1) {
+            // Some updates have been missed, fetch the whole player list.
+            var that = this;
+            return this.session.call('com.werewolf.get_players', [this.gameName]).then(
+                function (snapshot) {
+                    if (that.onPlayerJoin !== undefined) {
+                        that.onPlayerJoin(that.$applyPlayersSnapshot(snapshot));
+                    }
+                    return snapshot;
+                },
+                function (error) {
+                    throw error;
+                }
+            );
+        }
+        this.playersSeq = update.seq;
+        var added = update.added.map((player) => player.name);
+        this.players = this.players.filter(
+            (player) => !update.removed.includes(player.name) && !added.includes(player.name)
+        ).concat(update.added);
         if (this.onPlayerJoin !== undefined) {
-            this.onPlayerJoin(args[0]);
+            this.onPlayerJoin(this.players);
         }
     }
     $onClosePhase(args, kwargs, details) {